@@ -0,0 +1,48 @@
+"""Cascade deletes through foreign keys
+
+Revision ID: 9b2e4d7c1a30
+Revises: 5c43aaa12fc8
+Create Date: 2026-10-18 17:05:12.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e4d7c1a30'
+down_revision: Union[str, None] = '5c43aaa12fc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The initial migration left these constraints unnamed, so they carry the
+# PostgreSQL default names; the convention gives SQLite's reflected ones the same.
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+# (table, column, referenced table) of every foreign key that cascades deletes.
+FOREIGN_KEYS = [
+    ('teacher_m2m_subject', 'teacher_id', 'teachers'),
+    ('teacher_m2m_subject', 'subject_id', 'subjects'),
+    ('students', 'group_id', 'groups'),
+    ('grades', 'student_id', 'students'),
+    ('grades', 'subject_id', 'subjects'),
+]
+
+
+def replace_foreign_keys(ondelete) -> None:
+    for table, column, referred_table in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    replace_foreign_keys(None)
@@ -0,0 +1,456 @@
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from datetime import datetime
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from models import Base, Student, Grade, Subject, Teacher, Group
+from connect import enable_foreign_keys
+import my_select
+import my_select_additional
+from logger_provider import console_logger
+from random_util import (
+    get_random_names,
+    get_random_subject_name,
+    get_random_teacher_name,
+    get_random_group_name,
+    get_random_student_name,
+)
+from seed import seed_parallel
+
+logger = console_logger("Benchmark")
+
+SCALES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+SUBJECTS = 8
+GRADES_PER_SUBJECT = 10
+SEED_END_DATE = datetime(2025, 6, 30)
+
+# Query name -> (function, names of the arguments it takes after the session).
+QUERIES = {
+    "select_1": (my_select.select_1, ()),
+    "select_2": (my_select.select_2, ("subject",)),
+    "select_3": (my_select.select_3, ("subject",)),
+    "select_4": (my_select.select_4, ()),
+    "select_5": (my_select.select_5, ("teacher",)),
+    "select_6": (my_select.select_6, ("group",)),
+    "select_7": (my_select.select_7, ("group", "subject")),
+    "select_8": (my_select.select_8, ("teacher",)),
+    "select_9": (my_select.select_9, ("student",)),
+    "select_10": (my_select.select_10, ("student", "teacher")),
+    "select_average_grade_teacher_to_student": (
+        my_select_additional.select_average_grade_teacher_to_student,
+        ("teacher", "student"),
+    ),
+    "select_grades_last_lesson": (
+        my_select_additional.select_grades_last_lesson,
+        ("group", "subject"),
+    ),
+}
+
+# Batched query -> (the single query it replaces, its argument names).
+BATCHED_QUERIES = {
+    "select_5_batch": (my_select.select_5, my_select.select_5_batch, ("teacher",)),
+    "select_6_batch": (my_select.select_6, my_select.select_6_batch, ("group",)),
+    "select_7_batch": (
+        my_select.select_7,
+        my_select.select_7_batch,
+        ("group", "subject"),
+    ),
+    "select_9_batch": (my_select.select_9, my_select.select_9_batch, ("student",)),
+    "select_10_batch": (
+        my_select.select_10,
+        my_select.select_10_batch,
+        ("student", "teacher"),
+    ),
+}
+
+# crud.py write functions timed by time_writes, in the order each repetition
+# runs them.
+WRITES = (
+    "create_teacher",
+    "update_teacher",
+    "remove_teacher",
+    "create_student",
+    "update_student",
+    "remove_student",
+    "create_grade",
+    "update_grade",
+    "remove_grade",
+)
+
+
+def percentile(sorted_values, fraction: float):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def count_rows(result):
+    if isinstance(result, dict):
+        return sum(len(rows) for rows in result.values())
+    if isinstance(result, list):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def seed_scale(engine, grades: int, seed: str, workers: int):
+    """Reset the schema and seed about the given number of grades."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    students = max(math.ceil(grades / (SUBJECTS * GRADES_PER_SUBJECT)), 1)
+    seed_parallel(
+        engine,
+        seed=seed,
+        workers=workers,
+        groups_count=max(students // 30, 3),
+        teachers_count=max(SUBJECTS // 2, 1),
+        subjects_count=SUBJECTS,
+        students_count=students,
+        min_grades=GRADES_PER_SUBJECT,
+        max_grades=GRADES_PER_SUBJECT,
+        end_date=SEED_END_DATE,
+        faker_mode="pooled",
+    )
+
+
+def query_arguments(session, seed: str):
+    """Pick the same random names for every run with the same seed."""
+    random.seed(seed)
+    return {
+        "subject": get_random_subject_name(session),
+        "teacher": get_random_teacher_name(session),
+        "group": get_random_group_name(session),
+        "student": get_random_student_name(session),
+    }
+
+
+def batch_keys(session, seed: str, size: int, argument_names):
+    """Pick size argument tuples for a batched query, the same for the same seed."""
+    random.seed(seed)
+    columns = [get_random_names(session, name, size) for name in argument_names]
+    return list(zip(*columns))
+
+
+def call_singles(session, single, keys):
+    """Answer every key with its own query, as a loop over the single version would."""
+    return {key: single(session, *key) for key in keys}
+
+
+def call_batch(session, batch, keys):
+    return batch(session, [key[0] if len(key) == 1 else key for key in keys])
+
+
+def count_round_trips(engine, function, *args):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        function(*args)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return len(statements)
+
+
+def time_batched(engine, session, name, keys, warmup: int, repetitions: int):
+    """Time a batched query against the loop of single queries it replaces."""
+    single, batch, _ = BATCHED_QUERIES[name]
+    stats = time_query(session, call_batch, (batch, keys), warmup, repetitions)
+    loop = time_query(session, call_singles, (single, keys), warmup, repetitions)
+    stats["round_trips"] = count_round_trips(engine, call_batch, session, batch, keys)
+    stats["loop_p50_ms"] = loop["p50_ms"]
+    stats["loop_round_trips"] = count_round_trips(
+        engine, call_singles, session, single, keys
+    )
+    session.rollback()
+    return stats
+
+
+def time_writes(engine, session, warmup: int, repetitions: int):
+    """Time each crud.py write function per call, with its round trips.
+
+    Every repetition creates, updates and removes its own teacher, student and
+    grade, so the data set is the same afterwards. Round trips count statements;
+    the COMMIT of each write is not included.
+    """
+    import crud
+
+    group_id = session.scalar(select(Group.id).order_by(Group.id).limit(1))
+    student_id = session.scalar(select(Student.id).order_by(Student.id).limit(1))
+    subject_id = session.scalar(select(Subject.id).order_by(Subject.id).limit(1))
+    timings = defaultdict(list)
+    round_trips = {}
+
+    def timed(name, function, *args):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            started = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                function(*args)
+            timings[name].append((time.perf_counter() - started) * 1000)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        round_trips[name] = len(statements)
+
+    def last_id(model):
+        return session.scalar(select(func.max(model.id)))
+
+    crud_session = crud.session
+    crud.session = session
+    try:
+        for _ in range(warmup + repetitions):
+            timed("create_teacher", crud.create_teacher, "Benchmark Teacher")
+            teacher_id = last_id(Teacher)
+            timed("update_teacher", crud.update_teacher, teacher_id, "Renamed")
+            timed("remove_teacher", crud.remove_teacher, teacher_id)
+            timed("create_student", crud.create_student, "Benchmark", group_id)
+            new_student_id = last_id(Student)
+            timed(
+                "update_student",
+                crud.update_student,
+                new_student_id,
+                "Renamed",
+                group_id,
+            )
+            timed("remove_student", crud.remove_student, new_student_id)
+            timed(
+                "create_grade",
+                crud.create_grade,
+                student_id,
+                subject_id,
+                80,
+                SEED_END_DATE,
+            )
+            grade_id = last_id(Grade)
+            timed("update_grade", crud.update_grade, grade_id, 90, SEED_END_DATE)
+            timed("remove_grade", crud.remove_grade, grade_id)
+    finally:
+        crud.session = crud_session
+
+    results = {}
+    for name in WRITES:
+        values = sorted(timings[name][warmup:])
+        results[f"write_{name}"] = {
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+            "mean_ms": sum(values) / len(values),
+            "round_trips": round_trips[name],
+        }
+    return results
+
+
+def time_query(session, function, args, warmup: int, repetitions: int):
+    for _ in range(warmup):
+        function(session, *args)
+        session.rollback()
+    timings = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        result = function(session, *args)
+        timings.append((time.perf_counter() - started) * 1000)
+        session.rollback()
+    timings.sort()
+    return {
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "mean_ms": sum(timings) / len(timings),
+        "rows": count_rows(result),
+    }
+
+
+def run_benchmark(
+    url: str,
+    grades: int,
+    seed: str = "benchmark",
+    warmup: int = 3,
+    repetitions: int = 20,
+    workers: int = 1,
+    queries=None,
+    batch_size: int = 100,
+    writes: bool = True,
+):
+    """Seed one database at one scale and time every query on it.
+
+    Batched queries get batch_size keys and are also timed as a loop of
+    single queries, with the round trips of both. With writes, the crud.py
+    write functions are timed last.
+    """
+    engine = create_engine(url)
+    enable_foreign_keys(engine)
+    try:
+        seed_scale(engine, grades, seed, workers)
+        session = sessionmaker(bind=engine)()
+        try:
+            arguments = query_arguments(session, seed)
+            results = {}
+            for name in queries or list(QUERIES) + list(BATCHED_QUERIES):
+                if name in BATCHED_QUERIES:
+                    keys = batch_keys(
+                        session, seed, batch_size, BATCHED_QUERIES[name][2]
+                    )
+                    results[name] = time_batched(
+                        engine, session, name, keys, warmup, repetitions
+                    )
+                    logger.info(
+                        f"{name}: p50 {results[name]['p50_ms']:.2f} ms in "
+                        f"{results[name]['round_trips']} round trips, loop p50 "
+                        f"{results[name]['loop_p50_ms']:.2f} ms in "
+                        f"{results[name]['loop_round_trips']} round trips"
+                    )
+                    continue
+                function, argument_names = QUERIES[name]
+                args = tuple(arguments[argument] for argument in argument_names)
+                results[name] = time_query(session, function, args, warmup, repetitions)
+                logger.info(
+                    f"{name}: p50 {results[name]['p50_ms']:.2f} ms, "
+                    f"p95 {results[name]['p95_ms']:.2f} ms, rows {results[name]['rows']}"
+                )
+            if writes:
+                for name, stats in time_writes(
+                    engine, session, warmup, repetitions
+                ).items():
+                    results[name] = stats
+                    logger.info(
+                        f"{name}: p50 {stats['p50_ms']:.2f} ms in "
+                        f"{stats['round_trips']} round trips"
+                    )
+            return results
+        finally:
+            session.close()
+    finally:
+        engine.dispose()
+
+
+def compare(baseline, current, threshold: float = 1.25, metric: str = "p50_ms"):
+    """List queries whose metric grew by more than threshold times the baseline."""
+    regressions = []
+    for database, scales in current["results"].items():
+        for scale, queries in scales.items():
+            for name, stats in queries.items():
+                previous = (
+                    baseline["results"].get(database, {}).get(scale, {}).get(name)
+                )
+                if previous is None or previous[metric] <= 0:
+                    continue
+                ratio = stats[metric] / previous[metric]
+                if ratio > threshold:
+                    regressions.append(
+                        {
+                            "database": database,
+                            "scale": scale,
+                            "query": name,
+                            "baseline": previous[metric],
+                            "current": stats[metric],
+                            "ratio": ratio,
+                        }
+                    )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the select queries")
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        choices=list(SCALES),
+        default=["1k", "100k"],
+        help="Dataset sizes in grades",
+    )
+    parser.add_argument(
+        "--postgres-url",
+        type=str,
+        help="Also benchmark this PostgreSQL database; its schema is dropped and recreated",
+    )
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per query")
+    parser.add_argument(
+        "--repetitions", type=int, default=20, help="Timed runs per query"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Seeding processes per dataset"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="Keys per batched query"
+    )
+    parser.add_argument("--seed", type=str, default="benchmark", help="Data seed")
+    parser.add_argument(
+        "--output", type=str, default="bench_results.json", help="JSON results file"
+    )
+    parser.add_argument(
+        "--compare", type=str, help="Earlier JSON results to check for regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio of p50 latency reported as a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "warmup": args.warmup,
+        "repetitions": args.repetitions,
+        "seed": args.seed,
+        "batch_size": args.batch_size,
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        databases = {"sqlite": f"sqlite:///{os.path.join(directory, 'bench.db')}"}
+        if args.postgres_url:
+            databases["postgresql"] = args.postgres_url
+        for database, url in databases.items():
+            for scale in args.scales:
+                logger.info(f"Benchmarking {database} at {scale} grades")
+                report["results"].setdefault(database, {})[scale] = run_benchmark(
+                    url,
+                    SCALES[scale],
+                    args.seed,
+                    args.warmup,
+                    args.repetitions,
+                    args.workers,
+                    batch_size=args.batch_size,
+                )
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.threshold)
+        for regression in regressions:
+            logger.warning(
+                f"Regression in {regression['query']} ({regression['database']}, "
+                f"{regression['scale']}): {regression['baseline']:.2f} ms -> "
+                f"{regression['current']:.2f} ms ({regression['ratio']:.2f}x)"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from bench_queries import percentile
+from logger_provider import console_logger
+
+logger = console_logger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Command name -> main.py arguments. Neither needs the database, so neither may
+# import the modules in HEAVY_MODULES.
+COMMANDS = {
+    "help": ["--help"],
+    "argument_error": ["-a", "create"],
+}
+HEAVY_MODULES = ("sqlalchemy", "pg8000", "connect", "models", "crud")
+
+
+def parse_importtime(output: str):
+    """Map every module in -X importtime output to its cumulative time in ms,
+    and return the modules imported at the top level."""
+    modules = {}
+    top_level = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+        if not name.startswith("  "):
+            top_level.append(name.strip())
+    return modules, top_level
+
+
+def time_command(arguments, repetitions: int):
+    """Run main.py with -X importtime and report wall and import times."""
+    wall = []
+    imports = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "main.py", *arguments],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        wall.append((time.perf_counter() - started) * 1000)
+        modules, top_level = parse_importtime(completed.stderr)
+        imports.append(sum(modules[name] for name in top_level))
+    wall.sort()
+    imports.sort()
+    slowest = sorted(top_level, key=modules.get, reverse=True)[:5]
+    return {
+        "wall_p50_ms": percentile(wall, 0.50),
+        "wall_p95_ms": percentile(wall, 0.95),
+        "import_p50_ms": percentile(imports, 0.50),
+        "modules": len(modules),
+        "heavy_modules": [
+            name for name in modules if name.split(".")[0] in HEAVY_MODULES
+        ],
+        "slowest_imports": {name: modules[name] for name in slowest},
+        "exit_code": completed.returncode,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark main.py startup time")
+    parser.add_argument("--repetitions", type=int, default=10, help="Runs per command")
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=50.0,
+        help="Largest allowed p50 import time of each command",
+    )
+    parser.add_argument(
+        "--output", type=str, default="bench_startup.json", help="JSON results file"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repetitions": args.repetitions,
+        "target_ms": args.target_ms,
+        "results": {},
+    }
+    failed = False
+    for name, arguments in COMMANDS.items():
+        stats = time_command(arguments, args.repetitions)
+        report["results"][name] = stats
+        logger.info(
+            f"{name}: wall p50 {stats['wall_p50_ms']:.1f} ms, imports p50 "
+            f"{stats['import_p50_ms']:.1f} ms, {stats['modules']} modules"
+        )
+        if stats["heavy_modules"]:
+            logger.warning(
+                f"{name} imports {', '.join(stats['heavy_modules'])} before it "
+                "needs the database"
+            )
+            failed = True
+        if stats["import_p50_ms"] > args.target_ms:
+            logger.warning(
+                f"{name} imports take {stats['import_p50_ms']:.1f} ms, over the "
+                f"{args.target_ms:.1f} ms target"
+            )
+            failed = True
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    logger.info(f"Results written to {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,892 @@
+import shlex
+import sys
+from itertools import chain
+from connect import session
+from models import Base, Student, Group, Teacher, Subject, Grade
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from grade_loader import GRADE_COLUMNS, batched, load_grades
+from query_cache import cache
+from record_transfer import (
+    TABLES,
+    export_rows,
+    import_batches,
+    open_file,
+    read_records,
+    reset_sequences,
+    write_records,
+)
+import grade_summary
+import grade_trends
+import time
+
+# Tables whose cached query results a write to the model can change. Removals
+# cascade to dependent rows, so those tables are dropped as well.
+CACHE_TABLES = {
+    "Teacher": ("teachers", "teacher_m2m_subject"),
+    "Group": ("groups", "students", "grades"),
+    "Student": ("students", "grades"),
+    "Subject": ("subjects", "grades", "teacher_m2m_subject"),
+    "Grade": ("grades",),
+    "TeacherSubject": ("teacher_m2m_subject",),
+}
+MODELS = {
+    "Teacher": Teacher,
+    "Group": Group,
+    "Student": Student,
+    "Subject": Subject,
+    "Grade": Grade,
+}
+
+
+# Cache tables written since the last batch commit; None outside batch mode.
+pending_tables = None
+
+
+def commit(model):
+    """Commit a write and drop the cached results it changes.
+
+    In batch mode the write is only flushed; run_batch commits every few operations.
+    """
+    if pending_tables is None:
+        session.commit()
+        cache.invalidate(*CACHE_TABLES[model])
+    else:
+        session.flush()
+        pending_tables.update(CACHE_TABLES[model])
+
+
+# Column -> label used when printing listed records.
+COLUMN_LABELS = {
+    "id": "ID",
+    "name": "Name",
+    "group_id": "Group ID",
+    "student_id": "Student ID",
+    "subject_id": "Subject ID",
+    "grade": "Grade",
+    "date_received": "Date Received",
+}
+LIST_BATCH_SIZE = 1_000
+
+
+def list_records(model, limit=None, after_id=None, columns=None):
+    """Print records in ID order as they stream in, reading only the given columns.
+
+    after_id continues from the last ID of a previous page (keyset pagination).
+    """
+    columns = columns or list(model.__table__.c.keys())
+    unknown = [column for column in columns if column not in model.__table__.c]
+    if unknown:
+        print(f"Unknown {model.__name__} columns: {', '.join(unknown)}")
+        return
+    query = select(*(model.__table__.c[column] for column in columns)).order_by(
+        model.id
+    )
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    result = session.execute(query, execution_options={"yield_per": LIST_BATCH_SIZE})
+    for row in result:
+        print(
+            ", ".join(
+                f"{COLUMN_LABELS[column]}: {value}"
+                for column, value in zip(columns, row)
+            )
+        )
+
+
+def update_by_id(model, record_id, **values):
+    """Update one row in one statement; returns whether the row exists."""
+    result = session.execute(
+        update(model).where(model.id == record_id).values(**values),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount > 0
+
+
+def delete_by_id(model, record_id):
+    """Delete one row in one statement; returns whether the row existed.
+
+    Foreign keys with ON DELETE CASCADE remove the rows that depend on it.
+    """
+    result = session.execute(
+        delete(model).where(model.id == record_id),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount > 0
+
+
+def update_returning_old(model, record_id, values, returning):
+    """Update one row and return returning(old row) as it was before, or None.
+
+    PostgreSQL does it in one statement by joining the row to its old version.
+    SQLite cannot return joined columns, but runs in-process, so it reads first.
+    """
+    table = model.__table__
+    if session.get_bind().dialect.name == "postgresql":
+        old = table.alias("old")
+        return session.execute(
+            update(table)
+            .where(table.c.id == record_id, old.c.id == table.c.id)
+            .values(values)
+            .returning(*returning(old))
+        ).first()
+    row = session.execute(
+        select(*returning(table)).where(table.c.id == record_id)
+    ).first()
+    if row is not None:
+        session.execute(update(table).where(table.c.id == record_id).values(values))
+    return row
+
+
+def create_teacher(name):
+    teacher_id = session.scalar(insert(Teacher).values(name=name).returning(Teacher.id))
+    commit("Teacher")
+    print(f"Teacher '{name}' created with ID {teacher_id}")
+
+
+def list_teachers(limit=None, after_id=None, columns=None):
+    list_records(Teacher, limit, after_id, columns)
+
+
+def update_teacher(teacher_id, name):
+    if update_by_id(Teacher, teacher_id, name=name):
+        commit("Teacher")
+        print(f"Teacher with ID {teacher_id} updated to '{name}'")
+    else:
+        print(f"No teacher found with ID {teacher_id}")
+
+
+def remove_teacher(teacher_id):
+    if delete_by_id(Teacher, teacher_id):
+        commit("Teacher")
+        print(f"Teacher with ID {teacher_id} removed")
+    else:
+        print(f"No teacher found with ID {teacher_id}")
+
+
+def create_group(name):
+    group_id = session.scalar(insert(Group).values(name=name).returning(Group.id))
+    commit("Group")
+    print(f"Group '{name}' created with ID {group_id}")
+
+
+def list_groups(limit=None, after_id=None, columns=None):
+    list_records(Group, limit, after_id, columns)
+
+
+def update_group(group_id, name):
+    if update_by_id(Group, group_id, name=name):
+        commit("Group")
+        print(f"Group with ID {group_id} updated to '{name}'")
+    else:
+        print(f"No group found with ID {group_id}")
+
+
+def remove_group(group_id):
+    grade_summary.remove_group(session.connection(), group_id)
+    grade_trends.remove_group(session.connection(), group_id)
+    if delete_by_id(Group, group_id):
+        commit("Group")
+        print(f"Group with ID {group_id} removed")
+    else:
+        print(f"No group found with ID {group_id}")
+
+
+def create_student(name, group_id):
+    # INSERT ... SELECT inserts nothing when the group does not exist.
+    row = session.execute(
+        insert(Student)
+        .from_select(
+            ["name", "group_id"],
+            select(literal(name), Group.id).where(Group.id == group_id),
+        )
+        .returning(
+            Student.id,
+            select(Group.name).where(Group.id == group_id).scalar_subquery(),
+        )
+    ).first()
+    if row is None:
+        print(f"No group found with ID {group_id}")
+        return
+    commit("Student")
+    print(f"Student '{name}' created with ID {row[0]} in group '{row[1]}'")
+
+
+def list_students(limit=None, after_id=None, columns=None):
+    list_records(Student, limit, after_id, columns)
+
+
+def update_student(student_id, name, group_id):
+    old = update_returning_old(
+        Student,
+        student_id,
+        {"name": name, "group_id": group_id},
+        lambda old: [old.c.group_id],
+    )
+    if old is None:
+        print(f"No student found with ID {student_id}")
+        return
+    grade_summary.move_student(session.connection(), student_id, old.group_id, group_id)
+    commit("Student")
+    print(f"Student with ID {student_id} updated to '{name}' in group ID {group_id}")
+
+
+def remove_student(student_id):
+    grade_summary.remove_student(session.connection(), student_id)
+    grade_trends.remove_student(session.connection(), student_id)
+    if delete_by_id(Student, student_id):
+        commit("Student")
+        print(f"Student with ID {student_id} removed")
+    else:
+        print(f"No student found with ID {student_id}")
+
+
+def create_subject(name):
+    subject_id = session.scalar(insert(Subject).values(name=name).returning(Subject.id))
+    commit("Subject")
+    print(f"Subject '{name}' created with ID {subject_id}")
+
+
+def list_subjects(limit=None, after_id=None, columns=None):
+    list_records(Subject, limit, after_id, columns)
+
+
+def update_subject(subject_id, name):
+    if update_by_id(Subject, subject_id, name=name):
+        commit("Subject")
+        print(f"Subject with ID {subject_id} updated to '{name}'")
+    else:
+        print(f"No subject found with ID {subject_id}")
+
+
+def remove_subject(subject_id):
+    grade_summary.remove_subject(session.connection(), subject_id)
+    grade_trends.remove_subject(session.connection(), subject_id)
+    if delete_by_id(Subject, subject_id):
+        commit("Subject")
+        print(f"Subject with ID {subject_id} removed")
+    else:
+        print(f"No subject found with ID {subject_id}")
+
+
+def create_grade(student_id, subject_id, grade_value, date_received):
+    # INSERT ... SELECT inserts nothing when the student or subject does not exist.
+    row = session.execute(
+        insert(Grade)
+        .from_select(
+            ["student_id", "subject_id", "grade", "date_received"],
+            select(Student.id, Subject.id, literal(grade_value), literal(date_received))
+            .join_from(Student, Subject, Subject.id == subject_id)
+            .where(Student.id == student_id),
+        )
+        .returning(
+            select(Student.name).where(Student.id == student_id).scalar_subquery(),
+            select(Subject.name).where(Subject.id == subject_id).scalar_subquery(),
+            select(Student.group_id).where(Student.id == student_id).scalar_subquery(),
+        )
+    ).first()
+    if row is None:
+        print(f"No student or subject found with the provided IDs")
+        return
+    student_name, subject_name, group_id = row
+    grade_summary.apply_grade_change(
+        session.connection(), student_id, subject_id, grade_value, 1, group_id
+    )
+    grade_trends.log_grade_change(
+        session.connection(), student_id, subject_id, date_received
+    )
+    commit("Grade")
+    print(
+        f"Grade '{grade_value}' created for student '{student_name}' in subject '{subject_name}'"
+    )
+
+
+def list_grades(limit=None, after_id=None, columns=None):
+    list_records(Grade, limit, after_id, columns)
+
+
+def update_grade(grade_id, grade_value, date_received):
+    old = update_returning_old(
+        Grade,
+        grade_id,
+        {"grade": grade_value, "date_received": date_received},
+        lambda old: [
+            old.c.student_id,
+            old.c.subject_id,
+            old.c.grade,
+            select(Student.group_id)
+            .where(Student.id == old.c.student_id)
+            .scalar_subquery(),
+            old.c.date_received,
+        ],
+    )
+    if old is None:
+        print(f"No grade found with ID {grade_id}")
+        return
+    if grade_value != old.grade:
+        grade_summary.apply_grade_change(
+            session.connection(),
+            old.student_id,
+            old.subject_id,
+            grade_value - old.grade,
+            0,
+            old[3],
+        )
+    if grade_value != old.grade or date_received != old.date_received:
+        grade_trends.log_grade_change(
+            session.connection(),
+            old.student_id,
+            old.subject_id,
+            old.date_received,
+            date_received,
+        )
+    commit("Grade")
+    print(f"Grade with ID {grade_id} updated to '{grade_value}' on '{date_received}'")
+
+
+def remove_grade(grade_id):
+    row = session.execute(
+        delete(Grade)
+        .where(Grade.id == grade_id)
+        .returning(
+            Grade.student_id,
+            Grade.subject_id,
+            Grade.grade,
+            select(Student.group_id)
+            .where(Student.id == Grade.student_id)
+            .scalar_subquery(),
+            Grade.date_received,
+        ),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        print(f"No grade found with ID {grade_id}")
+        return
+    student_id, subject_id, grade_value, group_id, date_received = row
+    grade_summary.apply_grade_change(
+        session.connection(), student_id, subject_id, -grade_value, -1, group_id
+    )
+    grade_trends.log_grade_change(
+        session.connection(), student_id, subject_id, date_received
+    )
+    commit("Grade")
+    print(f"Grade with ID {grade_id} removed")
+
+
+def track_grade_batches(connection, batches, delta, changes, on_conflict):
+    """Count imported grades into delta, minus the grades they replace or skip.
+
+    changes collects the trend buckets of the imported and replaced grades.
+    """
+    group_ids = dict(connection.execute(select(Student.id, Student.group_id)).all())
+    for batch in batches:
+        existing = {}
+        ids = [row["id"] for row in batch if row.get("id") is not None]
+        if ids and on_conflict != "error":
+            existing = {
+                row.id: row
+                for row in connection.execute(
+                    select(
+                        Grade.id,
+                        Grade.student_id,
+                        Grade.subject_id,
+                        Grade.grade,
+                        Grade.date_received,
+                    ).where(Grade.id.in_(ids))
+                )
+            }
+        for row in batch:
+            if row["student_id"] not in group_ids:
+                raise ValueError(f"No student found with ID {row['student_id']}")
+            old = existing.get(row.get("id"))
+            if old is not None:
+                if on_conflict == "skip":
+                    continue
+                delta.add(
+                    old.student_id,
+                    group_ids[old.student_id],
+                    old.subject_id,
+                    -old.grade,
+                    -1,
+                )
+                changes.add(old.student_id, old.subject_id, old.date_received)
+            delta.add(
+                row["student_id"],
+                group_ids[row["student_id"]],
+                row["subject_id"],
+                row["grade"],
+                1,
+            )
+            changes.add(row["student_id"], row["subject_id"], row.get("date_received"))
+        yield batch
+
+
+def track_student_moves(connection, batches):
+    """Move the grade summaries of students whose group an import changes."""
+    for batch in batches:
+        new_group_ids = {
+            row["id"]: row["group_id"]
+            for row in batch
+            if row.get("id") is not None and "group_id" in row
+        }
+        if new_group_ids:
+            for student_id, group_id in connection.execute(
+                select(Student.id, Student.group_id).where(
+                    Student.id.in_(list(new_group_ids))
+                )
+            ).all():
+                grade_summary.move_student(
+                    connection, student_id, group_id, new_group_ids[student_id]
+                )
+        yield batch
+
+
+def import_records(model, file_path, batch_size, on_conflict, method, file_format):
+    started = time.perf_counter()
+    connection = session.connection()
+    table = TABLES[model]
+    try:
+        batches = batched(read_records(file_path, table, file_format), batch_size)
+        delta = grade_summary.GradeSummaryDelta()
+        changes = grade_trends.GradeTrendChanges()
+        if model == "Grade":
+            batches = track_grade_batches(
+                connection, batches, delta, changes, on_conflict
+            )
+        elif model == "Student" and on_conflict == "update":
+            batches = track_student_moves(connection, batches)
+
+        if model == "Grade" and on_conflict == "error":
+            # Plain grade imports can use COPY, which needs the columns up front.
+            first = next(batches, [])
+            columns = tuple(first[0]) if first else GRADE_COLUMNS
+            count = load_grades(
+                connection,
+                chain.from_iterable(chain([first], batches)),
+                batch_size,
+                method=method,
+                columns=columns,
+            )
+        else:
+            count = import_batches(connection, table, batches, on_conflict)
+        reset_sequences(connection, [table])
+        delta.apply(connection)
+        changes.apply(connection)
+        session.commit()
+    except (IntegrityError, ValueError) as error:
+        session.rollback()
+        print(
+            f"Import of {model} records failed, nothing was imported: {getattr(error, 'orig', error)}"
+        )
+        return
+    cache.invalidate(*CACHE_TABLES[model])
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"Imported {count} {model} records from '{file_path}' in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)"
+    )
+
+
+def export_records(model, file_path, batch_size, file_format):
+    started = time.perf_counter()
+    table = TABLES[model]
+    try:
+        count = write_records(
+            file_path,
+            table.c.keys(),
+            export_rows(session.connection(), table, batch_size),
+            file_format,
+        )
+    finally:
+        session.rollback()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    # Keep the summary out of the exported data when it goes to stdout.
+    print(
+        f"Exported {count} {model} records to '{file_path}' in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)",
+        file=sys.stderr if file_path == "-" else sys.stdout,
+    )
+
+
+def fetch_group_ids(student_ids):
+    return dict(
+        session.execute(
+            select(Student.id, Student.group_id).where(Student.id.in_(student_ids))
+        ).all()
+    )
+
+
+def bulk_rename(operations):
+    """Rename teachers, groups or subjects with one executemany UPDATE."""
+    model_name = operations[0].model
+    model = MODELS[model_name]
+    found = set(
+        session.scalars(
+            select(model.id).where(model.id.in_({op.id for op in operations}))
+        )
+    )
+    rows = []
+    for op in operations:
+        if op.id in found:
+            rows.append({"id": op.id, "name": op.name})
+            print(f"{model_name} with ID {op.id} updated to '{op.name}'")
+        else:
+            print(f"No {model_name.lower()} found with ID {op.id}")
+    if rows:
+        session.execute(update(model), rows)
+    pending_tables.update(CACHE_TABLES[model_name])
+
+
+def bulk_update_students(operations):
+    """Update students with one executemany UPDATE, moving their grade summaries."""
+    group_ids = fetch_group_ids({op.id for op in operations})
+    rows = []
+    for op in operations:
+        if op.id in group_ids:
+            grade_summary.move_student(
+                session.connection(), op.id, group_ids[op.id], op.group_id
+            )
+            group_ids[op.id] = op.group_id
+            rows.append({"id": op.id, "name": op.name, "group_id": op.group_id})
+            print(
+                f"Student with ID {op.id} updated to '{op.name}' in group ID {op.group_id}"
+            )
+        else:
+            print(f"No student found with ID {op.id}")
+    if rows:
+        session.execute(update(Student), rows)
+    pending_tables.update(CACHE_TABLES["Student"])
+
+
+def fetch_grades(grade_ids):
+    """Load the grades with the given IDs and the groups of their students."""
+    grades = {
+        row.id: row
+        for row in session.execute(
+            select(
+                Grade.id,
+                Grade.student_id,
+                Grade.subject_id,
+                Grade.grade,
+                Grade.date_received,
+            ).where(Grade.id.in_(grade_ids))
+        )
+    }
+    return grades, fetch_group_ids({row.student_id for row in grades.values()})
+
+
+def bulk_update_grades(operations):
+    """Update grades with one executemany UPDATE and one summary change."""
+    grades, group_ids = fetch_grades({op.id for op in operations})
+    values = {grade_id: row.grade for grade_id, row in grades.items()}
+    delta = grade_summary.GradeSummaryDelta()
+    changes = grade_trends.GradeTrendChanges()
+    rows = []
+    for op in operations:
+        if op.id in grades:
+            grade = grades[op.id]
+            delta.add(
+                grade.student_id,
+                group_ids[grade.student_id],
+                grade.subject_id,
+                op.grade_value - values[op.id],
+                0,
+            )
+            changes.add(grade.student_id, grade.subject_id, grade.date_received)
+            changes.add(grade.student_id, grade.subject_id, op.date_received)
+            values[op.id] = op.grade_value
+            rows.append(
+                {
+                    "id": op.id,
+                    "grade": op.grade_value,
+                    "date_received": op.date_received,
+                }
+            )
+            print(
+                f"Grade with ID {op.id} updated to '{op.grade_value}' on '{op.date_received}'"
+            )
+        else:
+            print(f"No grade found with ID {op.id}")
+    if rows:
+        session.execute(update(Grade), rows)
+    delta.apply(session.connection())
+    changes.apply(session.connection())
+    pending_tables.update(CACHE_TABLES["Grade"])
+
+
+def bulk_remove_grades(operations):
+    """Remove grades with one DELETE ... WHERE id IN (...) and one summary change."""
+    grades, group_ids = fetch_grades({op.id for op in operations})
+    delta = grade_summary.GradeSummaryDelta()
+    changes = grade_trends.GradeTrendChanges()
+    removed = set()
+    for op in operations:
+        if op.id in grades and op.id not in removed:
+            grade = grades[op.id]
+            delta.add(
+                grade.student_id,
+                group_ids[grade.student_id],
+                grade.subject_id,
+                -grade.grade,
+                -1,
+            )
+            changes.add(grade.student_id, grade.subject_id, grade.date_received)
+            removed.add(op.id)
+            print(f"Grade with ID {op.id} removed")
+        else:
+            print(f"No grade found with ID {op.id}")
+    if removed:
+        session.execute(
+            delete(Grade).where(Grade.id.in_(removed)),
+            execution_options={"synchronize_session": False},
+        )
+    delta.apply(session.connection())
+    changes.apply(session.connection())
+    pending_tables.update(CACHE_TABLES["Grade"])
+
+
+# (action, model) -> (bulk handler, arguments an operation needs to use it).
+# Other operations, and these without their arguments, run one at a time.
+BULK_ACTIONS = {
+    ("update", "Teacher"): (bulk_rename, ("id", "name")),
+    ("update", "Group"): (bulk_rename, ("id", "name")),
+    ("update", "Subject"): (bulk_rename, ("id", "name")),
+    ("update", "Student"): (bulk_update_students, ("id", "name", "group_id")),
+    ("update", "Grade"): (bulk_update_grades, ("id", "grade_value", "date_received")),
+    ("remove", "Grade"): (bulk_remove_grades, ("id",)),
+}
+
+
+def bulk_key(args):
+    key = (args.action, args.model)
+    if key in BULK_ACTIONS and all(
+        getattr(args, name) for name in BULK_ACTIONS[key][1]
+    ):
+        return key
+    return None
+
+
+def read_operations(parser, file_path):
+    """Yield (line number, parsed arguments) for each operation line of a batch file."""
+    with open_file(file_path, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+            try:
+                args = parser.parse_args(tokens)
+            except SystemExit:
+                raise ValueError(f"invalid arguments on line {line_number}") from None
+            if args.batch or not args.action or not args.model:
+                raise ValueError(
+                    f"line {line_number} needs an action and a model and no --batch"
+                )
+            # Imports and exports commit or roll back the session themselves,
+            # which would end the batch transaction.
+            if args.action in ("import", "export"):
+                raise ValueError(
+                    f"line {line_number}: {args.action} cannot run in a batch"
+                )
+            yield line_number, args
+
+
+def run_batch(parser, file_path, commit_every):
+    """Run the operations of a batch file in one session, committing every few.
+
+    Consecutive operations that BULK_ACTIONS covers become one statement. The
+    batch stops at the first failing operation; everything since the last
+    commit is rolled back.
+    """
+    global pending_tables
+    started = time.perf_counter()
+    pending_tables = set()
+    run = []
+    # operations/bulk count committed work, pending/pending_bulk the work since
+    # the last commit.
+    counts = {
+        "operations": 0,
+        "bulk": 0,
+        "pending": 0,
+        "pending_bulk": 0,
+        "commits": 0,
+        "line": 0,
+    }
+
+    def flush_run():
+        if run:
+            BULK_ACTIONS[bulk_key(run[0])][0](run)
+            # Bulk statements bypass the identity map, so reload objects later.
+            session.expire_all()
+            counts["pending_bulk"] += len(run)
+            run.clear()
+
+    def commit_batch():
+        flush_run()
+        session.commit()
+        if pending_tables:
+            cache.invalidate(*pending_tables)
+            pending_tables.clear()
+        counts["commits"] += 1
+        counts["operations"] += counts["pending"]
+        counts["bulk"] += counts["pending_bulk"]
+        counts["pending"] = counts["pending_bulk"] = 0
+
+    try:
+        for counts["line"], args in read_operations(parser, file_path):
+            key = bulk_key(args)
+            if run and bulk_key(run[0]) != key:
+                flush_run()
+            if key:
+                run.append(args)
+            else:
+                run_action(args)
+            counts["pending"] += 1
+            if counts["pending"] >= commit_every:
+                commit_batch()
+        commit_batch()
+    except (SQLAlchemyError, ValueError) as error:
+        session.rollback()
+        print(
+            f"Batch stopped after line {counts['line']}: {getattr(error, 'orig', error)}; "
+            f"{counts['pending']} operations since the last commit were rolled back"
+        )
+    finally:
+        pending_tables = None
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"Batch applied {counts['operations']} operations "
+        f"({counts['bulk']} in bulk statements) with {counts['commits']} commits "
+        f"in {elapsed:.2f}s ({counts['operations'] / elapsed:,.0f} operations/s)"
+    )
+
+
+def run_action(args):
+    if args.action in ("import", "export"):
+        if not args.file:
+            print(f"File is required to {args.action} records")
+        elif args.action == "import":
+            import_records(
+                args.model,
+                args.file,
+                args.batch_size,
+                args.on_conflict,
+                args.loader,
+                args.format,
+            )
+        else:
+            export_records(args.model, args.file, args.batch_size, args.format)
+        return
+
+    if args.model == "TeacherSubject":
+        print("Only import and export are supported for teacher subjects")
+        return
+
+    if args.model == "Teacher":
+        if args.action == "create":
+            if args.name:
+                create_teacher(args.name)
+            else:
+                print("Name is required to create a teacher")
+        elif args.action == "list":
+            list_teachers(args.limit, args.after_id, args.columns)
+        elif args.action == "update":
+            if args.id and args.name:
+                update_teacher(args.id, args.name)
+            else:
+                print("ID and name are required to update a teacher")
+        elif args.action == "remove":
+            if args.id:
+                remove_teacher(args.id)
+            else:
+                print("ID is required to remove a teacher")
+
+    elif args.model == "Group":
+        if args.action == "create":
+            if args.name:
+                create_group(args.name)
+            else:
+                print("Name is required to create a group")
+        elif args.action == "list":
+            list_groups(args.limit, args.after_id, args.columns)
+        elif args.action == "update":
+            if args.id and args.name:
+                update_group(args.id, args.name)
+            else:
+                print("ID and name are required to update a group")
+        elif args.action == "remove":
+            if args.id:
+                remove_group(args.id)
+            else:
+                print("ID is required to remove a group")
+
+    elif args.model == "Student":
+        if args.action == "create":
+            if args.name and args.group_id:
+                create_student(args.name, args.group_id)
+            else:
+                print("Name and group ID are required to create a student")
+        elif args.action == "list":
+            list_students(args.limit, args.after_id, args.columns)
+        elif args.action == "update":
+            if args.id and args.name and args.group_id:
+                update_student(args.id, args.name, args.group_id)
+            else:
+                print("ID, name, and group ID are required to update a student")
+        elif args.action == "remove":
+            if args.id:
+                remove_student(args.id)
+            else:
+                print("ID is required to remove a student")
+
+    elif args.model == "Subject":
+        if args.action == "create":
+            if args.name:
+                create_subject(args.name)
+            else:
+                print("Name is required to create a subject")
+        elif args.action == "list":
+            list_subjects(args.limit, args.after_id, args.columns)
+        elif args.action == "update":
+            if args.id and args.name:
+                update_subject(args.id, args.name)
+            else:
+                print("ID and name are required to update a subject")
+        elif args.action == "remove":
+            if args.id:
+                remove_subject(args.id)
+            else:
+                print("ID is required to remove a subject")
+
+    elif args.model == "Grade":
+        if args.action == "create":
+            if (
+                args.student_id
+                and args.subject_id
+                and args.grade_value
+                and args.date_received
+            ):
+                create_grade(
+                    args.student_id,
+                    args.subject_id,
+                    args.grade_value,
+                    args.date_received,
+                )
+            else:
+                print(
+                    "Student ID, subject ID, grade value, and date received are required to create a grade"
+                )
+        elif args.action == "list":
+            list_grades(args.limit, args.after_id, args.columns)
+        elif args.action == "update":
+            if args.id and args.grade_value and args.date_received:
+                update_grade(args.id, args.grade_value, args.date_received)
+            else:
+                print(
+                    "ID, grade value, and date received are required to update a grade"
+                )
+        elif args.action == "remove":
+            if args.id:
+                remove_grade(args.id)
+            else:
+                print("ID is required to remove a grade")
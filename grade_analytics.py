@@ -0,0 +1,299 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
+from my_select_additional import LessonRow
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Row shapes of the my_select and my_select_additional queries answered here.
+AverageRow = namedtuple("Row", "name average_grade")
+NameRow = namedtuple("Row", "name")
+GradeRow = namedtuple("Row", "name grade")
+# Tables loaded, in the order __init__ unpacks them.
+TABLES = [
+    Group.__table__,
+    Subject.__table__,
+    Teacher.__table__,
+    Student.__table__,
+    teacher_m2m_subject,
+    Grade.__table__,
+]
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def column_array(column, values):
+    """NumPy array of one column's values. Names become an object array of str;
+    timestamps go through integer microseconds, as converting datetime objects
+    one by one in np.array is several times slower."""
+    if column.name == "name":
+        return np.array(values, dtype=object)
+    if column.name == "date_received":
+        return np.fromiter(
+            ((value - EPOCH) // MICROSECOND for value in values),
+            dtype=np.int64,
+            count=len(values),
+        ).view("datetime64[us]")
+    return np.fromiter(values, dtype=np.int64, count=len(values))
+
+
+def load_columns(session: Session, columns, batch_size: int = 100_000):
+    """Read the columns of a query into {name: NumPy array}, fetching
+    batch_size rows at a time with Core rather than the ORM."""
+    result = session.connection().execute(
+        select(*columns).order_by(columns[0]),
+        execution_options={"yield_per": batch_size},
+    )
+    rows = [row for partition in result.partitions() for row in partition]
+    return {
+        column.name: column_array(column, [row[index] for row in rows])
+        for index, column in enumerate(columns)
+    }
+
+
+def load_tables(session: Session, batch_size: int = 100_000):
+    """{table: {column: array}} of the tables GradeAnalytics reads."""
+    return {
+        table.name: load_columns(session, list(table.c), batch_size) for table in TABLES
+    }
+
+
+def name_array(values):
+    """Names as an object array of str; snapshots store them as UTF-8 bytes."""
+    if values.dtype.kind == "S":
+        return np.char.decode(values, "utf-8").astype(object)
+    return values
+
+
+def average(total, count):
+    """avg() of grades summing to total: None when there are none, like SQL."""
+    if count == 0:
+        return None
+    return float(total) / float(count)
+
+
+def distinct_names(names):
+    return [NameRow(name) for name in dict.fromkeys(names)]
+
+
+class GradeAnalytics:
+    """Grades and the dimension tables loaded once into NumPy column arrays.
+
+    Answers the my_select report queries with vectorized group-by over those
+    arrays instead of a round trip each, for repeated reports over data that
+    does not change. Foreign keys are turned into positions in the sorted id
+    arrays, so a group-by is one np.bincount over positions.
+    """
+
+    def __init__(self, session: Session = None, batch_size: int = 100_000, tables=None):
+        """Load the tables from session, or take tables as load_tables returns
+        them."""
+        if np is None:
+            raise ImportError("GradeAnalytics needs NumPy")
+        if tables is None:
+            tables = load_tables(session, batch_size)
+        groups, subjects, teachers, students, links, grades = (
+            tables[table.name] for table in TABLES
+        )
+        self.group_ids = groups["id"]
+        self.group_names = name_array(groups["name"])
+        self.subject_ids = subjects["id"]
+        self.subject_names = name_array(subjects["name"])
+        self.teacher_ids = teachers["id"]
+        self.teacher_names = name_array(teachers["name"])
+        self.student_ids = students["id"]
+        self.student_names = name_array(students["name"])
+        self.student_group = np.searchsorted(self.group_ids, students["group_id"])
+        self.link_teacher = np.searchsorted(self.teacher_ids, links["teacher_id"])
+        self.link_subject = np.searchsorted(self.subject_ids, links["subject_id"])
+        self.grade_ids = grades["id"]
+        self.grade_student = np.searchsorted(self.student_ids, grades["student_id"])
+        self.grade_subject = np.searchsorted(self.subject_ids, grades["subject_id"])
+        self.grades = grades["grade"]
+        self.dates = grades["date_received"]
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Answer from the columns of a GradeSnapshot, without a database."""
+        return cls(tables=snapshot.tables())
+
+    def dated(self, date_from: datetime = None, date_to: datetime = None):
+        """Mask of grades received from date_from up to, not including, date_to."""
+        mask = np.ones(len(self.grades), dtype=bool)
+        if date_from is not None:
+            mask &= self.dates >= np.datetime64(date_from, "us")
+        if date_to is not None:
+            mask &= self.dates < np.datetime64(date_to, "us")
+        return mask
+
+    def taught_by(self, teacher_name: str):
+        """Number of links of every subject to teachers named teacher_name.
+
+        The SQL joins through teacher_m2m_subject, so a grade counts once per
+        matching link.
+        """
+        links = (self.teacher_names == teacher_name)[self.link_teacher]
+        return np.bincount(
+            self.link_subject[links], minlength=len(self.subject_ids)
+        ).astype(np.int64)
+
+    def student_averages(self, mask):
+        """(student positions, averages) of the students with grades in mask."""
+        students = self.grade_student[mask]
+        totals = np.bincount(
+            students, weights=self.grades[mask], minlength=len(self.student_ids)
+        )
+        counts = np.bincount(students, minlength=len(self.student_ids))
+        graded = np.flatnonzero(counts)
+        return graded, totals[graded] / counts[graded]
+
+    def weighted_average(self, weights):
+        return average((self.grades * weights).sum(), weights.sum())
+
+    def select_1(self, date_from: datetime = None, date_to: datetime = None):
+        """Find the top 5 students with the highest average grade across all subjects."""
+        students, averages = self.student_averages(self.dated(date_from, date_to))
+        top = np.argsort(-averages, kind="stable")[:5]
+        return [
+            AverageRow(self.student_names[student], float(value))
+            for student, value in zip(students[top], averages[top])
+        ]
+
+    def select_2(
+        self, subject_name: str, date_from: datetime = None, date_to: datetime = None
+    ):
+        """Find the student with the highest average grade in a specific subject."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.subject_names == subject_name)[self.grade_subject]
+        students, averages = self.student_averages(mask)
+        if len(students) == 0:
+            return None
+        best = np.argmax(averages)
+        return AverageRow(self.student_names[students[best]], float(averages[best]))
+
+    def select_3(
+        self, subject_name: str, date_from: datetime = None, date_to: datetime = None
+    ):
+        """Find the average grade in groups for a specific subject."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.subject_names == subject_name)[self.grade_subject]
+        groups = self.student_group[self.grade_student[mask]]
+        totals = np.bincount(
+            groups, weights=self.grades[mask], minlength=len(self.group_ids)
+        )
+        counts = np.bincount(groups, minlength=len(self.group_ids))
+        return [
+            AverageRow(self.group_names[group], float(totals[group] / counts[group]))
+            for group in np.flatnonzero(counts)
+        ]
+
+    def select_4(self, date_from: datetime = None, date_to: datetime = None):
+        """Find the average grade across all grades."""
+        grades = self.grades[self.dated(date_from, date_to)]
+        return average(grades.sum(), len(grades))
+
+    def select_5(self, teacher_name: str):
+        """Find the courses taught by a specific teacher."""
+        links = (self.teacher_names == teacher_name)[self.link_teacher]
+        return [NameRow(name) for name in self.subject_names[self.link_subject[links]]]
+
+    def select_6(self, group_name: str):
+        """Find the list of students in a specific group."""
+        students = (self.group_names == group_name)[self.student_group]
+        return [NameRow(name) for name in self.student_names[students]]
+
+    def select_7(
+        self,
+        group_name: str,
+        subject_name: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ):
+        """Find the grades of students in a specific group for a specific subject."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.subject_names == subject_name)[self.grade_subject]
+        mask &= (self.group_names == group_name)[self.student_group][self.grade_student]
+        return [
+            GradeRow(name, int(grade))
+            for name, grade in zip(
+                self.student_names[self.grade_student[mask]], self.grades[mask]
+            )
+        ]
+
+    def select_8(
+        self, teacher_name: str, date_from: datetime = None, date_to: datetime = None
+    ):
+        """Find the average grade given by a specific teacher across their subjects."""
+        weights = self.taught_by(teacher_name)[self.grade_subject]
+        return self.weighted_average(weights * self.dated(date_from, date_to))
+
+    def select_9(
+        self, student_name: str, date_from: datetime = None, date_to: datetime = None
+    ):
+        """Find the list of courses attended by a specific student."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.student_names == student_name)[self.grade_student]
+        return distinct_names(self.subject_names[np.unique(self.grade_subject[mask])])
+
+    def select_10(
+        self,
+        student_name: str,
+        teacher_name: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ):
+        """Find the list of courses taught by a specific teacher to a specific student."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.student_names == student_name)[self.grade_student]
+        mask &= self.taught_by(teacher_name)[self.grade_subject] > 0
+        return distinct_names(self.subject_names[np.unique(self.grade_subject[mask])])
+
+    def select_average_grade_teacher_to_student(
+        self,
+        teacher_name: str,
+        student_name: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ):
+        """Find the average grade given by a specific teacher to a specific student."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.student_names == student_name)[self.grade_student]
+        return self.weighted_average(
+            self.taught_by(teacher_name)[self.grade_subject] * mask
+        )
+
+    def select_grades_last_lesson(
+        self,
+        group_name: str,
+        subject_name: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ):
+        """Find the grades of students in a specific group for a specific subject on the last lesson."""
+        mask = self.dated(date_from, date_to)
+        mask &= (self.subject_names == subject_name)[self.grade_subject]
+        mask &= (self.group_names == group_name)[self.student_group][self.grade_student]
+        if not mask.any():
+            return []
+        mask &= self.dates == self.dates[mask].max()
+        return [
+            LessonRow(
+                int(grade_id),
+                self.student_names[student],
+                self.subject_names[subject],
+                int(grade),
+                date.item(),
+            )
+            for grade_id, student, subject, grade, date in zip(
+                self.grade_ids[mask],
+                self.grade_student[mask],
+                self.grade_subject[mask],
+                self.grades[mask],
+                self.dates[mask],
+            )
+        ]
@@ -0,0 +1,99 @@
+import csv
+import io
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
+from models import Grade
+
+GRADE_COLUMNS = ("student_id", "subject_id", "grade", "date_received")
+
+
+def copy_grades_sql(columns=GRADE_COLUMNS):
+    return (
+        f"COPY {Grade.__tablename__} ({', '.join(columns)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+
+
+def batched(rows, size: int):
+    """Group an iterable into lists of at most size items."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_in_batches(connection: Connection, table, rows, batch_size: int):
+    """Insert rows with Core executemany, flushing every batch_size rows."""
+    total = 0
+    for batch in batched(rows, batch_size):
+        connection.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def csv_value(value):
+    # isoformat keeps microseconds, so COPY stores what executemany would.
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def grade_csv_chunks(rows, batch_size: int, counter: list, columns=GRADE_COLUMNS):
+    """Encode grade rows as CSV text, one chunk per batch_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow([csv_value(row[column]) for column in columns])
+        pending += 1
+        if pending >= batch_size:
+            counter[0] += pending
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        counter[0] += pending
+        yield buffer.getvalue()
+
+
+def copy_grades(
+    connection: Connection, rows, batch_size: int = 10_000, columns=GRADE_COLUMNS
+):
+    """Stream grade rows into PostgreSQL with COPY ... FROM STDIN."""
+    counter = [0]
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(
+            copy_grades_sql(columns),
+            stream=grade_csv_chunks(rows, batch_size, counter, columns),
+        )
+    finally:
+        cursor.close()
+    return counter[0]
+
+
+def load_grades(
+    connection: Connection,
+    rows,
+    batch_size: int = 10_000,
+    method: str = "auto",
+    columns=GRADE_COLUMNS,
+):
+    """Load grade rows with COPY on PostgreSQL or batched executemany elsewhere.
+
+    columns lists the row keys sent by COPY; pass ("id",) + GRADE_COLUMNS to load
+    rows that carry explicit ids.
+    """
+    if method == "auto":
+        method = "copy" if connection.dialect.name == "postgresql" else "executemany"
+    if method == "copy":
+        if connection.dialect.name != "postgresql":
+            raise ValueError("COPY is only supported on PostgreSQL")
+        return copy_grades(connection, rows, batch_size, columns)
+    return insert_in_batches(connection, Grade.__table__, rows, batch_size)
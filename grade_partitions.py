@@ -0,0 +1,283 @@
+import argparse
+import re
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, DropIndex
+from logger_provider import console_logger
+from models import Grade
+
+logger = console_logger(__name__)
+
+# Partition interval -> months per partition. Terms run January-June and
+# July-December.
+INTERVALS = {"month": 1, "term": 6}
+DEFAULT_PARTITION = "grades_default"
+PARTITION_NAME = re.compile(r"^grades_(p\d{4}_\d{2}|default)$")
+PARTITION_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+# Columns and constraints of grades, apart from its primary key. {sequence}
+# is the id sequence, kept when the table is rebuilt.
+GRADE_COLUMNS_DDL = """
+    id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass),
+    student_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    grade INTEGER NOT NULL,
+    date_received TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    CONSTRAINT grades_student_id_fkey FOREIGN KEY (student_id)
+        REFERENCES students (id) ON DELETE CASCADE,
+    CONSTRAINT grades_subject_id_fkey FOREIGN KEY (subject_id)
+        REFERENCES subjects (id) ON DELETE CASCADE
+"""
+GRADE_COLUMNS = "id, student_id, subject_id, grade, date_received"
+
+
+def interval_start(value: datetime, months: int):
+    """First day of the months-long interval holding value."""
+    index = (value.year * 12 + value.month - 1) // months * months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def add_months(start: datetime, months: int):
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def months_between(start: datetime, end: datetime):
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def partition_name(start: datetime):
+    return f"grades_p{start:%Y_%m}"
+
+
+def is_partition_name(name: str):
+    """Whether a table name belongs to a grades partition."""
+    return PARTITION_NAME.match(name) is not None
+
+
+def parse_bound(bound: str):
+    """Return (start, end) of a 'FOR VALUES FROM (...) TO (...)' bound, None for DEFAULT."""
+    match = PARTITION_BOUND.search(bound)
+    if match is None:
+        return None
+    return tuple(datetime.fromisoformat(value) for value in match.groups())
+
+
+def is_partitioned(connection: Connection):
+    if connection.dialect.name != "postgresql":
+        return False
+    return (
+        connection.scalar(
+            text("SELECT relkind FROM pg_class WHERE oid = 'grades'::regclass")
+        )
+        == "p"
+    )
+
+
+def list_partitions(connection: Connection):
+    """List (name, start, end) of the range partitions of grades by start."""
+    rows = connection.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'grades'::regclass"
+        )
+    )
+    partitions = []
+    for name, bound in rows:
+        bounds = parse_bound(bound)
+        if bounds is not None:
+            partitions.append((name, *bounds))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def needed_starts(connection: Connection, source: str, months: int, ahead: int, now):
+    """Interval starts holding rows of the source table, plus the current
+    interval and the next ahead ones."""
+    starts = {
+        interval_start(month, months)
+        for (month,) in connection.execute(
+            text(f"SELECT DISTINCT date_trunc('month', date_received) FROM {source}")
+        )
+    }
+    current = interval_start(now or datetime.now(), months)
+    starts.update(add_months(current, step * months) for step in range(ahead + 1))
+    return starts
+
+
+def create_partition(connection: Connection, start: datetime, end: datetime):
+    """Add the [start, end) partition, moving its rows out of the default one.
+
+    PostgreSQL refuses to attach a range while the default partition still
+    holds rows in it.
+    """
+    name = partition_name(start)
+    connection.execute(text(f"CREATE TABLE {name} (LIKE grades INCLUDING DEFAULTS)"))
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE date_received >= :start AND date_received < :end "
+            f"RETURNING {GRADE_COLUMNS}) "
+            f"INSERT INTO {name} ({GRADE_COLUMNS}) SELECT {GRADE_COLUMNS} FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    connection.execute(
+        text(
+            f"ALTER TABLE grades ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') "
+            f"TO ('{end.isoformat(sep=' ')}')"
+        )
+    )
+    return name
+
+
+def ensure_partitions(connection: Connection, ahead: int = 3, now: datetime = None):
+    """Create the partitions for rows in the default partition and for the next
+    ahead intervals; returns their names. Does nothing unless grades is partitioned.
+
+    The interval is taken from the latest partition.
+    """
+    if not is_partitioned(connection):
+        return []
+    existing = list_partitions(connection)
+    _, start, end = existing[-1]
+    months = months_between(start, end)
+    covered = {partition[1] for partition in existing}
+    starts = needed_starts(connection, DEFAULT_PARTITION, months, ahead, now)
+    return [
+        create_partition(connection, start, add_months(start, months))
+        for start in sorted(starts - covered)
+    ]
+
+
+def id_sequence(connection: Connection):
+    return connection.scalar(text("SELECT pg_get_serial_sequence('grades', 'id')"))
+
+
+def partition_grades(
+    connection: Connection, interval: str = "month", ahead: int = 3, now=None
+):
+    """Rebuild grades as a table partitioned by date_received range on PostgreSQL.
+
+    Partitions cover every interval with grades and the next ahead intervals;
+    a default partition takes the rest. The primary key becomes
+    (id, date_received), as PostgreSQL requires the partition key in it.
+    """
+    if connection.dialect.name != "postgresql" or is_partitioned(connection):
+        return []
+    months = INTERVALS[interval]
+    sequence = id_sequence(connection)
+    for index in Grade.__table__.indexes:
+        connection.execute(DropIndex(index))
+    connection.execute(text("ALTER TABLE grades RENAME TO grades_unpartitioned"))
+    connection.execute(
+        text("ALTER INDEX grades_pkey RENAME TO grades_unpartitioned_pkey")
+    )
+    connection.execute(
+        text(
+            f"CREATE TABLE grades ({GRADE_COLUMNS_DDL.format(sequence=sequence)}, "
+            "CONSTRAINT grades_pkey PRIMARY KEY (id, date_received)"
+            ") PARTITION BY RANGE (date_received)"
+        )
+    )
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY grades.id"))
+    for index in Grade.__table__.indexes:
+        connection.execute(CreateIndex(index))
+    connection.execute(
+        text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF grades DEFAULT")
+    )
+    created = [
+        create_partition(connection, start, add_months(start, months))
+        for start in sorted(
+            needed_starts(connection, "grades_unpartitioned", months, ahead, now)
+        )
+    ]
+    connection.execute(
+        text(
+            f"INSERT INTO grades ({GRADE_COLUMNS}) "
+            f"SELECT {GRADE_COLUMNS} FROM grades_unpartitioned"
+        )
+    )
+    connection.execute(text("DROP TABLE grades_unpartitioned"))
+    return created
+
+
+def unpartition_grades(connection: Connection):
+    """Rebuild a partitioned grades as the plain single table from models.py."""
+    if not is_partitioned(connection):
+        return
+    sequence = id_sequence(connection)
+    for index in Grade.__table__.indexes:
+        connection.execute(DropIndex(index))
+    connection.execute(text("ALTER TABLE grades RENAME TO grades_partitioned"))
+    connection.execute(
+        text("ALTER INDEX grades_pkey RENAME TO grades_partitioned_pkey")
+    )
+    connection.execute(
+        text(
+            f"CREATE TABLE grades ({GRADE_COLUMNS_DDL.format(sequence=sequence)}, "
+            "CONSTRAINT grades_pkey PRIMARY KEY (id))"
+        )
+    )
+    connection.execute(
+        text(
+            f"INSERT INTO grades ({GRADE_COLUMNS}) "
+            f"SELECT {GRADE_COLUMNS} FROM grades_partitioned"
+        )
+    )
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY grades.id"))
+    connection.execute(text("DROP TABLE grades_partitioned"))
+    for index in Grade.__table__.indexes:
+        connection.execute(CreateIndex(index))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Manage the date_received range partitions of grades on PostgreSQL"
+    )
+    parser.add_argument(
+        "--partition",
+        choices=list(INTERVALS),
+        help="Rebuild grades as a partitioned table with this interval",
+    )
+    parser.add_argument(
+        "--unpartition",
+        action="store_true",
+        help="Rebuild grades as a plain table",
+    )
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=3,
+        help="Future intervals that must have a partition",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="Print the partitions and exit"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from connect import engine
+
+    args = parse_args()
+    with engine.begin() as connection:
+        if args.list:
+            if not is_partitioned(connection):
+                print("grades is not partitioned")
+            for name, start, end in list_partitions(connection):
+                print(f"{name}: {start} - {end}")
+        elif args.unpartition:
+            unpartition_grades(connection)
+            logger.info("grades is a plain table")
+        elif args.partition:
+            created = partition_grades(connection, args.partition, args.ahead)
+            logger.info(
+                f"grades partitioned by {args.partition}: {len(created)} partitions"
+            )
+        else:
+            created = ensure_partitions(connection, args.ahead)
+            logger.info(f"Created partitions: {', '.join(created) or 'none'}")
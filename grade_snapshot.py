@@ -0,0 +1,263 @@
+import argparse
+import mmap
+import os
+import shutil
+import stat
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, String
+from sqlalchemy.engine import Connection
+from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
+from grade_loader import batched
+from record_transfer import export_rows
+from logger_provider import console_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = console_logger(__name__)
+
+# File layout, little-endian: a header, one directory entry per column, then
+# every column as a fixed-width array starting on an ALIGNMENT boundary.
+# Integers are int32, timestamps int64 microseconds since EPOCH and names
+# UTF-8 padded with NUL bytes to the longest name of their column.
+MAGIC = b"GRADESNP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIq")  # magic, version, column count, created at
+ENTRY = struct.Struct("<32s32s8sQQ")  # table, column, dtype, rows, offset
+ALIGNMENT = 64
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# Mode of a new snapshot; a replaced snapshot keeps the mode of the old file.
+SNAPSHOT_MODE = 0o644
+
+# Tables in a snapshot. teachers is included so the teacher queries of
+# GradeAnalytics can run from a snapshot too.
+TABLES = [
+    Group.__table__,
+    Teacher.__table__,
+    Subject.__table__,
+    teacher_m2m_subject,
+    Student.__table__,
+    Grade.__table__,
+]
+
+# NumPy dtype -> memoryview format of a column.
+MEMORYVIEW_FORMATS = {"<i4": "i", "<M8[us]": "q"}
+
+
+def align(offset: int):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def column_dtype(column, width: int = 0):
+    if isinstance(column.type, String):
+        return f"|S{max(width, 1)}"
+    if isinstance(column.type, DateTime):
+        return "<M8[us]"
+    return "<i4"
+
+
+def encode_values(dtype: str, values):
+    """Bytes of fixed-width values; names are returned as a list to pad later."""
+    if dtype == "<M8[us]":
+        values = array("q", ((value - EPOCH) // MICROSECOND for value in values))
+    elif dtype == "<i4":
+        values = array("i", values)
+    else:
+        return [value.encode() for value in values]
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def spool_table(connection: Connection, table, batch_size: int):
+    """Stream a table in primary key order into one temporary file per number
+    column and a list per name column; returns (row count, columns)."""
+    columns = []
+    for column in table.c:
+        if isinstance(column.type, String):
+            columns.append([column, []])
+        else:
+            columns.append([column, tempfile.TemporaryFile()])
+    rows = 0
+    for batch in batched(export_rows(connection, table, batch_size), batch_size):
+        rows += len(batch)
+        for index, (column, target) in enumerate(columns):
+            values = encode_values(column_dtype(column), (row[index] for row in batch))
+            if isinstance(target, list):
+                target.extend(values)
+            else:
+                target.write(values)
+    return rows, columns
+
+
+def write_entries(file, entries):
+    created = (datetime.now() - EPOCH) // MICROSECOND
+    file.write(HEADER.pack(MAGIC, VERSION, len(entries), created))
+    for table_name, column_name, dtype, rows, offset, _ in entries:
+        file.write(
+            ENTRY.pack(
+                table_name.encode(), column_name.encode(), dtype.encode(), rows, offset
+            )
+        )
+    for _, _, dtype, _, offset, values in entries:
+        file.write(b"\0" * (offset - file.tell()))
+        if isinstance(values, list):
+            itemsize = int(dtype[2:])
+            file.write(b"".join(value.ljust(itemsize, b"\0") for value in values))
+        else:
+            values.seek(0)
+            shutil.copyfileobj(values, file)
+            values.close()
+
+
+def write_snapshot(connection: Connection, path: str, batch_size: int = 100_000):
+    """Write the snapshot tables to path; returns the row count of each table.
+
+    On PostgreSQL the tables are read in one REPEATABLE READ transaction, so
+    they are consistent with each other. The file is written next to path and
+    renamed over it, so processes mapping the old file keep their copy.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execution_options(isolation_level="REPEATABLE READ")
+    spooled = [(table, *spool_table(connection, table, batch_size)) for table in TABLES]
+    entries = []
+    offset = align(HEADER.size + ENTRY.size * sum(len(table.c) for table in TABLES))
+    for table, rows, columns in spooled:
+        for column, values in columns:
+            if isinstance(values, list):
+                dtype = column_dtype(column, max(map(len, values), default=1))
+                itemsize = int(dtype[2:])
+            else:
+                dtype = column_dtype(column)
+                itemsize = 8 if dtype == "<M8[us]" else 4
+            entries.append((table.name, column.name, dtype, rows, offset, values))
+            offset = align(offset + rows * itemsize)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = SNAPSHOT_MODE
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        try:
+            write_entries(file, entries)
+            # NamedTemporaryFile creates the file readable by its owner only.
+            os.chmod(file.name, mode)
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+    return {table.name: rows for table, rows, _ in spooled}
+
+
+def read_header(buffer, path: str):
+    """Check the magic and version of a snapshot; returns (column count, created at)."""
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"'{path}' is not a grade snapshot")
+    magic, version, count, created = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a grade snapshot")
+    if version != VERSION:
+        raise ValueError(f"'{path}' is snapshot version {version}, expected {VERSION}")
+    return count, created
+
+
+class GradeSnapshot:
+    """A snapshot file mapped read-only into memory.
+
+    Columns are views of the mapping, never copies, so every process that
+    opens the same file shares one page-cache copy of it. Close the snapshot
+    only after dropping the arrays taken from it.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            count, created = read_header(self.buffer, path)
+        except ValueError:
+            self.buffer.close()
+            raise
+        self.created_at = EPOCH + created * MICROSECOND
+        self.columns = {}
+        for index in range(count):
+            table, column, dtype, rows, offset = ENTRY.unpack_from(
+                self.buffer, HEADER.size + index * ENTRY.size
+            )
+            table, column, dtype = (
+                name.rstrip(b"\0").decode() for name in (table, column, dtype)
+            )
+            self.columns[(table, column)] = (dtype, rows, offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.buffer.close()
+
+    def memoryview(self, table: str, column: str):
+        """The column as a memoryview: int32 ('i') or int64 microseconds ('q')
+        values, or a (rows, width) view of bytes for names."""
+        dtype, rows, offset = self.columns[(table, column)]
+        view = memoryview(self.buffer)
+        if dtype.startswith("|S"):
+            if rows == 0:
+                # memoryview cannot cast to a shape with a zero in it.
+                return view[offset:offset]
+            width = int(dtype[2:])
+            return view[offset : offset + rows * width].cast("B", (rows, width))
+        format = MEMORYVIEW_FORMATS[dtype]
+        return view[offset : offset + rows * struct.calcsize(format)].cast(format)
+
+    def array(self, table: str, column: str):
+        """The column as a read-only NumPy array over the mapping."""
+        dtype, rows, offset = self.columns[(table, column)]
+        return np.frombuffer(self.buffer, dtype=dtype, count=rows, offset=offset)
+
+    def tables(self):
+        """{table: {column: array}} of every column in the snapshot."""
+        tables = {}
+        for table, column in self.columns:
+            tables.setdefault(table, {})[column] = self.array(table, column)
+        return tables
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write or inspect a memory-mapped snapshot of the grade tables"
+    )
+    parser.add_argument("action", choices=["export", "info"])
+    parser.add_argument("path", help="Snapshot file")
+    parser.add_argument(
+        "--batch_size", type=int, default=100_000, help="Rows fetched at a time"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.action == "export":
+        from connect import engine
+
+        with engine.connect() as connection:
+            counts = write_snapshot(connection, args.path, args.batch_size)
+        logger.info(
+            f"Snapshot written to {args.path}: "
+            + ", ".join(f"{count} {table}" for table, count in counts.items())
+        )
+    else:
+        with GradeSnapshot(args.path) as snapshot:
+            print(f"Version {VERSION}, created {snapshot.created_at}")
+            for (table, column), (dtype, rows, offset) in snapshot.columns.items():
+                print(f"{table}.{column}: {rows} x {dtype} at {offset}")
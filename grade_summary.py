@@ -0,0 +1,372 @@
+from collections import defaultdict
+from sqlalchemy import and_, bindparam, delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models import (
+    Student,
+    Grade,
+    Subject,
+    Teacher,
+    Group,
+    teacher_m2m_subject,
+    StudentGradeSummary,
+    StudentSubjectGradeSummary,
+    GroupSubjectGradeSummary,
+    SubjectGradeSummary,
+)
+
+# Summary table -> key columns of its buckets in GradeSummaryDelta.
+SUMMARY_KEYS = {
+    StudentGradeSummary.__table__: ("student_id",),
+    StudentSubjectGradeSummary.__table__: ("student_id", "subject_id"),
+    GroupSubjectGradeSummary.__table__: ("group_id", "subject_id"),
+    SubjectGradeSummary.__table__: ("subject_id",),
+}
+
+
+def upsert(connection: Connection, table):
+    """Build an INSERT that adds grade_sum/grade_count to an existing row instead of failing."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(SUMMARY_KEYS[table]),
+        set_={
+            "grade_sum": table.c.grade_sum + statement.excluded.grade_sum,
+            "grade_count": table.c.grade_count + statement.excluded.grade_count,
+        },
+    )
+
+
+class GradeSummaryDelta:
+    """Accumulate grade sum/count changes per summary row and apply them in one go."""
+
+    def __init__(self):
+        self.buckets = {table: defaultdict(lambda: [0, 0]) for table in SUMMARY_KEYS}
+
+    def add(
+        self,
+        student_id: int,
+        group_id: int,
+        subject_id: int,
+        grade_delta: int,
+        count_delta: int,
+    ):
+        keys = {
+            StudentGradeSummary.__table__: (student_id,),
+            StudentSubjectGradeSummary.__table__: (student_id, subject_id),
+            GroupSubjectGradeSummary.__table__: (group_id, subject_id),
+            SubjectGradeSummary.__table__: (subject_id,),
+        }
+        for table, key in keys.items():
+            totals = self.buckets[table][key]
+            totals[0] += grade_delta
+            totals[1] += count_delta
+
+    def track(self, rows, group_ids):
+        """Yield grade rows unchanged while counting them; group_ids maps student to group."""
+        for row in rows:
+            self.add(
+                row["student_id"],
+                group_ids[row["student_id"]],
+                row["subject_id"],
+                row["grade"],
+                1,
+            )
+            yield row
+
+    def apply(self, connection: Connection):
+        """Upsert the accumulated changes and drop summary rows left with no grades."""
+        for table, bucket in self.buckets.items():
+            key_columns = SUMMARY_KEYS[table]
+            changes = [
+                {
+                    **dict(zip(key_columns, key)),
+                    "grade_sum": grade_sum,
+                    "grade_count": grade_count,
+                }
+                # Sorted keys make concurrent writers lock rows in the same order.
+                for key, (grade_sum, grade_count) in sorted(bucket.items())
+                if grade_sum or grade_count
+            ]
+            if changes:
+                connection.execute(upsert(connection, table), changes)
+            emptied = [
+                dict(zip(key_columns, key))
+                for key, (_, grade_count) in bucket.items()
+                if grade_count < 0
+            ]
+            if emptied:
+                connection.execute(
+                    delete(table).where(
+                        and_(
+                            *(
+                                table.c[column] == bindparam(f"key_{column}")
+                                for column in key_columns
+                            )
+                        ),
+                        table.c.grade_count <= 0,
+                    ),
+                    [
+                        {f"key_{column}": row[column] for column in key_columns}
+                        for row in emptied
+                    ],
+                )
+            bucket.clear()
+
+
+def student_group_id(connection: Connection, student_id: int):
+    return connection.scalar(select(Student.group_id).where(Student.id == student_id))
+
+
+def apply_grade_change(
+    connection: Connection,
+    student_id: int,
+    subject_id: int,
+    grade_delta: int,
+    count_delta: int,
+    group_id: int = None,
+):
+    """Record one created (+grade, +1), updated (+diff, 0) or removed (-grade, -1) grade.
+
+    The student's group is looked up unless the caller already knows it.
+    """
+    if group_id is None:
+        group_id = student_group_id(connection, student_id)
+    delta = GradeSummaryDelta()
+    delta.add(
+        student_id,
+        group_id,
+        subject_id,
+        grade_delta,
+        count_delta,
+    )
+    delta.apply(connection)
+
+
+def student_subject_totals(connection: Connection, *conditions):
+    return connection.execute(
+        select(
+            StudentSubjectGradeSummary.student_id,
+            Student.group_id,
+            StudentSubjectGradeSummary.subject_id,
+            StudentSubjectGradeSummary.grade_sum,
+            StudentSubjectGradeSummary.grade_count,
+        )
+        .join(Student, Student.id == StudentSubjectGradeSummary.student_id)
+        .where(*conditions)
+    ).all()
+
+
+def remove_student(connection: Connection, student_id: int):
+    """Subtract every grade of a student that is about to be removed."""
+    delta = GradeSummaryDelta()
+    for row in student_subject_totals(
+        connection, StudentSubjectGradeSummary.student_id == student_id
+    ):
+        delta.add(row[0], row[1], row[2], -row[3], -row[4])
+    delta.apply(connection)
+
+
+def remove_group(connection: Connection, group_id: int):
+    """Subtract the grades of every student of a group that is about to be removed."""
+    delta = GradeSummaryDelta()
+    for row in student_subject_totals(connection, Student.group_id == group_id):
+        delta.add(row[0], row[1], row[2], -row[3], -row[4])
+    delta.apply(connection)
+
+
+def remove_subject(connection: Connection, subject_id: int):
+    """Subtract every grade in a subject that is about to be removed."""
+    delta = GradeSummaryDelta()
+    for row in student_subject_totals(
+        connection, StudentSubjectGradeSummary.subject_id == subject_id
+    ):
+        delta.add(row[0], row[1], row[2], -row[3], -row[4])
+    delta.apply(connection)
+
+
+def move_student(
+    connection: Connection, student_id: int, old_group_id: int, new_group_id: int
+):
+    """Move a student's per-subject totals from one group to another."""
+    if old_group_id == new_group_id:
+        return
+    delta = GradeSummaryDelta()
+    for row in student_subject_totals(
+        connection, StudentSubjectGradeSummary.student_id == student_id
+    ):
+        delta.add(row[0], old_group_id, row[2], -row[3], -row[4])
+        delta.add(row[0], new_group_id, row[2], row[3], row[4])
+    delta.apply(connection)
+
+
+def summary_queries():
+    """Build the aggregates over grades that each summary table must match."""
+    return {
+        StudentGradeSummary.__table__: select(
+            Grade.student_id,
+            func.sum(Grade.grade),
+            func.count(Grade.id),
+        ).group_by(Grade.student_id),
+        StudentSubjectGradeSummary.__table__: select(
+            Grade.student_id,
+            Grade.subject_id,
+            func.sum(Grade.grade),
+            func.count(Grade.id),
+        ).group_by(Grade.student_id, Grade.subject_id),
+        GroupSubjectGradeSummary.__table__: select(
+            Student.group_id,
+            Grade.subject_id,
+            func.sum(Grade.grade),
+            func.count(Grade.id),
+        )
+        .join(Student, Student.id == Grade.student_id)
+        .group_by(Student.group_id, Grade.subject_id),
+        SubjectGradeSummary.__table__: select(
+            Grade.subject_id,
+            func.sum(Grade.grade),
+            func.count(Grade.id),
+        ).group_by(Grade.subject_id),
+    }
+
+
+def rebuild_summaries(connection: Connection):
+    """Recompute every summary table from scratch out of the grades table."""
+    for table, query in summary_queries().items():
+        connection.execute(delete(table))
+        connection.execute(
+            insert(table).from_select(
+                list(SUMMARY_KEYS[table]) + ["grade_sum", "grade_count"], query
+            )
+        )
+
+
+def check_summaries(connection: Connection):
+    """Compare the summaries with a fresh aggregation of grades.
+
+    Returns (table name, key, stored totals, expected totals) for every mismatch;
+    an empty list means the summaries are consistent.
+    """
+    differences = []
+    for table, query in summary_queries().items():
+        key_size = len(SUMMARY_KEYS[table])
+        expected = {
+            tuple(row[:key_size]): tuple(row[key_size:])
+            for row in connection.execute(query)
+        }
+        stored = {
+            tuple(row[:key_size]): tuple(row[key_size:])
+            for row in connection.execute(
+                select(
+                    *(table.c[column] for column in SUMMARY_KEYS[table]),
+                    table.c.grade_sum,
+                    table.c.grade_count,
+                )
+            )
+        }
+        for key in sorted(expected.keys() | stored.keys()):
+            if expected.get(key) != stored.get(key):
+                differences.append(
+                    (table.name, key, stored.get(key), expected.get(key))
+                )
+    return differences
+
+
+def average(summary):
+    return func.sum(summary.grade_sum) * 1.0 / func.sum(summary.grade_count)
+
+
+def select_1(session: Session):
+    """Find the top 5 students with the highest average grade, from the summaries."""
+    average_grade = (
+        StudentGradeSummary.grade_sum * 1.0 / StudentGradeSummary.grade_count
+    )
+    return (
+        session.query(Student.name.label("name"), average_grade.label("average_grade"))
+        .join(StudentGradeSummary, StudentGradeSummary.student_id == Student.id)
+        .order_by(average_grade.desc())
+        .limit(5)
+        .all()
+    )
+
+
+def select_2(session: Session, subject_name: str):
+    """Find the student with the highest average grade in a subject, from the summaries."""
+    return (
+        session.query(
+            Student.name.label("name"),
+            average(StudentSubjectGradeSummary).label("average_grade"),
+        )
+        .join(
+            StudentSubjectGradeSummary,
+            StudentSubjectGradeSummary.student_id == Student.id,
+        )
+        .join(Subject, Subject.id == StudentSubjectGradeSummary.subject_id)
+        .filter(Subject.name == subject_name)
+        .group_by(Student.id)
+        .order_by(average(StudentSubjectGradeSummary).desc())
+        .first()
+    )
+
+
+def select_3(session: Session, subject_name: str):
+    """Find the average grade in groups for a subject, from the summaries."""
+    return (
+        session.query(
+            Group.name.label("name"),
+            average(GroupSubjectGradeSummary).label("average_grade"),
+        )
+        .join(GroupSubjectGradeSummary, GroupSubjectGradeSummary.group_id == Group.id)
+        .join(Subject, Subject.id == GroupSubjectGradeSummary.subject_id)
+        .filter(Subject.name == subject_name)
+        .group_by(Group.id)
+        .all()
+    )
+
+
+def select_4(session: Session):
+    """Find the average grade across all grades, from the summaries."""
+    return session.query(average(SubjectGradeSummary)).scalar()
+
+
+def select_8(session: Session, teacher_name: str):
+    """Find the average grade given by a teacher across their subjects, from the summaries."""
+    return (
+        session.query(average(SubjectGradeSummary).label("average_grade"))
+        .join(
+            teacher_m2m_subject,
+            teacher_m2m_subject.c.subject_id == SubjectGradeSummary.subject_id,
+        )
+        .join(Teacher, Teacher.id == teacher_m2m_subject.c.teacher_id)
+        .filter(Teacher.name == teacher_name)
+        .scalar()
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from connect import engine
+    from logger_provider import console_logger
+
+    logger = console_logger("GradeSummary")
+    parser = argparse.ArgumentParser(description="Maintain grade summary tables")
+    parser.add_argument(
+        "action", choices=["check", "rebuild"], help="Diff or rebuild the summaries"
+    )
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        if args.action == "rebuild":
+            rebuild_summaries(connection)
+            logger.info("Grade summaries rebuilt")
+        else:
+            differences = check_summaries(connection)
+            for table_name, key, stored, expected in differences:
+                logger.warning(
+                    f"{table_name} {key}: stored {stored}, expected {expected}"
+                )
+            logger.info(f"{len(differences)} summary rows differ from grades")
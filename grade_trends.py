@@ -0,0 +1,353 @@
+from datetime import datetime, timedelta
+from sqlalchemy import (
+    DateTime,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models import (
+    Student,
+    Grade,
+    Subject,
+    StudentGradeTrend,
+    SubjectGradeTrend,
+    GradeTrendChange,
+    GradeTrendRefresh,
+)
+from my_select import date_range
+from grade_loader import batched
+
+PERIODS = ("week", "month")
+
+# Scope -> (trend table, grade column it buckets by, table holding the name).
+SCOPES = {
+    "student": (StudentGradeTrend.__table__, Grade.student_id, Student),
+    "subject": (SubjectGradeTrend.__table__, Grade.subject_id, Subject),
+}
+
+# Key of the single grade_trend_refreshes row, written once the trends are built.
+REFRESH_ID = 1
+# Logged buckets recomputed per statement.
+CHANGE_BATCH_SIZE = 500
+
+# SQLite datetime() modifiers that move a timestamp to the start of its period.
+# Weeks start on Monday, as with date_trunc('week', ...) on PostgreSQL.
+SQLITE_MODIFIERS = {
+    "week": ("start of day", "weekday 0", "-6 days"),
+    "month": ("start of month",),
+}
+
+
+def bucket_start(connection: Connection, period: str, column=Grade.date_received):
+    """SQL expression for the start of the week or month holding column.
+
+    The period is rendered inline, so the expression is identical in the
+    SELECT list and in GROUP BY.
+    """
+    if connection.dialect.name == "postgresql":
+        return func.date_trunc(literal_column(f"'{period}'"), column)
+    # Stored like the timestamps SQLAlchemy writes, so they compare as strings.
+    start = func.datetime(
+        column,
+        *(literal_column(f"'{modifier}'") for modifier in SQLITE_MODIFIERS[period]),
+    ).op("||")(literal_column("'.000000'"))
+    return type_coerce(start, DateTime)
+
+
+def truncate(period: str, value: datetime):
+    """Python counterpart of bucket_start."""
+    day = datetime(value.year, value.month, value.day)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def recompute(
+    connection: Connection, scope: str, period: str, start=None, buckets=None
+):
+    """Rebuild the period buckets of a scope from start on, or only the given
+    (student or subject id, bucket start) buckets; returns buckets written."""
+    table, key, _ = SCOPES[scope]
+    column = table.c[key.name]
+    bucket = bucket_start(connection, period)
+    deleted = [table.c.period == period]
+    # Grades without a date fall in no bucket.
+    selected = [Grade.date_received.is_not(None)]
+    if start is not None:
+        deleted.append(table.c.bucket_start >= start)
+        selected.append(Grade.date_received >= start)
+    if buckets is not None:
+        deleted.append(tuple_(column, table.c.bucket_start).in_(buckets))
+        selected.extend(
+            [
+                key.in_({key_id for key_id, _ in buckets}),
+                Grade.date_received >= min(start for _, start in buckets),
+                tuple_(key, bucket).in_(buckets),
+            ]
+        )
+    connection.execute(delete(table).where(*deleted))
+
+    return connection.execute(
+        insert(table).from_select(
+            [column.name, "period", "bucket_start", "grade_sum", "grade_count"],
+            select(
+                key,
+                literal(period),
+                bucket,
+                func.sum(Grade.grade),
+                func.count(Grade.id),
+            )
+            .where(*selected)
+            .group_by(key, bucket),
+        )
+    ).rowcount
+
+
+class GradeTrendChanges:
+    """Collect the trend buckets that grade writes touch and log them in one go."""
+
+    def __init__(self):
+        self.buckets = set()
+
+    def add(self, student_id: int, subject_id: int, date_received: datetime):
+        if date_received is None:
+            return
+        for period in PERIODS:
+            start = truncate(period, date_received)
+            self.buckets.add(("student", student_id, period, start))
+            self.buckets.add(("subject", subject_id, period, start))
+
+    def apply(self, connection: Connection):
+        """Log the collected buckets for the next refresh_trends."""
+        if self.buckets:
+            connection.execute(
+                insert(GradeTrendChange),
+                [
+                    dict(zip(("scope", "key_id", "period", "bucket_start"), bucket))
+                    for bucket in self.buckets
+                ],
+            )
+        self.buckets.clear()
+
+
+def log_grade_change(
+    connection: Connection, student_id: int, subject_id: int, *dates: datetime
+):
+    """Log the buckets of one created, updated or removed grade.
+
+    An update passes both the old and the new date_received.
+    """
+    changes = GradeTrendChanges()
+    for date_received in dates:
+        changes.add(student_id, subject_id, date_received)
+    changes.apply(connection)
+
+
+def log_grades(connection: Connection, *conditions):
+    """Log the buckets of every grade matching conditions, in SQL."""
+    for scope, (_, key, _) in SCOPES.items():
+        for period in PERIODS:
+            connection.execute(
+                insert(GradeTrendChange).from_select(
+                    ["scope", "key_id", "period", "bucket_start"],
+                    select(
+                        literal(scope),
+                        key,
+                        literal(period),
+                        bucket_start(connection, period),
+                    )
+                    .where(*conditions)
+                    .distinct(),
+                )
+            )
+
+
+def remove_student(connection: Connection, student_id: int):
+    """Log the buckets of every grade of a student that is about to be removed."""
+    log_grades(connection, Grade.student_id == student_id)
+
+
+def remove_group(connection: Connection, group_id: int):
+    """Log the buckets of the grades of a group that is about to be removed."""
+    log_grades(
+        connection,
+        Grade.student_id.in_(select(Student.id).where(Student.group_id == group_id)),
+    )
+
+
+def remove_subject(connection: Connection, subject_id: int):
+    """Log the buckets of every grade in a subject that is about to be removed."""
+    log_grades(connection, Grade.subject_id == subject_id)
+
+
+def mark_refreshed(connection: Connection):
+    """Upsert the single grade_trend_refreshes row."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(GradeTrendRefresh).values(id=REFRESH_ID)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"refreshed_at": statement.excluded.refreshed_at},
+        )
+    )
+
+
+def refresh_trends(connection: Connection, since: datetime = None, full: bool = False):
+    """Recompute the trend buckets that changed since the last refresh; returns the
+    number of buckets written.
+
+    crud, imports and seeding log the buckets of every grade they create, update
+    or remove in grade_trend_changes, and a refresh recomputes just those. The
+    first refresh and full rebuild everything. since also recomputes every bucket
+    from its date on, for grades written some other way.
+    """
+    # Taking the log with DELETE ... RETURNING leaves changes that commit
+    # meanwhile for the next refresh.
+    logged = connection.execute(
+        delete(GradeTrendChange).returning(
+            GradeTrendChange.scope,
+            GradeTrendChange.key_id,
+            GradeTrendChange.period,
+            GradeTrendChange.bucket_start,
+        )
+    ).all()
+    if connection.scalar(select(GradeTrendRefresh.id)) is None:
+        full = True
+    changed = {}
+    for scope, key_id, period, start in logged:
+        changed.setdefault((scope, period), set()).add((key_id, start))
+
+    written = 0
+    for scope in SCOPES:
+        for period in PERIODS:
+            if full:
+                written += recompute(connection, scope, period)
+                continue
+            buckets = changed.get((scope, period), set())
+            if since is not None:
+                start = truncate(period, since)
+                written += recompute(connection, scope, period, start)
+                buckets = {bucket for bucket in buckets if bucket[1] < start}
+            for batch in batched(sorted(buckets), CHANGE_BATCH_SIZE):
+                written += recompute(connection, scope, period, buckets=batch)
+    mark_refreshed(connection)
+    return written
+
+
+def select_trends(
+    session: Session,
+    scope: str = "student",
+    period: str = "week",
+    key_id: int = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the average grade per week or month of every student or subject.
+
+    Reads the buckets written by refresh_trends. Each row also carries the
+    previous bucket's average of the same student or subject, from LAG().
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope: {scope}")
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    table, key, model = SCOPES[scope]
+    column = table.c[key.name]
+    average_grade = table.c.grade_sum * 1.0 / table.c.grade_count
+    conditions = [table.c.period == period]
+    if key_id is not None:
+        conditions.append(column == key_id)
+    if date_from is not None:
+        conditions.append(table.c.bucket_start >= truncate(period, date_from))
+    if date_to is not None:
+        conditions.append(table.c.bucket_start < date_to)
+    return (
+        session.query(
+            column.label("key_id"),
+            model.name.label("name"),
+            table.c.bucket_start,
+            average_grade.label("average_grade"),
+            table.c.grade_count,
+            func.lag(average_grade)
+            .over(partition_by=column, order_by=table.c.bucket_start)
+            .label("previous_average"),
+        )
+        .select_from(table)
+        .join(model, model.id == column)
+        .filter(*conditions)
+        .order_by(column, table.c.bucket_start)
+        .all()
+    )
+
+
+def select_rolling_averages(
+    session: Session,
+    scope: str = "student",
+    lessons: int = 5,
+    key_id: int = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the average of every grade and the lessons - 1 grades before it of
+    the same student or subject.
+
+    Computed from grades with a window function, so it needs no refresh. With
+    a date range, the window only sees grades within it.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope: {scope}")
+    if lessons < 1:
+        raise ValueError("lessons must be at least 1")
+    key = SCOPES[scope][1]
+    conditions = date_range(date_from, date_to)
+    if key_id is not None:
+        conditions.append(key == key_id)
+    return (
+        session.query(
+            key.label("key_id"),
+            Grade.id.label("grade_id"),
+            Grade.date_received,
+            Grade.grade,
+            func.avg(Grade.grade)
+            .over(
+                partition_by=key,
+                order_by=(Grade.date_received, Grade.id),
+                rows=(-(lessons - 1), 0),
+            )
+            .label("rolling_average"),
+        )
+        .filter(*conditions)
+        .order_by(key, Grade.date_received, Grade.id)
+        .all()
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from connect import engine
+    from logger_provider import console_logger
+
+    logger = console_logger("GradeTrends")
+    parser = argparse.ArgumentParser(description="Refresh the grade trend buckets")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Also recompute every bucket from this date on",
+    )
+    parser.add_argument("--full", action="store_true", help="Recompute every bucket")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        written = refresh_trends(connection, args.since, args.full)
+    logger.info(f"{written} trend buckets written")
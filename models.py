@@ -7,6 +7,8 @@ from sqlalchemy import (
     DateTime,
     Table,
     PrimaryKeyConstraint,
+    Index,
+    BigInteger,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -18,9 +20,14 @@ class Base(DeclarativeBase):
 teacher_m2m_subject = Table(
     "teacher_m2m_subject",
     Base.metadata,
-    Column("teacher_id", ForeignKey("teachers.id"), primary_key=True),
-    Column("subject_id", ForeignKey("subjects.id"), primary_key=True),
+    Column(
+        "teacher_id", ForeignKey("teachers.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Column(
+        "subject_id", ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True
+    ),
     PrimaryKeyConstraint("teacher_id", "subject_id"),
+    Index("ix_teacher_m2m_subject_subject_id", "subject_id"),
 )
 
 
@@ -28,10 +35,12 @@ class Student(Base):
     __tablename__ = "students"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
-    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"))
+    name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    group_id: Mapped[int] = mapped_column(
+        ForeignKey("groups.id", ondelete="CASCADE"), index=True
+    )
 
-    group = relationship("Group", back_populates="students", cascade="all")
+    group = relationship("Group", back_populates="students")
     grades = relationship(
         "Grade", back_populates="student", cascade="all, delete-orphan"
     )
@@ -58,7 +67,7 @@ class Teacher(Base):
     __tablename__ = "teachers"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
 
     subjects = relationship(
         "Subject", secondary=teacher_m2m_subject, back_populates="teachers"
@@ -72,7 +81,7 @@ class Subject(Base):
     __tablename__ = "subjects"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
 
     teachers = relationship(
         "Teacher", secondary=teacher_m2m_subject, back_populates="subjects"
@@ -87,10 +96,23 @@ class Subject(Base):
 
 class Grade(Base):
     __tablename__ = "grades"
+    __table_args__ = (
+        Index("ix_grades_subject_id_student_id", "subject_id", "student_id"),
+        Index(
+            "ix_grades_student_id_subject_id_date_received",
+            "student_id",
+            "subject_id",
+            "date_received",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    student_id: Mapped[int] = mapped_column(ForeignKey("students.id"))
-    subject_id: Mapped[int] = mapped_column(ForeignKey("subjects.id"))
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE")
+    )
+    subject_id: Mapped[int] = mapped_column(
+        ForeignKey("subjects.id", ondelete="CASCADE")
+    )
     grade: Mapped[int] = mapped_column(Integer, nullable=False)
     date_received: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -99,3 +121,116 @@ class Grade(Base):
 
     def __repr__(self):
         return f"<Grade(id={self.id}, student_id={self.student_id}, subject_id={self.subject_id}, grade={self.grade}, date_received={self.date_received})>"
+
+
+class StudentGradeSummary(Base):
+    __tablename__ = "student_grade_summaries"
+
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"), primary_key=True
+    )
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<StudentGradeSummary(student_id={self.student_id}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class StudentSubjectGradeSummary(Base):
+    __tablename__ = "student_subject_grade_summaries"
+
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"), primary_key=True
+    )
+    subject_id: Mapped[int] = mapped_column(
+        ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<StudentSubjectGradeSummary(student_id={self.student_id}, subject_id={self.subject_id}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class GroupSubjectGradeSummary(Base):
+    __tablename__ = "group_subject_grade_summaries"
+
+    group_id: Mapped[int] = mapped_column(
+        ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    subject_id: Mapped[int] = mapped_column(
+        ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<GroupSubjectGradeSummary(group_id={self.group_id}, subject_id={self.subject_id}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class SubjectGradeSummary(Base):
+    __tablename__ = "subject_grade_summaries"
+
+    subject_id: Mapped[int] = mapped_column(
+        ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True
+    )
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SubjectGradeSummary(subject_id={self.subject_id}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class StudentGradeTrend(Base):
+    __tablename__ = "student_grade_trends"
+
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"), primary_key=True
+    )
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<StudentGradeTrend(student_id={self.student_id}, period='{self.period}', bucket_start={self.bucket_start}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class SubjectGradeTrend(Base):
+    __tablename__ = "subject_grade_trends"
+
+    subject_id: Mapped[int] = mapped_column(
+        ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True
+    )
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SubjectGradeTrend(subject_id={self.subject_id}, period='{self.period}', bucket_start={self.bucket_start}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+class GradeTrendChange(Base):
+    __tablename__ = "grade_trend_changes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scope: Mapped[str] = mapped_column(String(10), nullable=False)
+    key_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    period: Mapped[str] = mapped_column(String(10), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<GradeTrendChange(id={self.id}, scope='{self.scope}', key_id={self.key_id}, period='{self.period}', bucket_start={self.bucket_start})>"
+
+
+class GradeTrendRefresh(Base):
+    __tablename__ = "grade_trend_refreshes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<GradeTrendRefresh(id={self.id}, refreshed_at={self.refreshed_at})>"
@@ -1,8 +1,8 @@
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
-from connect import session
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from random_util import (
     get_random_subject_name,
     get_random_teacher_name,
@@ -11,13 +11,28 @@ from random_util import (
 )
 
 
-def select_1(session: Session):
+def date_range(date_from: datetime = None, date_to: datetime = None):
+    """Conditions keeping grades received from date_from up to, not including, date_to.
+
+    Either bound may be None. On PostgreSQL with partitioned grades the bounds
+    let the planner skip the partitions outside them.
+    """
+    conditions = []
+    if date_from is not None:
+        conditions.append(Grade.date_received >= date_from)
+    if date_to is not None:
+        conditions.append(Grade.date_received < date_to)
+    return conditions
+
+
+def select_1(session: Session, date_from: datetime = None, date_to: datetime = None):
     """Find the top 5 students with the highest average grade across all subjects."""
     return (
         session.query(
             Student.name.label("name"), func.avg(Grade.grade).label("average_grade")
         )
         .join(Grade)
+        .filter(*date_range(date_from, date_to))
         .group_by(Student.id)
         .order_by(func.avg(Grade.grade).desc())
         .limit(5)
@@ -25,7 +40,12 @@ def select_1(session: Session):
     )
 
 
-def select_2(session: Session, subject_name: str):
+def select_2(
+    session: Session,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the student with the highest average grade in a specific subject."""
     return (
         session.query(
@@ -34,14 +54,76 @@ def select_2(session: Session, subject_name: str):
         )
         .join(Grade)
         .join(Subject)
-        .filter(Subject.name == subject_name)
+        .filter(Subject.name == subject_name, *date_range(date_from, date_to))
         .group_by(Student.id)
         .order_by(func.avg(Grade.grade).desc())
         .first()
     )
 
 
-def select_3(session: Session, subject_name: str):
+# Ranking function name -> SQL window function used by select_top_students.
+RANK_FUNCTIONS = {"row_number": func.row_number, "rank": func.rank}
+
+
+def select_top_students(
+    session: Session,
+    k: int = 3,
+    by: str = "subject",
+    ranking: str = "row_number",
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the top k students by average grade in every subject or every group.
+
+    One query ranks the grouped averages with a window function. With
+    ranking="rank" students tied on average share a rank, so a partition may
+    return more than k rows; "row_number" breaks ties by student id.
+    """
+    if by == "subject":
+        partition = Subject
+        query = session.query().select_from(Grade).join(Subject).join(Student)
+    elif by == "group":
+        partition = Group
+        query = session.query().select_from(Grade).join(Student).join(Group)
+    else:
+        raise ValueError(f"Unknown partition: {by}")
+    if ranking not in RANK_FUNCTIONS:
+        raise ValueError(f"Unknown ranking: {ranking}")
+
+    average_grade = func.avg(Grade.grade)
+    order_by = [average_grade.desc()]
+    if ranking == "row_number":
+        order_by.append(Student.id)
+    ranked = (
+        query.add_columns(
+            partition.name.label(f"{by}_name"),
+            Student.name.label("name"),
+            average_grade.label("average_grade"),
+            RANK_FUNCTIONS[ranking]()
+            .over(
+                partition_by=partition.id,
+                order_by=order_by,
+            )
+            .label("rank"),
+        )
+        .filter(*date_range(date_from, date_to))
+        .group_by(partition.id, Student.id)
+        .subquery()
+    )
+    return (
+        session.query(ranked)
+        .filter(ranked.c.rank <= k)
+        .order_by(ranked.c[f"{by}_name"], ranked.c.rank, ranked.c.name)
+        .all()
+    )
+
+
+def select_3(
+    session: Session,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the average grade in groups for a specific subject."""
     return (
         session.query(
@@ -51,15 +133,19 @@ def select_3(session: Session, subject_name: str):
         .join(Student, Group.id == Student.group_id)
         .join(Grade, Student.id == Grade.student_id)
         .join(Subject, Grade.subject_id == Subject.id)
-        .filter(Subject.name == subject_name)
+        .filter(Subject.name == subject_name, *date_range(date_from, date_to))
         .group_by(Group.id)
         .all()
     )
 
 
-def select_4(session: Session):
+def select_4(session: Session, date_from: datetime = None, date_to: datetime = None):
     """Find the average grade across all grades."""
-    return session.query(func.avg(Grade.grade)).scalar()
+    return (
+        session.query(func.avg(Grade.grade))
+        .filter(*date_range(date_from, date_to))
+        .scalar()
+    )
 
 
 def select_5(session: Session, teacher_name: str):
@@ -80,55 +166,204 @@ def select_6(session: Session, group_name: str):
     )
 
 
-def select_7(session: Session, group_name: str, subject_name: str):
+def select_7(
+    session: Session,
+    group_name: str,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the grades of students in a specific group for a specific subject."""
     return (
         session.query(Student.name, Grade.grade)
         .join(Group)
         .join(Grade)
         .join(Subject)
-        .filter(Group.name == group_name, Subject.name == subject_name)
+        .filter(
+            Group.name == group_name,
+            Subject.name == subject_name,
+            *date_range(date_from, date_to),
+        )
         .all()
     )
 
 
-def select_8(session: Session, teacher_name: str):
+def select_8(
+    session: Session,
+    teacher_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the average grade given by a specific teacher across their subjects."""
     return (
         session.query(func.avg(Grade.grade).label("average_grade"))
         .join(Subject)
         .join(Subject.teachers)
-        .filter(Teacher.name == teacher_name)
+        .filter(Teacher.name == teacher_name, *date_range(date_from, date_to))
         .scalar()
     )
 
 
-def select_9(session: Session, student_name: str):
+def select_9(
+    session: Session,
+    student_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the list of courses attended by a specific student."""
     return (
         session.query(Subject.name)
         .join(Grade)
         .join(Student)
-        .filter(Student.name == student_name)
+        .filter(Student.name == student_name, *date_range(date_from, date_to))
         .distinct()
         .all()
     )
 
 
-def select_10(session: Session, student_name: str, teacher_name: str):
+def select_10(
+    session: Session,
+    student_name: str,
+    teacher_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
     """Find the list of courses taught by a specific teacher to a specific student."""
     return (
         session.query(Subject.name)
         .join(Grade)
         .join(Subject.teachers)
         .join(Student)
-        .filter(Student.name == student_name, Teacher.name == teacher_name)
+        .filter(
+            Student.name == student_name,
+            Teacher.name == teacher_name,
+            *date_range(date_from, date_to),
+        )
         .distinct()
         .all()
     )
 
 
+def group_rows(rows, keys, key_size: int = 1):
+    """Split (key..., column...) rows into {key: [rows without the key columns]}.
+
+    Every requested key is present, with an empty list when nothing matched.
+    """
+    grouped = {key: [] for key in keys}
+    if rows:
+        row_type = namedtuple("Row", rows[0]._fields[key_size:])
+        for row in rows:
+            key = row[0] if key_size == 1 else tuple(row[:key_size])
+            grouped[key].append(row_type(*row[key_size:]))
+    return grouped
+
+
+def select_5_batch(session: Session, teacher_names):
+    """Find the courses taught by each of several teachers in one query."""
+    teacher_names = list(dict.fromkeys(teacher_names))
+    rows = (
+        session.query(Teacher.name.label("key"), Subject.name)
+        .select_from(Subject)
+        .join(teacher_m2m_subject, Subject.id == teacher_m2m_subject.c.subject_id)
+        .join(Teacher, teacher_m2m_subject.c.teacher_id == Teacher.id)
+        .filter(Teacher.name.in_(teacher_names))
+        .all()
+    )
+    return group_rows(rows, teacher_names)
+
+
+def select_6_batch(session: Session, group_names):
+    """Find the list of students in each of several groups in one query."""
+    group_names = list(dict.fromkeys(group_names))
+    rows = (
+        session.query(Group.name.label("key"), Student.name)
+        .select_from(Student)
+        .join(Group)
+        .filter(Group.name.in_(group_names))
+        .all()
+    )
+    return group_rows(rows, group_names)
+
+
+def select_7_batch(
+    session: Session,
+    group_subject_names,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the grades of students for several (group, subject) pairs in one query."""
+    pairs = list(dict.fromkeys(map(tuple, group_subject_names)))
+    rows = (
+        session.query(
+            Group.name.label("group_key"),
+            Subject.name.label("subject_key"),
+            Student.name,
+            Grade.grade,
+        )
+        .select_from(Student)
+        .join(Group)
+        .join(Grade)
+        .join(Subject)
+        .filter(
+            tuple_(Group.name, Subject.name).in_(pairs),
+            *date_range(date_from, date_to),
+        )
+        .all()
+    )
+    return group_rows(rows, pairs, key_size=2)
+
+
+def select_9_batch(
+    session: Session,
+    student_names,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the list of courses attended by each of several students in one query."""
+    student_names = list(dict.fromkeys(student_names))
+    rows = (
+        session.query(Student.name.label("key"), Subject.name)
+        .select_from(Subject)
+        .join(Grade)
+        .join(Student)
+        .filter(Student.name.in_(student_names), *date_range(date_from, date_to))
+        .distinct()
+        .all()
+    )
+    return group_rows(rows, student_names)
+
+
+def select_10_batch(
+    session: Session,
+    student_teacher_names,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the courses taught to several (student, teacher) pairs in one query."""
+    pairs = list(dict.fromkeys(map(tuple, student_teacher_names)))
+    rows = (
+        session.query(
+            Student.name.label("student_key"),
+            Teacher.name.label("teacher_key"),
+            Subject.name,
+        )
+        .select_from(Subject)
+        .join(Grade)
+        .join(Subject.teachers)
+        .join(Student)
+        .filter(
+            tuple_(Student.name, Teacher.name).in_(pairs),
+            *date_range(date_from, date_to),
+        )
+        .distinct()
+        .all()
+    )
+    return group_rows(rows, pairs, key_size=2)
+
+
 if __name__ == "__main__":
+    from connect import session
+
     print("Top 5 students with the highest average grade across all subjects:")
     top_students = select_1(session)
     for student in top_students:
@@ -141,6 +376,10 @@ if __name__ == "__main__":
     student_for_subject = select_2(session, random_subject)
     print(f"{student_for_subject.name} - {student_for_subject.average_grade:.2f}")
 
+    print("\nTop 3 students in every subject:")
+    for row in select_top_students(session, 3, "subject"):
+        print(f"{row.subject_name} #{row.rank}: {row.name} - {row.average_grade:.2f}")
+
     print(
         f"\nAverage grade in groups for a specific subject (subject={random_subject}):"
     )
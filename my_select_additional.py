@@ -1,6 +1,10 @@
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, select
+from sqlalchemy import and_, func, desc, select
 from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
+from my_select import date_range
 from random_util import (
     get_random_subject_name,
     get_random_teacher_name,
@@ -10,7 +14,11 @@ from random_util import (
 
 
 def select_average_grade_teacher_to_student(
-    session: Session, teacher_name: str, student_name: str
+    session: Session,
+    teacher_name: str,
+    student_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
 ):
     """Find the average grade given by a specific teacher to a specific student."""
     return (
@@ -18,20 +26,37 @@ def select_average_grade_teacher_to_student(
         .join(Subject)
         .join(Subject.teachers)
         .join(Student)
-        .filter(Teacher.name == teacher_name, Student.name == student_name)
+        .filter(
+            Teacher.name == teacher_name,
+            Student.name == student_name,
+            *date_range(date_from, date_to),
+        )
         .scalar()
     )
 
 
-def select_grades_last_lesson(session: Session, group_name: str, subject_name: str):
-    """Find the grades of students in a specific group for a specific subject on the last lesson."""
+def select_grades_last_lesson(
+    session: Session,
+    group_name: str,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the grades of students in a specific group for a specific subject on the last lesson.
+
+    With a date range, the last lesson is the last one within it.
+    """
 
     subquery = (
         select(func.max(Grade.date_received))
         .join(Student)
         .join(Group)
         .join(Subject)
-        .where(Group.name == group_name, Subject.name == subject_name)
+        .where(
+            Group.name == group_name,
+            Subject.name == subject_name,
+            *date_range(date_from, date_to),
+        )
         .scalar_subquery()
     )
 
@@ -50,12 +75,76 @@ def select_grades_last_lesson(session: Session, group_name: str, subject_name: s
             Group.name == group_name,
             Subject.name == subject_name,
             Grade.date_received == subquery,
+            *date_range(date_from, date_to),
         )
     )
 
     return session.execute(query).all()
 
 
+LessonRow = namedtuple(
+    "Row", "grade_id student_name subject_name grade_value date_received"
+)
+
+
+def select_grades_last_lessons(
+    session: Session,
+    date_from: datetime = None,
+    date_to: datetime = None,
+    batch_size: int = 1000,
+):
+    """Find the grades on the last lesson of every group in every subject in one query.
+
+    Yields ((group_name, subject_name), rows) in name order, where rows are what
+    select_grades_last_lesson returns for the pair: every grade at its latest
+    date_received, so ties are kept. The latest dates come from one GROUP BY,
+    joined back to grades; rows are fetched batch_size at a time.
+    """
+    last = (
+        select(
+            Student.group_id,
+            Subject.name.label("subject_name"),
+            func.max(Grade.date_received).label("date_received"),
+        )
+        .select_from(Grade)
+        .join(Student)
+        .join(Subject)
+        .where(*date_range(date_from, date_to))
+        .group_by(Student.group_id, Subject.name)
+        .subquery("last_lessons")
+    )
+    query = (
+        select(
+            Group.name.label("group_name"),
+            Grade.id.label("grade_id"),
+            Student.name.label("student_name"),
+            Subject.name.label("subject_name"),
+            Grade.grade.label("grade_value"),
+            Grade.date_received.label("date_received"),
+        )
+        .select_from(last)
+        .join(Group, Group.id == last.c.group_id)
+        .join(Subject, Subject.name == last.c.subject_name)
+        .join(
+            Grade,
+            and_(
+                Grade.subject_id == Subject.id,
+                Grade.date_received == last.c.date_received,
+            ),
+        )
+        .join(
+            Student,
+            and_(Student.id == Grade.student_id, Student.group_id == Group.id),
+        )
+        .order_by(Group.name, Subject.name, Grade.id)
+    )
+    rows = session.execute(query, execution_options={"yield_per": batch_size})
+    for key, pair_rows in groupby(
+        rows, key=lambda row: (row.group_name, row.subject_name)
+    ):
+        yield key, [LessonRow(*row[1:]) for row in pair_rows]
+
+
 if __name__ == "__main__":
     from connect import session
 
@@ -86,3 +175,10 @@ if __name__ == "__main__":
             print(
                 f"Student: {student_name}, Subject: {subject_name}, Grade: {grade_value}, Date: {date_received}"
             )
+
+    print("\nLast lesson of every group in every subject:")
+    for (group_name, subject_name), grades in select_grades_last_lessons(session):
+        print(
+            f"{group_name}, {subject_name}, {grades[0].date_received}: "
+            + ", ".join(f"{grade.student_name} {grade.grade_value}" for grade in grades)
+        )
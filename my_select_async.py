@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import my_select
+import my_select_additional
+
+
+async def select_1(
+    session: AsyncSession, date_from: datetime = None, date_to: datetime = None
+):
+    """Find the top 5 students with the highest average grade across all subjects."""
+    return await session.run_sync(my_select.select_1, date_from, date_to)
+
+
+async def select_2(
+    session: AsyncSession,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the student with the highest average grade in a specific subject."""
+    return await session.run_sync(my_select.select_2, subject_name, date_from, date_to)
+
+
+async def select_3(
+    session: AsyncSession,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the average grade in groups for a specific subject."""
+    return await session.run_sync(my_select.select_3, subject_name, date_from, date_to)
+
+
+async def select_4(
+    session: AsyncSession, date_from: datetime = None, date_to: datetime = None
+):
+    """Find the average grade across all grades."""
+    return await session.run_sync(my_select.select_4, date_from, date_to)
+
+
+async def select_5(session: AsyncSession, teacher_name: str):
+    """Find the courses taught by a specific teacher."""
+    return await session.run_sync(my_select.select_5, teacher_name)
+
+
+async def select_6(session: AsyncSession, group_name: str):
+    """Find the list of students in a specific group."""
+    return await session.run_sync(my_select.select_6, group_name)
+
+
+async def select_7(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the grades of students in a specific group for a specific subject."""
+    return await session.run_sync(
+        my_select.select_7, group_name, subject_name, date_from, date_to
+    )
+
+
+async def select_8(
+    session: AsyncSession,
+    teacher_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the average grade given by a specific teacher across their subjects."""
+    return await session.run_sync(my_select.select_8, teacher_name, date_from, date_to)
+
+
+async def select_9(
+    session: AsyncSession,
+    student_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the list of courses attended by a specific student."""
+    return await session.run_sync(my_select.select_9, student_name, date_from, date_to)
+
+
+async def select_10(
+    session: AsyncSession,
+    student_name: str,
+    teacher_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the list of courses taught by a specific teacher to a specific student."""
+    return await session.run_sync(
+        my_select.select_10, student_name, teacher_name, date_from, date_to
+    )
+
+
+async def select_average_grade_teacher_to_student(
+    session: AsyncSession,
+    teacher_name: str,
+    student_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the average grade given by a specific teacher to a specific student."""
+    return await session.run_sync(
+        my_select_additional.select_average_grade_teacher_to_student,
+        teacher_name,
+        student_name,
+        date_from,
+        date_to,
+    )
+
+
+async def select_grades_last_lesson(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    """Find the grades of students in a specific group for a specific subject on the last lesson."""
+    return await session.run_sync(
+        my_select_additional.select_grades_last_lesson,
+        group_name,
+        subject_name,
+        date_from,
+        date_to,
+    )
+
+
+async def run_concurrently(
+    session_factory: async_sessionmaker, queries, max_concurrency: int = None
+):
+    """Run (query, args) pairs concurrently, each on its own session from the pool.
+
+    Results are returned in the order of queries. max_concurrency caps how many
+    queries hold a connection at once; by default all of them run together.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or len(queries) or 1)
+
+    async def run(query, args):
+        async with semaphore:
+            async with session_factory() as session:
+                return await query(session, *args)
+
+    return await asyncio.gather(*(run(query, args) for query, args in queries))
+
+
+async def main():
+    from connect import make_async_engine, settings, session
+    from random_util import (
+        get_random_subject_name,
+        get_random_teacher_name,
+        get_random_group_name,
+        get_random_student_name,
+    )
+
+    subject_name = get_random_subject_name(session)
+    teacher_name = get_random_teacher_name(session)
+    group_name = get_random_group_name(session)
+    student_name = get_random_student_name(session)
+    session.close()
+
+    engine = make_async_engine(settings)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    queries = [
+        (select_1, ()),
+        (select_2, (subject_name,)),
+        (select_3, (subject_name,)),
+        (select_4, ()),
+        (select_5, (teacher_name,)),
+        (select_6, (group_name,)),
+        (select_7, (group_name, subject_name)),
+        (select_8, (teacher_name,)),
+        (select_9, (student_name,)),
+        (select_10, (student_name, teacher_name)),
+    ]
+    try:
+        results = await run_concurrently(
+            session_factory, queries, settings.get("pool_size")
+        )
+    finally:
+        await engine.dispose()
+
+    for (query, args), result in zip(queries, results):
+        print(f"{query.__name__}{args}: {result}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+import my_select
+import my_select_additional
+
+
+class QueryCache:
+    """LRU cache of query results with a TTL and per-table invalidation.
+
+    Entries are keyed on the session's bind, the function name and its arguments,
+    and remember the tables the function reads so writes can drop them. The
+    cache lives in one process: writes made by other processes, such as a
+    separate main.py call, are only seen once the entries expire after ttl.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, tables, value = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, tables):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, frozenset(tables), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *tables):
+        """Drop every entry that reads one of the tables, or everything if none given."""
+        with self.lock:
+            if not tables:
+                self.entries.clear()
+                return
+            tables = set(tables)
+            for key in [
+                key for key, (_, read, _) in self.entries.items() if read & tables
+            ]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+    def wrap(self, function, *tables):
+        """Cache function(session, *args, **kwargs) results; tables lists what it reads."""
+
+        @functools.wraps(function)
+        def wrapper(session, *args, **kwargs):
+            key = (
+                session.get_bind(),
+                function.__name__,
+                args,
+                tuple(sorted(kwargs.items())),
+            )
+            found, value = self.get(key)
+            if found:
+                return value
+            value = function(session, *args, **kwargs)
+            self.set(key, value, tables)
+            return value
+
+        return wrapper
+
+
+cache = QueryCache(
+    maxsize=int(os.environ.get("QUERY_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("QUERY_CACHE_TTL", 300)),
+)
+
+select_1 = cache.wrap(my_select.select_1, "students", "grades")
+select_2 = cache.wrap(my_select.select_2, "students", "grades", "subjects")
+select_3 = cache.wrap(my_select.select_3, "groups", "students", "grades", "subjects")
+select_4 = cache.wrap(my_select.select_4, "grades")
+select_5 = cache.wrap(my_select.select_5, "subjects", "teacher_m2m_subject", "teachers")
+select_6 = cache.wrap(my_select.select_6, "students", "groups")
+select_7 = cache.wrap(my_select.select_7, "students", "groups", "grades", "subjects")
+select_8 = cache.wrap(
+    my_select.select_8, "grades", "subjects", "teacher_m2m_subject", "teachers"
+)
+select_9 = cache.wrap(my_select.select_9, "subjects", "grades", "students")
+select_10 = cache.wrap(
+    my_select.select_10,
+    "subjects",
+    "grades",
+    "students",
+    "teacher_m2m_subject",
+    "teachers",
+)
+select_average_grade_teacher_to_student = cache.wrap(
+    my_select_additional.select_average_grade_teacher_to_student,
+    "grades",
+    "subjects",
+    "teacher_m2m_subject",
+    "teachers",
+    "students",
+)
+select_grades_last_lesson = cache.wrap(
+    my_select_additional.select_grades_last_lesson,
+    "grades",
+    "students",
+    "groups",
+    "subjects",
+)
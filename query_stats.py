@@ -0,0 +1,166 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from sqlalchemy import event
+from logger_provider import console_logger
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_PARAMETERS_LENGTH = 500
+
+
+def calling_function():
+    """Name the innermost project function on the stack, e.g. my_select.select_1."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(PROJECT_DIR)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            module = frame.f_globals.get("__name__", "?")
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def format_parameters(parameters):
+    text = repr(parameters)
+    if len(text) > MAX_PARAMETERS_LENGTH:
+        return text[:MAX_PARAMETERS_LENGTH] + "..."
+    return text
+
+
+class CountingCursor:
+    """DBAPI cursor proxy that counts the rows fetched through it."""
+
+    def __init__(self, cursor, add_rows):
+        self.cursor = cursor
+        self.add_rows = add_rows
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.add_rows(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self.cursor.fetchmany(*args)
+        self.add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.add_rows(len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class QueryStats:
+    """Statement counts, timings and row counts per calling function.
+
+    Filled from before/after_cursor_execute events of the engines it is attached
+    to. Rows are the rows a statement's result returns, counted as they are
+    fetched, or the driver's rowcount for DML without RETURNING.
+    """
+
+    def __init__(self, slow_query_ms: float = None):
+        self.slow_query_ms = slow_query_ms
+        self.callers = {}
+        self.lock = threading.Lock()
+        self.logger = console_logger("QueryStats")
+        self.dump_registered = False
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+    def detach(self, engine):
+        event.remove(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.remove(engine, "handle_error", self.handle_error)
+
+    def before_cursor_execute(
+        self, connection, cursor, statement, parameters, context, executemany
+    ):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        self, connection, cursor, statement, parameters, context, executemany
+    ):
+        elapsed_ms = (
+            time.perf_counter() - connection.info["query_started"].pop()
+        ) * 1000
+        caller = calling_function()
+        if cursor.description is None:
+            rows = max(cursor.rowcount, 0)
+        else:
+            # The result is built from context.cursor after this event, so the
+            # proxy sees every row it fetches, even after the caller returned.
+            rows = 0
+            if context is not None:
+                context.cursor = CountingCursor(
+                    cursor, lambda count: self.add_rows(caller, count)
+                )
+        with self.lock:
+            stats = self.caller_stats(caller)
+            stats["statements"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["rows"] += rows
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            self.logger.warning(
+                f"Slow query in {caller} ({elapsed_ms:.1f} ms): {statement} "
+                f"parameters {format_parameters(parameters)}"
+            )
+
+    def handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute.
+        connection = exception_context.connection
+        if exception_context.statement is not None and connection is not None:
+            started = connection.info.get("query_started")
+            if started:
+                started.pop()
+
+    def caller_stats(self, caller):
+        return self.callers.setdefault(
+            caller, {"statements": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+        )
+
+    def add_rows(self, caller, count):
+        with self.lock:
+            self.caller_stats(caller)["rows"] += count
+
+    def summary(self):
+        """Per-caller stats ordered by total time, slowest first."""
+        with self.lock:
+            return sorted(
+                ({"caller": caller, **stats} for caller, stats in self.callers.items()),
+                key=lambda stats: stats["total_ms"],
+                reverse=True,
+            )
+
+    def reset(self):
+        with self.lock:
+            self.callers.clear()
+
+    def log_summary(self):
+        for stats in self.summary():
+            self.logger.info(
+                f"{stats['caller']}: {stats['statements']} statements, "
+                f"total {stats['total_ms']:.1f} ms, max {stats['max_ms']:.1f} ms, "
+                f"{stats['rows']} rows"
+            )
+
+    def dump_at_exit(self):
+        if not self.dump_registered:
+            atexit.register(self.log_summary)
+            self.dump_registered = True
+
+
+stats = QueryStats()
@@ -1,35 +1,115 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
-from connect import session
 import random
 
+# Kind -> (id column, name column, condition a row must meet to be picked).
+SAMPLES = {
+    "subject": (
+        Subject.id,
+        Subject.name,
+        select(Grade.id).where(Grade.subject_id == Subject.id).exists(),
+    ),
+    "teacher": (
+        Teacher.id,
+        Teacher.name,
+        select(teacher_m2m_subject.c.teacher_id)
+        .join(Grade, Grade.subject_id == teacher_m2m_subject.c.subject_id)
+        .where(teacher_m2m_subject.c.teacher_id == Teacher.id)
+        .exists(),
+    ),
+    "group": (
+        Group.id,
+        Group.name,
+        select(Student.id).where(Student.group_id == Group.id).exists(),
+    ),
+    "student": (Student.id, Student.name, None),
+}
+# Fractions become integers in [0, SCALE) for the uniform offset.
+SCALE = 2**30
+
+
+def random_pick(kind: str, fraction: float, uniform: bool = False):
+    """Build a scalar subquery for the name of the first matching row after the
+    given fraction of the id range, wrapping around to the first matching row.
+
+    Every step is an index lookup, so the cost does not grow with the table.
+    The draw is not uniform: a row is picked in proportion to the gap in
+    matching ids before it, so after a long gap one row can take most picks.
+    With uniform, it counts the matching rows and takes the one at the given
+    fraction of them instead, which reads every matching row.
+    """
+    id_column, name_column, condition = SAMPLES[kind]
+    conditions = () if condition is None else (condition,)
+    if uniform:
+        count = (
+            select(func.count(id_column))
+            .where(*conditions)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        return (
+            select(name_column)
+            .where(*conditions)
+            .order_by(id_column)
+            .offset(count * int(fraction * SCALE) // SCALE)
+            .limit(1)
+            .correlate(None)
+            .scalar_subquery()
+        )
+    low = select(func.min(id_column)).correlate(None).scalar_subquery()
+    high = select(func.max(id_column)).correlate(None).scalar_subquery()
+    first_after = (
+        select(id_column)
+        .where(id_column > low - 1 + (high - low + 1) * fraction, *conditions)
+        .order_by(id_column)
+        .limit(1)
+        .correlate(None)
+        .scalar_subquery()
+    )
+    first = (
+        select(id_column)
+        .where(*conditions)
+        .order_by(id_column)
+        .limit(1)
+        .correlate(None)
+        .scalar_subquery()
+    )
+    return (
+        select(name_column)
+        .where(id_column == func.coalesce(first_after, first))
+        .scalar_subquery()
+    )
+
+
+def get_random_names(session: Session, kind: str, k: int, uniform: bool = False):
+    """Get k random names of a kind (with repeats) from the database in one query.
+
+    Pass uniform when every name must be equally likely; see random_pick.
+    """
+    if k <= 0:
+        return []
+    picks = [
+        random_pick(kind, random.random(), uniform).label(f"pick_{i}") for i in range(k)
+    ]
+    return list(session.execute(select(*picks)).one())
+
 
 def get_random_subject_name(session: Session):
     """Get a random subject name from the database."""
-    subjects = session.query(Subject.name).join(Grade).distinct().all()
-    return random.choice(subjects).name
+    return get_random_names(session, "subject", 1)[0]
 
 
 def get_random_teacher_name(session: Session):
     """Get a random teacher name from the database."""
-    teachers = (
-        session.query(Teacher.name)
-        .join(teacher_m2m_subject, Teacher.id == teacher_m2m_subject.c.teacher_id)
-        .join(Subject, teacher_m2m_subject.c.subject_id == Subject.id)
-        .join(Grade, Grade.subject_id == Subject.id)
-        .distinct()
-        .all()
-    )
-    return random.choice(teachers).name
+    return get_random_names(session, "teacher", 1)[0]
 
 
 def get_random_group_name(session: Session):
     """Get a random group name from the database that has students."""
-    groups = session.query(Group.name).join(Student).distinct().all()
-    return random.choice(groups).name
+    return get_random_names(session, "group", 1)[0]
 
 
 def get_random_student_name(session: Session):
     """Get a random student name from the database."""
-    students = session.query(Student.name).distinct().all()
-    return random.choice(students).name
+    return get_random_names(session, "student", 1)[0]
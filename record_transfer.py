@@ -0,0 +1,194 @@
+import csv
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, delete, insert, select, text
+from sqlalchemy.engine import Connection
+from models import Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
+from grade_partitions import is_partitioned
+
+# Model name -> table moved by import/export. TeacherSubject carries the links
+# between teachers and subjects, which no model row holds.
+TABLES = {
+    "Teacher": Teacher.__table__,
+    "Group": Group.__table__,
+    "Student": Student.__table__,
+    "Subject": Subject.__table__,
+    "Grade": Grade.__table__,
+    "TeacherSubject": teacher_m2m_subject,
+}
+FORMATS = ("csv", "jsonl")
+ON_CONFLICT = ("error", "skip", "update")
+
+
+def file_format(path: str, format: str = None):
+    """Pick csv or jsonl from the explicit format or the file extension."""
+    if format:
+        return format
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of '{path}', pass csv or jsonl")
+
+
+@contextmanager
+def open_file(path: str, mode: str):
+    """Open a text file, or stdin/stdout for '-'."""
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+        return
+    with open(path, mode, newline="", encoding="utf-8") as file:
+        yield file
+
+
+def parse_value(column, value):
+    if value is None or value == "":
+        return None
+    if isinstance(column.type, DateTime) and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        return int(value)
+    return value
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def read_records(path: str, table, format: str = None):
+    """Yield rows of a CSV or JSON Lines file as dicts of the table's columns."""
+    format = file_format(path, format)
+    with open_file(path, "r") as file:
+        if format == "csv":
+            records = csv.DictReader(file)
+        else:
+            records = (json.loads(line) for line in file if line.strip())
+        for record in records:
+            unknown = record.keys() - table.c.keys()
+            if unknown:
+                raise ValueError(
+                    f"Unknown {table.name} columns: {', '.join(sorted(unknown))}"
+                )
+            yield {
+                name: parse_value(table.c[name], value)
+                for name, value in record.items()
+            }
+
+
+def write_records(path: str, columns, rows, format: str = None):
+    """Write rows as CSV or JSON Lines one at a time; returns the row count."""
+    format = file_format(path, format)
+    count = 0
+    with open_file(path, "w") as file:
+        if format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([format_value(value) for value in row])
+                count += 1
+        else:
+            for row in rows:
+                record = dict(zip(columns, map(format_value, row)))
+                file.write(json.dumps(record) + "\n")
+                count += 1
+    return count
+
+
+def conflict_insert(connection: Connection, table, on_conflict: str = "error"):
+    """Build an INSERT that fails, skips or updates rows whose primary key exists."""
+    if on_conflict == "error":
+        return insert(table)
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(table)
+    keys = [column.name for column in table.primary_key]
+    if table is Grade.__table__ and is_partitioned(connection):
+        # Unique keys of a partitioned table must include its partition key.
+        keys.append("date_received")
+    values = [column.name for column in table.c if column.name not in keys]
+    if on_conflict == "skip" or not values:
+        return statement.on_conflict_do_nothing(index_elements=keys)
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: statement.excluded[name] for name in values},
+    )
+
+
+def resolve_grade_ids(connection: Connection, batch, on_conflict: str):
+    """Handle rows whose id already exists in a partitioned grades table.
+
+    Its unique key is (id, date_received), so ON CONFLICT misses a row whose
+    date changed and would insert a second row with the same id. skip drops
+    every row with an existing id; update deletes the existing rows with
+    another date, so they are inserted again, in their new partition.
+    """
+    ids = [row["id"] for row in batch if row.get("id") is not None]
+    if not ids:
+        return batch
+    existing = dict(
+        connection.execute(
+            select(Grade.id, Grade.date_received).where(Grade.id.in_(ids))
+        ).all()
+    )
+    if on_conflict == "skip":
+        return [row for row in batch if row.get("id") not in existing]
+    moved = [
+        row["id"]
+        for row in batch
+        if row.get("id") in existing and existing[row["id"]] != row.get("date_received")
+    ]
+    if moved:
+        connection.execute(delete(Grade).where(Grade.id.in_(moved)))
+    return batch
+
+
+def import_batches(connection: Connection, table, batches, on_conflict: str = "error"):
+    """Insert each batch of rows with one executemany; returns the rows sent."""
+    statement = conflict_insert(connection, table, on_conflict)
+    by_id = (
+        on_conflict != "error"
+        and table is Grade.__table__
+        and is_partitioned(connection)
+    )
+    total = 0
+    for batch in batches:
+        total += len(batch)
+        if by_id:
+            batch = resolve_grade_ids(connection, batch, on_conflict)
+        if batch:
+            connection.execute(statement, batch)
+    return total
+
+
+def export_rows(connection: Connection, table, batch_size: int = 10_000):
+    """Stream every row of a table in primary key order with a server-side cursor."""
+    result = connection.execute(
+        select(table).order_by(*table.primary_key),
+        execution_options={"stream_results": True, "yield_per": batch_size},
+    )
+    for partition in result.partitions():
+        yield from partition
+
+
+def reset_sequences(connection: Connection, tables):
+    """Move PostgreSQL id sequences past explicitly inserted ids."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        if "id" not in table.c:
+            continue
+        connection.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+            )
+        )
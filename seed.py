@@ -1,28 +1,132 @@
 from faker import Faker
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Base, Student, Group, Teacher, Subject, Grade
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models import Base, Student, Group, Teacher, Subject, Grade, teacher_m2m_subject
+import argparse
+import itertools
 import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from logger_provider import console_logger
+from grade_loader import GRADE_COLUMNS, batched, insert_in_batches, load_grades
+from value_pools import ValuePools
+from grade_summary import GradeSummaryDelta
+from grade_trends import log_grades
+import record_transfer
+from grade_partitions import ensure_partitions
 
-from connect import session
+try:
+    import resource
+except ImportError:
+    resource = None
 
 logger = console_logger("Seed")
 
-if __name__ == "__main__":
+POOL_DRAW_SIZE = 10_000
+
+
+def derive_seed(seed, worker):
+    """Build the Faker/random seed of one worker from the master seed."""
+    return f"{seed}:{worker}"
+
 
+def make_faker(seed=None):
     fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    return fake
 
-    groups = [Group(name=fake.unique.word()) for _ in range(3)]
+
+def generate_students(fake: Faker, group_ids, count: int, rng=random, pools=None):
+    """Lazily yield student rows assigned to random groups."""
+    if pools is not None:
+        for offset in range(0, count, POOL_DRAW_SIZE):
+            draw_count = min(POOL_DRAW_SIZE, count - offset)
+            names = pools.draw(pools.names, draw_count)
+            groups = pools.draw(group_ids, draw_count)
+            for name, group_id in zip(names, groups):
+                yield {"name": name, "group_id": group_id}
+        return
+    for _ in range(count):
+        yield {"name": fake.name(), "group_id": rng.choice(group_ids)}
+
+
+def generate_grades(
+    fake: Faker,
+    student_ids,
+    subject_ids,
+    min_grades: int,
+    max_grades: int,
+    rng=random,
+    start_date="-1y",
+    end_date="now",
+    pools=None,
+):
+    """Lazily yield grade rows for every student in every subject."""
+    if pools is not None:
+        yield from generate_pooled_grades(
+            pools, student_ids, subject_ids, min_grades, max_grades
+        )
+        return
+    for student_id in student_ids:
+        for subject_id in subject_ids:
+            for _ in range(rng.randint(min_grades, max_grades)):
+                yield {
+                    "student_id": student_id,
+                    "subject_id": subject_id,
+                    "grade": rng.randint(60, 100),
+                    "date_received": fake.date_time_between(
+                        start_date=start_date, end_date=end_date
+                    ),
+                }
+
+
+def generate_pooled_grades(
+    pools: ValuePools, student_ids, subject_ids, min_grades: int, max_grades: int
+):
+    """Yield grade rows drawn from pre-generated pools, one vectorized draw per student."""
+    for student_id in student_ids:
+        counts = pools.integers(min_grades, max_grades, len(subject_ids))
+        total = sum(counts)
+        grades = pools.integers(60, 100, total)
+        dates = pools.draw(pools.dates, total)
+        position = 0
+        for subject_id, subject_count in zip(subject_ids, counts):
+            for _ in range(subject_count):
+                yield {
+                    "student_id": student_id,
+                    "subject_id": subject_id,
+                    "grade": grades[position],
+                    "date_received": dates[position],
+                }
+                position += 1
+
+
+def seed_orm(
+    session: Session,
+    fake: Faker,
+    groups_count: int = 3,
+    teachers_count: int = 5,
+    subjects_count: int = 8,
+    students_count: int = 50,
+    min_grades: int = 10,
+    max_grades: int = 20,
+    batch_size: int = 10_000,
+    pools: ValuePools = None,
+):
+    """Fill the database through ORM objects, committing in bounded batches."""
+    groups = [Group(name=fake.unique.word()) for _ in range(groups_count)]
     session.add_all(groups)
     session.commit()
 
-    teachers = [Teacher(name=fake.name()) for _ in range(5)]
+    teachers = [Teacher(name=fake.name()) for _ in range(teachers_count)]
     session.add_all(teachers)
     session.commit()
 
-    subjects = [Subject(name=fake.word()) for _ in range(8)]
+    subjects = [Subject(name=fake.word()) for _ in range(subjects_count)]
     session.add_all(subjects)
     session.commit()
 
@@ -30,27 +134,464 @@ if __name__ == "__main__":
         subject.teachers = random.sample(teachers, random.randint(1, len(teachers)))
     session.commit()
 
-    students = []
-    for _ in range(50):
-        student = Student(name=fake.name(), group=random.choice(groups))
-        students.append(student)
-    session.add_all(students)
-    session.commit()
+    group_ids = [group.id for group in groups]
+    subject_ids = [subject.id for subject in subjects]
+    session.expunge_all()
+
+    for student_rows in batched(
+        generate_students(fake, group_ids, students_count, pools=pools),
+        batch_size,
+    ):
+        students = [Student(**row) for row in student_rows]
+        session.add_all(students)
+        session.commit()
+        student_group_ids = {student.id: student.group_id for student in students}
+        session.expunge_all()
+
+        delta = GradeSummaryDelta()
+        for grade_rows in batched(
+            delta.track(
+                generate_grades(
+                    fake,
+                    list(student_group_ids),
+                    subject_ids,
+                    min_grades,
+                    max_grades,
+                    pools=pools,
+                ),
+                student_group_ids,
+            ),
+            batch_size,
+        ):
+            session.add_all([Grade(**row) for row in grade_rows])
+            delta.apply(session.connection())
+            session.commit()
+            session.expunge_all()
+        log_seeded_grades(session.connection(), student_group_ids)
+        session.commit()
+
+
+def insert_returning_ids(connection, model, rows):
+    """Insert rows in one executemany and return the generated ids in order."""
+    result = connection.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    )
+    return result.scalars().all()
+
+
+def log_seeded_grades(connection, student_ids):
+    """Log the trend buckets of the grades of newly seeded students.
+
+    A range over their ids needs no parameter per student; another writer's
+    students inside it only add buckets to recompute.
+    """
+    log_grades(connection, Grade.student_id.between(min(student_ids), max(student_ids)))
+
+
+def peak_rss_mib(platform=None):
+    """Peak resident set size of this process in MiB, or None without resource."""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux.
+    if (platform or sys.platform) == "darwin":
+        return peak_rss / (1024 * 1024)
+    return peak_rss / 1024
+
+
+def log_rate(table_name: str, count: int, started: float):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    logger.info(
+        f"Inserted {count} {table_name} in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)"
+    )
+
+
+def seed_dimensions(
+    connection,
+    fake: Faker,
+    groups_count: int,
+    teachers_count: int,
+    subjects_count: int,
+    batch_size: int,
+    rng=random,
+):
+    """Insert groups, teachers, subjects and their links; return group and subject ids."""
+    started = time.perf_counter()
+    group_ids = insert_returning_ids(
+        connection,
+        Group,
+        [{"name": f"{fake.word()}-{index}"} for index in range(groups_count)],
+    )
+    log_rate("groups", len(group_ids), started)
+
+    started = time.perf_counter()
+    teacher_ids = insert_returning_ids(
+        connection, Teacher, [{"name": fake.name()} for _ in range(teachers_count)]
+    )
+    log_rate("teachers", len(teacher_ids), started)
+
+    started = time.perf_counter()
+    subject_ids = insert_returning_ids(
+        connection, Subject, [{"name": fake.word()} for _ in range(subjects_count)]
+    )
+    log_rate("subjects", len(subject_ids), started)
+
+    links = [
+        {"teacher_id": teacher_id, "subject_id": subject_id}
+        for subject_id in subject_ids
+        for teacher_id in rng.sample(teacher_ids, rng.randint(1, len(teacher_ids)))
+    ]
+    insert_in_batches(connection, teacher_m2m_subject, links, batch_size)
+    return group_ids, subject_ids
 
-    for student in students:
-        for subject in subjects:
-            for _ in range(random.randint(10, 20)):
-                grade = Grade(
-                    student_id=student.id,
-                    subject_id=subject.id,
-                    grade=random.randint(60, 100),
-                    date_received=fake.date_time_between(
-                        start_date="-1y", end_date="now"
+
+def seed_bulk(
+    engine: Engine,
+    fake: Faker,
+    groups_count: int = 3,
+    teachers_count: int = 5,
+    subjects_count: int = 8,
+    students_count: int = 50,
+    min_grades: int = 10,
+    max_grades: int = 20,
+    batch_size: int = 10_000,
+    grades_loader: str = "auto",
+    pools: ValuePools = None,
+):
+    """Fill the database with Core insert() executemany batches instead of ORM objects.
+
+    Students are generated and inserted one batch at a time and their grades are
+    streamed right after, so memory stays bounded by batch_size.
+    """
+    with engine.begin() as connection:
+        group_ids, subject_ids = seed_dimensions(
+            connection, fake, groups_count, teachers_count, subjects_count, batch_size
+        )
+
+        started = time.perf_counter()
+        students_total = 0
+        grades_total = 0
+        for student_rows in batched(
+            generate_students(fake, group_ids, students_count, pools=pools),
+            batch_size,
+        ):
+            student_ids = insert_returning_ids(connection, Student, student_rows)
+            students_total += len(student_ids)
+            student_group_ids = dict(
+                zip(student_ids, (row["group_id"] for row in student_rows))
+            )
+            delta = GradeSummaryDelta()
+            grades_total += load_grades(
+                connection,
+                delta.track(
+                    generate_grades(
+                        fake,
+                        student_ids,
+                        subject_ids,
+                        min_grades,
+                        max_grades,
+                        pools=pools,
                     ),
+                    student_group_ids,
+                ),
+                batch_size,
+                method=grades_loader,
+            )
+            delta.apply(connection)
+            log_seeded_grades(connection, student_ids)
+        log_rate("students and grades", students_total + grades_total, started)
+        logger.info(f"Seeded {students_total} students and {grades_total} grades")
+
+
+def shard_sizes(total: int, workers: int):
+    """Split total students into workers contiguous, near-equal shards."""
+    base, extra = divmod(total, workers)
+    return [base + (1 if index < extra else 0) for index in range(workers)]
+
+
+def seed_shard(
+    url: str,
+    worker_index: int,
+    seed,
+    first_student_id: int,
+    students_count: int,
+    first_grade_id: int,
+    group_ids,
+    subject_ids,
+    min_grades: int,
+    max_grades: int,
+    start_date: datetime,
+    end_date: datetime,
+    batch_size: int,
+    grades_loader: str,
+    faker_mode: str = "faithful",
+    pool_size: int = 10_000,
+):
+    """Generate and write one shard of students and grades on its own connection.
+
+    Ids are assigned explicitly from the shard's own id ranges, so the rows do not
+    depend on how the workers interleave their writes.
+    """
+    worker_seed = derive_seed(seed, worker_index)
+    fake = make_faker(worker_seed)
+    rng = random.Random(worker_seed)
+    pools = None
+    if faker_mode == "pooled":
+        pools = ValuePools(fake, start_date, end_date, pool_size, worker_seed)
+    student_ids = itertools.count(first_student_id)
+    grade_ids = itertools.count(first_grade_id)
+    students_total = 0
+    grades_total = 0
+
+    engine = create_engine(url)
+    try:
+        for student_rows in batched(
+            generate_students(fake, group_ids, students_count, rng, pools), batch_size
+        ):
+            for row in student_rows:
+                row["id"] = next(student_ids)
+            student_group_ids = {row["id"]: row["group_id"] for row in student_rows}
+            delta = GradeSummaryDelta()
+            grade_rows = (
+                {"id": next(grade_ids), **row}
+                for row in generate_grades(
+                    fake,
+                    [row["id"] for row in student_rows],
+                    subject_ids,
+                    min_grades,
+                    max_grades,
+                    rng,
+                    start_date,
+                    end_date,
+                    pools,
                 )
-                session.add(grade)
+            )
+            with engine.begin() as connection:
+                connection.execute(insert(Student), student_rows)
+                students_total += len(student_rows)
+                grades_total += load_grades(
+                    connection,
+                    delta.track(grade_rows, student_group_ids),
+                    batch_size,
+                    method=grades_loader,
+                    columns=("id",) + GRADE_COLUMNS,
+                )
+                delta.apply(connection)
+                log_seeded_grades(connection, student_group_ids)
+    finally:
+        engine.dispose()
+    return students_total, grades_total
 
-    session.commit()
-    session.close()
+
+def reset_sequences(connection):
+    """Move PostgreSQL id sequences past explicitly inserted ids."""
+    record_transfer.reset_sequences(connection, (Student.__table__, Grade.__table__))
+
+
+def seed_parallel(
+    engine: Engine,
+    seed=None,
+    workers: int = 1,
+    groups_count: int = 3,
+    teachers_count: int = 5,
+    subjects_count: int = 8,
+    students_count: int = 50,
+    min_grades: int = 10,
+    max_grades: int = 20,
+    end_date: datetime = None,
+    batch_size: int = 10_000,
+    grades_loader: str = "auto",
+    faker_mode: str = "faithful",
+    pool_size: int = 10_000,
+):
+    """Shard students across a process pool, one Faker/random seed per worker.
+
+    Given the same seed, worker count and end_date on an empty database, the
+    generated rows are identical from run to run. Without a seed a random one
+    is drawn and logged, so the run can be repeated.
+    """
+    if seed is None:
+        seed = str(random.SystemRandom().getrandbits(64))
+        logger.info(f"Seeding with --seed {seed}")
+    if end_date is None:
+        end_date = datetime.now()
+    start_date = end_date - timedelta(days=365)
+    main_seed = derive_seed(seed, "main")
+
+    with engine.begin() as connection:
+        group_ids, subject_ids = seed_dimensions(
+            connection,
+            make_faker(main_seed),
+            groups_count,
+            teachers_count,
+            subjects_count,
+            batch_size,
+            random.Random(main_seed),
+        )
+        first_student_id = connection.scalar(select(func.max(Student.id))) or 0
+        first_grade_id = connection.scalar(select(func.max(Grade.id))) or 0
+
+    shards = []
+    for worker_index, shard_students in enumerate(shard_sizes(students_count, workers)):
+        shards.append(
+            dict(
+                worker_index=worker_index,
+                seed=seed,
+                first_student_id=first_student_id + 1,
+                students_count=shard_students,
+                first_grade_id=first_grade_id + 1,
+                group_ids=group_ids,
+                subject_ids=subject_ids,
+                min_grades=min_grades,
+                max_grades=max_grades,
+                start_date=start_date,
+                end_date=end_date,
+                batch_size=batch_size,
+                grades_loader=grades_loader,
+                faker_mode=faker_mode,
+                pool_size=pool_size,
+            )
+        )
+        first_student_id += shard_students
+        first_grade_id += shard_students * len(subject_ids) * max_grades
+
+    url = engine.url.render_as_string(hide_password=False)
+    started = time.perf_counter()
+    if workers == 1:
+        results = [seed_shard(url, **shards[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(seed_shard, url, **shard) for shard in shards]
+            results = [future.result() for future in futures]
+
+    with engine.begin() as connection:
+        reset_sequences(connection)
+
+    students_total = sum(students for students, _ in results)
+    grades_total = sum(grades for _, grades in results)
+    log_rate("students and grades", students_total + grades_total, started)
+    logger.info(
+        f"Seeded {students_total} students and {grades_total} grades with {workers} workers"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the database with fake data")
+    parser.add_argument(
+        "--mode",
+        choices=["orm", "bulk"],
+        default="orm",
+        help="Insert through ORM objects or Core executemany batches",
+    )
+    parser.add_argument("--groups", type=int, default=3, help="Number of groups")
+    parser.add_argument("--teachers", type=int, default=5, help="Number of teachers")
+    parser.add_argument("--subjects", type=int, default=8, help="Number of subjects")
+    parser.add_argument("--students", type=int, default=50, help="Number of students")
+    parser.add_argument(
+        "--min-grades",
+        type=int,
+        default=10,
+        help="Minimum grades per student in each subject",
+    )
+    parser.add_argument(
+        "--max-grades",
+        type=int,
+        default=20,
+        help="Maximum grades per student in each subject",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Rows generated and flushed per batch",
+    )
+    parser.add_argument(
+        "--grades-loader",
+        choices=["auto", "copy", "executemany"],
+        default="auto",
+        help="How bulk mode loads grades: COPY on PostgreSQL, executemany elsewhere",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes that generate and write student shards in bulk mode",
+    )
+    parser.add_argument(
+        "--seed", type=str, help="Master seed that makes bulk mode reproducible"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+        help="Last day of the one-year grade window (YYYY-MM-DD), now by default",
+    )
+    parser.add_argument(
+        "--faker-mode",
+        choices=["faithful", "pooled"],
+        default="faithful",
+        help="Call Faker for every row or draw from pre-generated value pools",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10_000,
+        help="Names and timestamps generated per pool in pooled mode",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from connect import session, engine
+
+    args = parse_args()
+    fake = make_faker(args.seed)
+    pools = None
+    if args.faker_mode == "pooled":
+        end_date = args.end_date or datetime.now()
+        pools = ValuePools(
+            fake, end_date - timedelta(days=365), end_date, args.pool_size, args.seed
+        )
+    counts = dict(
+        groups_count=args.groups,
+        teachers_count=args.teachers,
+        subjects_count=args.subjects,
+        students_count=args.students,
+        min_grades=args.min_grades,
+        max_grades=args.max_grades,
+    )
+
+    if args.mode == "bulk" and (args.workers > 1 or args.seed is not None):
+        seed_parallel(
+            engine,
+            seed=args.seed,
+            workers=args.workers,
+            end_date=args.end_date,
+            batch_size=args.batch_size,
+            grades_loader=args.grades_loader,
+            faker_mode=args.faker_mode,
+            pool_size=args.pool_size,
+            **counts,
+        )
+    elif args.mode == "bulk":
+        seed_bulk(
+            engine,
+            fake,
+            batch_size=args.batch_size,
+            grades_loader=args.grades_loader,
+            pools=pools,
+            **counts,
+        )
+    else:
+        seed_orm(session, fake, batch_size=args.batch_size, pools=pools, **counts)
+        session.close()
+
+    # Grades outside the existing partitions went to the default one.
+    with engine.begin() as connection:
+        created = ensure_partitions(connection)
+    if created:
+        logger.info(f"Created grade partitions: {', '.join(created)}")
 
     logger.info("Db is filled with fake data")
+    peak_rss = peak_rss_mib()
+    if peak_rss is not None:
+        logger.info(f"Peak RSS: {peak_rss:.1f} MiB")
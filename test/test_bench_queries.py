@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_queries import (
+    BATCHED_QUERIES,
+    QUERIES,
+    WRITES,
+    compare,
+    percentile,
+    run_benchmark,
+)
+
+
+class TestBenchQueries(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_compare(self):
+        baseline = {
+            "results": {"sqlite": {"1k": {"select_1": {"p50_ms": 1.0}}}},
+        }
+        current = {
+            "results": {
+                "sqlite": {
+                    "1k": {"select_1": {"p50_ms": 1.5}, "select_2": {"p50_ms": 9.0}}
+                }
+            },
+        }
+        regressions = compare(baseline, current, threshold=1.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0]["query"], "select_1")
+        self.assertAlmostEqual(regressions[0]["ratio"], 1.5)
+        self.assertEqual(compare(baseline, current, threshold=2.0), [])
+
+    def test_run_benchmark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_benchmark(
+                f"sqlite:///{os.path.join(directory, 'bench.db')}",
+                grades=200,
+                warmup=1,
+                repetitions=3,
+                batch_size=5,
+            )
+        self.assertEqual(
+            set(results),
+            set(QUERIES) | set(BATCHED_QUERIES) | {f"write_{name}" for name in WRITES},
+        )
+        self.assertEqual(results["select_1"]["rows"], 3)
+        self.assertEqual(results["select_4"]["rows"], 1)
+        for stats in results.values():
+            self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+            self.assertLessEqual(stats["p95_ms"], stats["p99_ms"])
+        for name in BATCHED_QUERIES:
+            self.assertEqual(results[name]["round_trips"], 1)
+            self.assertEqual(results[name]["loop_round_trips"], 5)
+        for name in ("create_teacher", "update_teacher", "remove_teacher"):
+            self.assertEqual(results[f"write_{name}"]["round_trips"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_startup import COMMANDS, parse_importtime, time_command
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _codecs
+import time:       400 |        500 | codecs
+import time:      2000 |       3000 | argparse
+"""
+
+
+class TestBenchStartup(unittest.TestCase):
+    def test_parse_importtime(self):
+        modules, top_level = parse_importtime(IMPORTTIME)
+        self.assertEqual(modules, {"_codecs": 0.1, "codecs": 0.5, "argparse": 3.0})
+        self.assertEqual(top_level, ["codecs", "argparse"])
+
+    def test_commands_skip_the_database(self):
+        for name, arguments in COMMANDS.items():
+            stats = time_command(arguments, 1)
+            self.assertEqual(stats["heavy_modules"], [], name)
+            self.assertIn("argparse", stats["slowest_imports"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import tempfile
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, Group
+from connect import DEFAULT_URL, async_url, load_settings, make_engine, session_scope
+
+
+class TestConnect(unittest.TestCase):
+    def test_load_settings_defaults(self):
+        self.assertEqual(load_settings(environ={}), {"url": DEFAULT_URL})
+
+    def test_load_settings_from_environment(self):
+        settings = load_settings(
+            environ={
+                "DATABASE_URL": "sqlite://",
+                "DB_POOL_SIZE": "3",
+                "DB_MAX_OVERFLOW": "0",
+                "DB_POOL_PRE_PING": "true",
+                "DB_STATEMENT_TIMEOUT": "5000",
+                "DB_CONNECT_ARGS": '{"timeout": 10}',
+            }
+        )
+        self.assertEqual(
+            settings,
+            {
+                "url": "sqlite://",
+                "pool_size": 3,
+                "max_overflow": 0,
+                "pool_pre_ping": True,
+                "statement_timeout": 5000,
+                "connect_args": {"timeout": 10},
+            },
+        )
+
+    def test_environment_overrides_config_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = os.path.join(directory, "db.ini")
+            with open(config_path, "w", encoding="utf-8") as file:
+                file.write("[database]\nurl = sqlite://\npool_size = 2\n")
+            settings = load_settings(
+                environ={"DB_CONFIG": config_path, "DB_POOL_SIZE": "4"}
+            )
+        self.assertEqual(settings, {"url": "sqlite://", "pool_size": 4})
+
+    def test_unknown_setting_is_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = os.path.join(directory, "db.ini")
+            with open(config_path, "w", encoding="utf-8") as file:
+                file.write("[database]\npool_sise = 2\n")
+            with self.assertRaises(ValueError):
+                load_settings(environ={}, config_path=config_path)
+
+    def test_make_engine(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = make_engine(
+                {
+                    "url": f"sqlite:///{os.path.join(directory, 'test.db')}",
+                    "pool_size": 2,
+                    "max_overflow": 1,
+                    "pool_pre_ping": True,
+                    "statement_timeout": 1000,
+                }
+            )
+            try:
+                self.assertEqual(engine.pool.size(), 2)
+                with engine.connect() as connection:
+                    self.assertEqual(connection.scalar(text("SELECT 1")), 1)
+            finally:
+                engine.dispose()
+
+    def test_async_url(self):
+        self.assertEqual(
+            async_url(DEFAULT_URL).drivername,
+            "postgresql+asyncpg",
+        )
+        self.assertEqual(
+            async_url("sqlite:///test.db").render_as_string(),
+            "sqlite+aiosqlite:///test.db",
+        )
+
+    def test_session_scope(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        try:
+            with session_scope(factory) as session:
+                session.add(Group(name="Group 1"))
+            with self.assertRaises(RuntimeError):
+                with session_scope(factory) as session:
+                    session.add(Group(name="Group 2"))
+                    session.flush()
+                    raise RuntimeError("rollback")
+            with session_scope(factory) as session:
+                self.assertEqual(session.query(func.count(Group.id)).scalar(), 1)
+        finally:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+from datetime import timedelta
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import my_select
+import my_select_additional
+from grade_analytics import GradeAnalytics, np
+from models import Base, Student, Grade, Subject, Teacher, Group, teacher_m2m_subject
+from seed import make_faker, seed_bulk
+
+UNORDERED = {"select_3", "select_5", "select_6", "select_7", "select_9", "select_10"}
+
+
+def rows(result):
+    """Compare SQL and NumPy rows by field names and values."""
+    if isinstance(result, list):
+        return [(row._fields, tuple(row)) for row in result]
+    if result is None or isinstance(result, float):
+        return result
+    return result._fields, tuple(result)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestGradeAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        seed_bulk(self.engine, make_faker("analytics"), students_count=60)
+        self.session = sessionmaker(bind=self.engine)()
+        # A second teacher with the name of the first, sharing a subject, makes
+        # the teacher joins count some grades twice.
+        teacher = self.session.get(Teacher, 1)
+        twin = Teacher(name=teacher.name)
+        self.session.add(twin)
+        self.session.flush()
+        self.session.execute(
+            insert(teacher_m2m_subject).values(
+                teacher_id=twin.id, subject_id=teacher.subjects[0].id
+            )
+        )
+        self.session.commit()
+        self.analytics = GradeAnalytics(self.session, batch_size=100)
+        first = self.session.query(func.min(Grade.date_received)).scalar()
+        self.ranges = [
+            (None, None),
+            (first + timedelta(days=90), first + timedelta(days=180)),
+        ]
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def names(self, model):
+        return [name for (name,) in self.session.query(model.name).distinct()]
+
+    def assertSame(self, name, module, *args):
+        expected = rows(getattr(module, name)(self.session, *args))
+        actual = rows(getattr(self.analytics, name)(*args))
+        if name in UNORDERED:
+            expected, actual = sorted(expected), sorted(actual)
+        self.assertEqual(actual, expected, (name, args))
+
+    def test_parity(self):
+        subjects = self.names(Subject) + ["Missing"]
+        teachers = self.names(Teacher) + ["Missing"]
+        groups = self.names(Group)
+        students = self.names(Student)[:10]
+        for date_range in self.ranges:
+            self.assertSame("select_4", my_select, *date_range)
+            for subject in subjects:
+                self.assertSame("select_3", my_select, subject, *date_range)
+                for group in groups:
+                    self.assertSame("select_7", my_select, group, subject, *date_range)
+                    self.assertSame(
+                        "select_grades_last_lesson",
+                        my_select_additional,
+                        group,
+                        subject,
+                        *date_range,
+                    )
+            for teacher in teachers:
+                self.assertSame("select_8", my_select, teacher, *date_range)
+            for student in students:
+                self.assertSame("select_9", my_select, student, *date_range)
+                for teacher in teachers:
+                    self.assertSame(
+                        "select_10", my_select, student, teacher, *date_range
+                    )
+                    self.assertSame(
+                        "select_average_grade_teacher_to_student",
+                        my_select_additional,
+                        teacher,
+                        student,
+                        *date_range,
+                    )
+        for teacher in teachers:
+            self.assertSame("select_5", my_select, teacher)
+        for group in groups + ["Missing"]:
+            self.assertSame("select_6", my_select, group)
+
+    def student_averages(self, *conditions):
+        return set(
+            self.session.query(Student.name, func.avg(Grade.grade))
+            .join(Grade)
+            .join(Subject)
+            .filter(*conditions)
+            .group_by(Student.id)
+            .all()
+        )
+
+    def test_rankings(self):
+        """SQL returns students tied on average in any order, so the rankings are
+        compared by average and each student by their own average."""
+        for date_range in self.ranges:
+            expected = my_select.select_1(self.session, *date_range)
+            actual = self.analytics.select_1(*date_range)
+            self.assertEqual(
+                [row.average_grade for row in actual],
+                [row.average_grade for row in expected],
+            )
+            averages = self.student_averages(*my_select.date_range(*date_range))
+            self.assertLessEqual({tuple(row) for row in actual}, averages)
+
+        for subject in self.names(Subject):
+            expected = my_select.select_2(self.session, subject)
+            actual = self.analytics.select_2(subject)
+            self.assertEqual(actual.average_grade, expected.average_grade)
+            self.assertIn(tuple(actual), self.student_averages(Subject.name == subject))
+        self.assertIsNone(self.analytics.select_2("Missing"))
@@ -0,0 +1,70 @@
+import unittest
+import csv
+import io
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, Student, Grade, Subject, Group
+from grade_loader import grade_csv_chunks, load_grades
+
+
+class TestGradeLoader(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        group = Group(name="Group 1")
+        subject = Subject(name="Math")
+        self.session.add_all([group, subject])
+        self.session.commit()
+        student = Student(name="Student 1", group_id=group.id)
+        self.session.add(student)
+        self.session.commit()
+        self.rows = [
+            {
+                "student_id": student.id,
+                "subject_id": subject.id,
+                "grade": 60 + index,
+                "date_received": datetime(2025, 3, 16, 17, 41, index),
+            }
+            for index in range(5)
+        ]
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_load_grades_executemany(self):
+        with self.engine.begin() as connection:
+            count = load_grades(connection, iter(self.rows), batch_size=2)
+        self.assertEqual(count, 5)
+        self.assertEqual(self.session.query(func.count(Grade.id)).scalar(), 5)
+        self.assertEqual(self.session.query(func.sum(Grade.grade)).scalar(), 310)
+
+    def test_load_grades_copy_requires_postgresql(self):
+        with self.engine.begin() as connection:
+            with self.assertRaises(ValueError):
+                load_grades(connection, iter(self.rows), method="copy")
+
+    def test_grade_csv_chunks(self):
+        counter = [0]
+        chunks = list(grade_csv_chunks(iter(self.rows), 2, counter))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(counter[0], 5)
+        self.assertEqual(chunks[0].splitlines()[0], "1,1,60,2025-03-16 17:41:00")
+
+    def test_grade_csv_chunks_keep_microseconds(self):
+        row = dict(self.rows[0], date_received=datetime(2025, 3, 16, 17, 41, 5, 123456))
+        (chunk,) = grade_csv_chunks([row], 10, [0])
+        (record,) = csv.reader(io.StringIO(chunk))
+        self.assertEqual(record[3], "2025-03-16 17:41:05.123456")
+        self.assertEqual(datetime.fromisoformat(record[3]), row["date_received"])
+
+
+if __name__ == "__main__":
+    unittest.main()
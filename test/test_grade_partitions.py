@@ -0,0 +1,146 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import postgresql
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grade_partitions import (
+    add_months,
+    ensure_partitions,
+    interval_start,
+    is_partition_name,
+    months_between,
+    parse_bound,
+    partition_grades,
+    partition_name,
+    unpartition_grades,
+)
+from models import Base
+
+
+class RecordingConnection:
+    """Stands in for a PostgreSQL connection and records the compiled SQL."""
+
+    def __init__(self, relkind, months=(), partitions=()):
+        self.dialect = postgresql.dialect()
+        self.relkind = relkind
+        self.months = months
+        self.partitions = partitions
+        self.statements = []
+
+    def compile(self, statement):
+        return str(statement.compile(dialect=self.dialect))
+
+    def execute(self, statement, parameters=None):
+        sql = self.compile(statement)
+        self.statements.append(sql)
+        if "date_trunc" in sql:
+            return [(month,) for month in self.months]
+        if "pg_inherits" in sql:
+            return list(self.partitions)
+        return []
+
+    def scalar(self, statement):
+        sql = self.compile(statement)
+        if "relkind" in sql:
+            return self.relkind
+        return "grades_id_seq"
+
+
+class TestGradePartitions(unittest.TestCase):
+    def test_intervals(self):
+        value = datetime(2025, 11, 20, 8, 30)
+        self.assertEqual(interval_start(value, 1), datetime(2025, 11, 1))
+        self.assertEqual(interval_start(value, 6), datetime(2025, 7, 1))
+        self.assertEqual(interval_start(datetime(2025, 6, 30), 6), datetime(2025, 1, 1))
+        self.assertEqual(add_months(datetime(2025, 11, 1), 3), datetime(2026, 2, 1))
+        self.assertEqual(months_between(datetime(2025, 7, 1), datetime(2026, 1, 1)), 6)
+
+    def test_names(self):
+        name = partition_name(datetime(2025, 1, 1))
+        self.assertEqual(name, "grades_p2025_01")
+        self.assertTrue(is_partition_name(name))
+        self.assertTrue(is_partition_name("grades_default"))
+        self.assertFalse(is_partition_name("grades"))
+        self.assertFalse(is_partition_name("grades_unpartitioned"))
+
+    def test_parse_bound(self):
+        self.assertEqual(
+            parse_bound(
+                "FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')"
+            ),
+            (datetime(2025, 1, 1), datetime(2025, 2, 1)),
+        )
+        self.assertIsNone(parse_bound("DEFAULT"))
+
+    def test_sqlite_keeps_single_table(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            self.assertEqual(partition_grades(connection, "month"), [])
+            self.assertEqual(ensure_partitions(connection), [])
+            self.assertIn("grades", inspect(connection).get_table_names())
+        engine.dispose()
+
+    def test_postgresql_statements(self):
+        connection = RecordingConnection("r", months=[datetime(2025, 1, 1)])
+        created = partition_grades(connection, "month", 1, now=datetime(2025, 2, 5))
+        self.assertEqual(
+            created, ["grades_p2025_01", "grades_p2025_02", "grades_p2025_03"]
+        )
+        statements = connection.statements
+        self.assertIn("ALTER TABLE grades RENAME TO grades_unpartitioned", statements)
+        create = next(
+            sql for sql in statements if sql.startswith("CREATE TABLE grades (")
+        )
+        self.assertIn("nextval('grades_id_seq'::regclass)", create)
+        self.assertIn("PRIMARY KEY (id, date_received)", create)
+        self.assertTrue(create.endswith("PARTITION BY RANGE (date_received)"))
+        self.assertIn(
+            "ALTER TABLE grades ATTACH PARTITION grades_p2025_02 "
+            "FOR VALUES FROM ('2025-02-01 00:00:00') TO ('2025-03-01 00:00:00')",
+            statements,
+        )
+        self.assertIn(
+            "CREATE INDEX ix_grades_student_id_subject_id_date_received "
+            "ON grades (student_id, subject_id, date_received)",
+            statements,
+        )
+        self.assertEqual(statements[-1], "DROP TABLE grades_unpartitioned")
+
+        connection = RecordingConnection(
+            "p",
+            partitions=[
+                (
+                    "grades_p2025_01",
+                    "FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')",
+                ),
+                ("grades_default", "DEFAULT"),
+            ],
+        )
+        self.assertEqual(
+            ensure_partitions(connection, 1, now=datetime(2025, 1, 15)),
+            ["grades_p2025_02"],
+        )
+        self.assertIn(
+            "CREATE TABLE grades_p2025_02 (LIKE grades INCLUDING DEFAULTS)",
+            connection.statements,
+        )
+        unpartition_grades(connection)
+        self.assertIn(
+            "ALTER TABLE grades RENAME TO grades_partitioned", connection.statements
+        )
+        self.assertTrue(
+            any(
+                sql.startswith("CREATE TABLE grades (")
+                and sql.endswith("PRIMARY KEY (id))")
+                for sql in connection.statements
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
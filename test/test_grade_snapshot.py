@@ -0,0 +1,142 @@
+import unittest
+import stat
+import struct
+import tempfile
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grade_analytics import GradeAnalytics
+from grade_snapshot import (
+    HEADER,
+    MAGIC,
+    SNAPSHOT_MODE,
+    GradeSnapshot,
+    np,
+    write_snapshot,
+)
+from models import Base, Grade, Student, Subject, teacher_m2m_subject
+from seed import make_faker, seed_bulk
+
+
+class TestGradeSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "grades.snapshot")
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        seed_bulk(self.engine, make_faker("snapshot"), students_count=30)
+        with self.engine.connect() as connection:
+            self.counts = write_snapshot(connection, self.path, batch_size=100)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def rows(self, *columns):
+        with self.engine.connect() as connection:
+            return connection.execute(select(*columns).order_by(columns[0])).all()
+
+    def test_memoryview_columns(self):
+        grades = self.rows(Grade.id, Grade.grade)
+        students = self.rows(Student.id, Student.name)
+        self.assertEqual(self.counts["grades"], len(grades))
+        self.assertEqual(
+            self.counts["teacher_m2m_subject"],
+            len(self.rows(teacher_m2m_subject.c.teacher_id)),
+        )
+        with GradeSnapshot(self.path) as snapshot:
+            ids = snapshot.memoryview("grades", "id")
+            values = snapshot.memoryview("grades", "grade")
+            names = snapshot.memoryview("students", "name")
+            self.assertTrue(ids.readonly)
+            self.assertEqual(list(zip(ids, values)), [tuple(row) for row in grades])
+            self.assertEqual(
+                [bytes(name).rstrip(b"\0").decode() for name in names.tolist()],
+                [name for _, name in students],
+            )
+            self.assertEqual(snapshot.memoryview("grades", "date_received").format, "q")
+            del ids, values, names
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_arrays_match_database(self):
+        with GradeSnapshot(self.path) as snapshot:
+            dates = snapshot.array("grades", "date_received")
+            self.assertFalse(dates.flags.owndata)
+            self.assertFalse(dates.flags.writeable)
+            self.assertEqual(
+                [date.item() for date in dates],
+                [date for _, date in self.rows(Grade.id, Grade.date_received)],
+            )
+
+            analytics = GradeAnalytics.from_snapshot(snapshot)
+            session = sessionmaker(bind=self.engine)()
+            expected = GradeAnalytics(session)
+            session.close()
+            for subject in [name for _, name in self.rows(Subject.id, Subject.name)]:
+                self.assertEqual(
+                    analytics.select_3(subject), expected.select_3(subject)
+                )
+            for student in [name for _, name in self.rows(Student.id, Student.name)]:
+                self.assertTrue(expected.select_9(student))
+                self.assertEqual(
+                    analytics.select_9(student), expected.select_9(student)
+                )
+            self.assertEqual(analytics.select_1(), expected.select_1())
+            self.assertEqual(analytics.select_4(), expected.select_4())
+            del dates, analytics
+
+    def test_file_mode(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), SNAPSHOT_MODE)
+        os.chmod(self.path, 0o640)
+        with self.engine.connect() as connection:
+            write_snapshot(connection, self.path)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+
+    def test_replacing_keeps_open_snapshots(self):
+        snapshot = GradeSnapshot(self.path)
+        before = snapshot.memoryview("grades", "grade").tolist()
+        with self.engine.begin() as connection:
+            connection.execute(Grade.__table__.delete())
+            write_snapshot(connection, self.path)
+        self.assertEqual(snapshot.memoryview("grades", "grade").tolist(), before)
+        snapshot.close()
+        with GradeSnapshot(self.path) as replaced:
+            self.assertEqual(replaced.columns[("grades", "grade")][1], 0)
+
+    def test_empty_tables(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        with engine.connect() as connection:
+            counts = write_snapshot(connection, self.path)
+        engine.dispose()
+        self.assertEqual(set(counts.values()), {0})
+        with GradeSnapshot(self.path) as snapshot:
+            for table, column in snapshot.columns:
+                self.assertEqual(snapshot.memoryview(table, column).tolist(), [])
+            if np is not None:
+                self.assertEqual(
+                    {
+                        array.shape
+                        for columns in snapshot.tables().values()
+                        for array in columns.values()
+                    },
+                    {(0,)},
+                )
+
+    def test_rejects_other_files(self):
+        with open(self.path, "r+b") as file:
+            file.write(HEADER.pack(MAGIC, 99, 0, 0))
+        with self.assertRaisesRegex(ValueError, "version 99"):
+            GradeSnapshot(self.path)
+        with open(self.path, "r+b") as file:
+            file.write(struct.pack("<8s", b"NOTSNAP!"))
+        with self.assertRaisesRegex(ValueError, "not a grade snapshot"):
+            GradeSnapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
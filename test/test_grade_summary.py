@@ -0,0 +1,152 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grade_summary
+import my_select
+from models import Base, Student, Grade, Subject, Teacher, Group, SubjectGradeSummary
+from seed import make_faker, seed_bulk, seed_orm
+
+
+class TestGradeSummary(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+        seed_bulk(
+            self.engine,
+            make_faker("summary"),
+            groups_count=3,
+            teachers_count=3,
+            subjects_count=4,
+            students_count=30,
+            min_grades=1,
+            max_grades=4,
+            batch_size=7,
+        )
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def assertConsistent(self):
+        self.assertEqual(grade_summary.check_summaries(self.session.connection()), [])
+
+    def test_seeders_keep_summaries_consistent(self):
+        self.assertConsistent()
+        seed_orm(
+            self.session,
+            make_faker("summary orm"),
+            groups_count=2,
+            teachers_count=2,
+            subjects_count=2,
+            students_count=5,
+            min_grades=1,
+            max_grades=3,
+            batch_size=4,
+        )
+        self.assertConsistent()
+
+    def test_summary_selects_match_sql(self):
+        subject_name = self.session.query(Subject.name).first().name
+        teacher_name = self.session.query(Teacher.name).first().name
+
+        self.assertEqual(
+            [row.average_grade for row in grade_summary.select_1(self.session)],
+            [row.average_grade for row in my_select.select_1(self.session)],
+        )
+        self.assertAlmostEqual(
+            grade_summary.select_2(self.session, subject_name).average_grade,
+            my_select.select_2(self.session, subject_name).average_grade,
+        )
+        self.assertEqual(
+            sorted(grade_summary.select_3(self.session, subject_name)),
+            sorted(my_select.select_3(self.session, subject_name)),
+        )
+        self.assertAlmostEqual(
+            grade_summary.select_4(self.session), my_select.select_4(self.session)
+        )
+        self.assertAlmostEqual(
+            grade_summary.select_8(self.session, teacher_name),
+            my_select.select_8(self.session, teacher_name),
+        )
+
+    def test_grade_changes(self):
+        connection = self.session.connection()
+        student = self.session.query(Student).first()
+        subject = self.session.query(Subject).first()
+        grade = Grade(
+            student_id=student.id,
+            subject_id=subject.id,
+            grade=77,
+            date_received=datetime(2025, 3, 16),
+        )
+        self.session.add(grade)
+        grade_summary.apply_grade_change(connection, student.id, subject.id, 77, 1)
+        self.session.flush()
+        self.assertConsistent()
+
+        grade_summary.apply_grade_change(connection, student.id, subject.id, 10, 0)
+        grade.grade = 87
+        self.session.flush()
+        self.assertConsistent()
+
+        grade_summary.apply_grade_change(connection, student.id, subject.id, -87, -1)
+        self.session.delete(grade)
+        self.session.flush()
+        self.assertConsistent()
+
+    def test_structural_changes(self):
+        connection = self.session.connection()
+        groups = self.session.query(Group).all()
+        student = self.session.query(Student).first()
+        new_group_id = next(
+            group.id for group in groups if group.id != student.group_id
+        )
+        grade_summary.move_student(
+            connection, student.id, student.group_id, new_group_id
+        )
+        student.group_id = new_group_id
+        self.session.flush()
+        self.assertConsistent()
+
+        grade_summary.remove_student(connection, student.id)
+        connection.execute(delete(Grade).where(Grade.student_id == student.id))
+        connection.execute(delete(Student).where(Student.id == student.id))
+        self.session.expunge(student)
+        self.assertConsistent()
+
+        subject = self.session.query(Subject).first()
+        grade_summary.remove_subject(connection, subject.id)
+        self.session.delete(subject)
+        self.session.flush()
+        self.assertConsistent()
+
+        group = self.session.query(Group).first()
+        grade_summary.remove_group(connection, group.id)
+        self.session.delete(group)
+        self.session.flush()
+        self.assertConsistent()
+
+    def test_rebuild_fixes_drift(self):
+        connection = self.session.connection()
+        connection.execute(
+            update(SubjectGradeSummary).values(
+                grade_count=SubjectGradeSummary.grade_count + 1
+            )
+        )
+        differences = grade_summary.check_summaries(connection)
+        self.assertEqual(len(differences), 4)
+        self.assertEqual(differences[0][0], "subject_grade_summaries")
+        grade_summary.rebuild_summaries(connection)
+        self.assertConsistent()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+import unittest
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud
+from connect import enable_foreign_keys
+from grade_trends import (
+    refresh_trends,
+    select_rolling_averages,
+    select_trends,
+    truncate,
+)
+from models import (
+    Base,
+    Student,
+    Grade,
+    Subject,
+    Group,
+    StudentGradeTrend,
+    SubjectGradeTrend,
+    GradeTrendChange,
+    GradeTrendRefresh,
+)
+from seed import make_faker, seed_bulk
+
+
+class TestGradeTrends(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        enable_foreign_keys(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add(Group(name="Group 1"))
+        self.session.add_all([Subject(name="Math"), Subject(name="Art")])
+        self.session.flush()
+        self.session.add_all(
+            [Student(name="Ann", group_id=1), Student(name="Bob", group_id=1)]
+        )
+        self.session.flush()
+        # Sunday 16 March, then Monday 17 March starting a new week.
+        self.add_grades(
+            (1, 1, 60, datetime(2025, 3, 16, 10)),
+            (1, 1, 80, datetime(2025, 3, 17, 9)),
+            (1, 2, 90, datetime(2025, 3, 20, 12)),
+            (2, 1, 70, datetime(2025, 4, 2, 8)),
+        )
+        self.patch = mock.patch.object(crud, "session", self.session)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.session.close()
+        self.engine.dispose()
+
+    def run_crud(self, function, *args):
+        with redirect_stdout(io.StringIO()):
+            function(*args)
+
+    def add_grades(self, *grades):
+        self.session.add_all(
+            Grade(
+                student_id=student, subject_id=subject, grade=grade, date_received=date
+            )
+            for student, subject, grade, date in grades
+        )
+        self.session.commit()
+
+    def refresh(self, *args):
+        written = refresh_trends(self.session.connection(), *args)
+        self.session.commit()
+        return written
+
+    def trends(self):
+        return [
+            self.session.execute(select(table).order_by(*table.primary_key)).all()
+            for table in (StudentGradeTrend.__table__, SubjectGradeTrend.__table__)
+        ]
+
+    def assert_refresh_matches_rebuild(self):
+        self.refresh()
+        self.assertEqual(self.session.query(GradeTrendChange).count(), 0)
+        refreshed = self.trends()
+        self.refresh(None, True)
+        self.assertEqual(self.trends(), refreshed)
+        return refreshed
+
+    def test_truncate(self):
+        self.assertEqual(
+            truncate("week", datetime(2025, 3, 16, 10)), datetime(2025, 3, 10)
+        )
+        self.assertEqual(truncate("week", datetime(2025, 3, 17)), datetime(2025, 3, 17))
+        self.assertEqual(
+            truncate("month", datetime(2025, 3, 31, 23)), datetime(2025, 3, 1)
+        )
+
+    def test_trends(self):
+        self.refresh()
+        self.assertEqual(
+            [tuple(row) for row in select_trends(self.session, "student", "week", 1)],
+            [
+                (1, "Ann", datetime(2025, 3, 10), 60.0, 1, None),
+                (1, "Ann", datetime(2025, 3, 17), 85.0, 2, 60.0),
+            ],
+        )
+        self.assertEqual(
+            [tuple(row) for row in select_trends(self.session, "subject", "month")],
+            [
+                (1, "Math", datetime(2025, 3, 1), 70.0, 2, None),
+                (1, "Math", datetime(2025, 4, 1), 70.0, 1, 70.0),
+                (2, "Art", datetime(2025, 3, 1), 90.0, 1, None),
+            ],
+        )
+        self.assertEqual(
+            [
+                row.bucket_start
+                for row in select_trends(
+                    self.session, "student", "week", 1, datetime(2025, 3, 18)
+                )
+            ],
+            [datetime(2025, 3, 17)],
+        )
+        with self.assertRaises(ValueError):
+            select_trends(self.session, "group")
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.refresh(), 12)
+        self.assertEqual(self.refresh(), 0)
+
+        # A new grade for Bob in April only recomputes Bob's and Math's buckets
+        # of that week and month.
+        self.run_crud(crud.create_grade, 2, 1, 90, datetime(2025, 4, 3))
+        self.assertEqual(self.refresh(), 4)
+        created = self.trends()
+        self.refresh(None, True)
+        self.assertEqual(self.trends(), created)
+
+        # Moving Ann's first grade to April recomputes its old and new buckets.
+        self.run_crud(crud.update_grade, 1, 50, datetime(2025, 4, 4))
+        updated = self.assert_refresh_matches_rebuild()
+        self.assertNotEqual(updated, created)
+        self.run_crud(crud.remove_grade, 3)
+        removed = self.assert_refresh_matches_rebuild()
+        self.assertNotEqual(removed, updated)
+
+        # Writes that bypass crud are only seen from since on.
+        self.session.execute(update(Grade).where(Grade.id == 4).values(grade=50))
+        self.session.commit()
+        self.refresh()
+        self.assertEqual(self.trends(), removed)
+        self.refresh(datetime(2025, 4, 1))
+        edited = self.trends()
+        self.refresh(None, True)
+        self.assertEqual(self.trends(), edited)
+        self.assertNotEqual(edited, removed)
+
+    def test_import_below_newest_id(self):
+        self.refresh()
+        self.run_crud(crud.remove_grade, 2)
+        self.assert_refresh_matches_rebuild()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "grades.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            record = {
+                "id": 2,
+                "student_id": 2,
+                "subject_id": 2,
+                "grade": 40,
+                "date_received": "2025-03-12T10:00:00",
+            }
+            file.write(json.dumps(record) + "\n")
+        before = self.trends()
+        self.run_crud(crud.import_records, "Grade", path, 50, "error", "auto", None)
+        self.assertEqual(self.session.query(Grade).count(), 4)
+        self.assertNotEqual(self.assert_refresh_matches_rebuild(), before)
+
+        # Replacing a grade recomputes the buckets of both versions.
+        with open(path, "w", encoding="utf-8") as file:
+            record = {
+                "id": 2,
+                "student_id": 1,
+                "subject_id": 1,
+                "grade": 10,
+                "date_received": "2025-05-01T10:00:00",
+            }
+            file.write(json.dumps(record) + "\n")
+        self.run_crud(crud.import_records, "Grade", path, 50, "update", "auto", None)
+        self.assert_refresh_matches_rebuild()
+
+    def test_removals_cascade(self):
+        self.refresh()
+        self.run_crud(crud.remove_student, 1)
+        self.assertEqual(
+            [len(rows) for rows in self.assert_refresh_matches_rebuild()], [2, 2]
+        )
+        self.run_crud(crud.remove_subject, 1)
+        self.assertEqual(self.assert_refresh_matches_rebuild(), [[], []])
+        self.add_grades((2, 2, 80, datetime(2025, 3, 20)))
+        self.refresh(None, True)
+        self.run_crud(crud.remove_group, 1)
+        self.assertEqual(self.assert_refresh_matches_rebuild(), [[], []])
+
+    def test_refresh_state(self):
+        self.refresh()
+        first = self.session.query(GradeTrendRefresh).one()
+        self.assertLessEqual(first.refreshed_at, datetime.utcnow())
+        refreshed_at = first.refreshed_at
+        self.session.expire_all()
+        self.refresh()
+        second = self.session.query(GradeTrendRefresh).one()
+        self.assertEqual(second.id, first.id)
+        self.assertGreater(second.refreshed_at, refreshed_at)
+
+    def test_refresh_matches_rebuild_on_seeded_data(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        seed_bulk(engine, make_faker("trends"), students_count=10)
+        session = sessionmaker(bind=engine)()
+        refresh_trends(session.connection())
+        session.commit()
+        tables = (StudentGradeTrend.__table__, SubjectGradeTrend.__table__)
+        seeded = [
+            session.execute(select(table).order_by(*table.primary_key)).all()
+            for table in tables
+        ]
+        # Seeding more students logs the buckets of their grades.
+        seed_bulk(engine, make_faker("more trends"), students_count=5)
+        self.assertGreater(session.query(GradeTrendChange).count(), 0)
+        refresh_trends(session.connection())
+        incremental = [
+            session.execute(select(table).order_by(*table.primary_key)).all()
+            for table in tables
+        ]
+        self.assertNotEqual(incremental, seeded)
+        refresh_trends(session.connection(), full=True)
+        self.assertEqual(
+            [
+                session.execute(select(table).order_by(*table.primary_key)).all()
+                for table in tables
+            ],
+            incremental,
+        )
+        session.close()
+        engine.dispose()
+
+    def test_rolling_averages(self):
+        rows = select_rolling_averages(self.session, "subject", 2, key_id=1)
+        self.assertEqual(
+            [(row.grade_id, row.rolling_average) for row in rows],
+            [(1, 60.0), (2, 70.0), (4, 75.0)],
+        )
+        rows = select_rolling_averages(self.session, "student", 3)
+        self.assertEqual(
+            [(row.key_id, row.rolling_average) for row in rows],
+            [(1, 60.0), (1, 70.0), (1, 230 / 3), (2, 70.0)],
+        )
+        with self.assertRaises(ValueError):
+            select_rolling_averages(self.session, lessons=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
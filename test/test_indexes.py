@@ -0,0 +1,80 @@
+import unittest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base
+from seed import make_faker, seed_bulk
+from my_select import select_2, select_5, select_6, select_7, select_9
+from my_select_additional import select_grades_last_lesson
+
+
+class TestIndexes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(cls.engine)
+        seed_bulk(cls.engine, make_faker("indexes"), students_count=30)
+        cls.Session = sessionmaker(bind=cls.engine)
+        cls.session = cls.Session()
+        cls.statements = []
+        event.listen(cls.engine, "before_cursor_execute", cls.capture)
+
+    @classmethod
+    def tearDownClass(cls):
+        event.remove(cls.engine, "before_cursor_execute", cls.capture)
+        cls.session.close()
+        cls.engine.dispose()
+
+    @classmethod
+    def capture(cls, conn, cursor, statement, parameters, context, executemany):
+        cls.statements.append((statement, parameters))
+
+    def query_plan(self, select_function, *args):
+        """Run a select function and return the SQLite plan of its statement."""
+        self.statements.clear()
+        select_function(self.session, *args)
+        statement, parameters = self.statements[0]
+        with self.engine.connect() as connection:
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+        return "\n".join(row[-1] for row in rows)
+
+    def assertUsesIndex(self, plan, index_name):
+        self.assertIn(index_name, plan)
+        self.assertNotIn("SCAN grades", plan)
+
+    def test_select_2_uses_subject_indexes(self):
+        plan = self.query_plan(select_2, "Math")
+        self.assertUsesIndex(plan, "ix_subjects_name")
+        self.assertUsesIndex(plan, "ix_grades_subject_id_student_id")
+
+    def test_select_5_uses_teacher_name_index(self):
+        plan = self.query_plan(select_5, "Teacher 1")
+        self.assertUsesIndex(plan, "ix_teachers_name")
+
+    def test_select_6_uses_group_id_index(self):
+        plan = self.query_plan(select_6, "Group 1")
+        self.assertUsesIndex(plan, "ix_students_group_id")
+
+    def test_select_7_uses_grades_student_index(self):
+        plan = self.query_plan(select_7, "Group 1", "Math")
+        self.assertUsesIndex(plan, "ix_grades_student_id_subject_id_date_received")
+
+    def test_select_9_uses_student_name_index(self):
+        plan = self.query_plan(select_9, "Student 1")
+        self.assertUsesIndex(plan, "ix_students_name")
+
+    def test_select_grades_last_lesson_uses_covering_index(self):
+        plan = self.query_plan(select_grades_last_lesson, "Group 1", "Math")
+        self.assertUsesIndex(
+            plan, "COVERING INDEX ix_grades_student_id_subject_id_date_received"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
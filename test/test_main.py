@@ -0,0 +1,288 @@
+import unittest
+import io
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grade_summary
+import crud
+import main
+from connect import enable_foreign_keys
+from models import Base, Student, Grade, Subject, Teacher, Group
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        enable_foreign_keys(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        group = Group(name="Group 1")
+        subject = Subject(name="Math")
+        self.session.add_all([group, subject])
+        self.session.flush()
+        students = [Student(name=f"Student {i}", group_id=group.id) for i in range(5)]
+        self.session.add_all(students)
+        self.session.flush()
+        self.session.add_all(
+            Grade(
+                student_id=student.id,
+                subject_id=subject.id,
+                grade=70 + i,
+                date_received=datetime(2025, 1, 10),
+            )
+            for i, student in enumerate(students)
+        )
+        self.session.flush()
+        grade_summary.rebuild_summaries(self.session.connection())
+        self.session.commit()
+        self.patch = mock.patch.object(crud, "session", self.session)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.session.close()
+        self.engine.dispose()
+
+    def run_main(self, *argv):
+        with mock.patch.object(sys, "argv", ["main.py", *argv]), redirect_stdout(
+            io.StringIO()
+        ) as output:
+            main.main()
+        return output.getvalue().splitlines()
+
+    def test_list_keeps_output_format(self):
+        self.assertEqual(
+            self.run_main("-a", "list", "-m", "Grade", "--limit", "1"),
+            [
+                "ID: 1, Student ID: 1, Subject ID: 1, Grade: 70, "
+                "Date Received: 2025-01-10 00:00:00"
+            ],
+        )
+
+    def test_list_pages_and_columns(self):
+        first_page = self.run_main("-a", "list", "-m", "Student", "--limit", "2")
+        self.assertEqual(
+            first_page,
+            [
+                "ID: 1, Name: Student 0, Group ID: 1",
+                "ID: 2, Name: Student 1, Group ID: 1",
+            ],
+        )
+        self.assertEqual(
+            self.run_main(
+                "-a", "list", "-m", "Student", "--after-id", "2", "--columns", "id,name"
+            ),
+            [
+                "ID: 3, Name: Student 2",
+                "ID: 4, Name: Student 3",
+                "ID: 5, Name: Student 4",
+            ],
+        )
+        self.assertEqual(
+            self.run_main("-a", "list", "-m", "Student", "--columns", "id,nme"),
+            ["Unknown Student columns: nme"],
+        )
+
+    def test_list_selects_only_needed_columns(self):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            self.run_main("-a", "list", "-m", "Grade", "--columns", "grade")
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("SELECT grades.grade \nFROM grades", statements[0])
+
+    def count_statements(self, *argv):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            output = self.run_main(*argv)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+        return output, len(statements)
+
+    def test_writes_use_one_statement(self):
+        for command, message in [
+            ("-a create -m Teacher --name Ann", "Teacher 'Ann' created with ID 1"),
+            (
+                "-a update -m Teacher --id 1 --name Bo",
+                "Teacher with ID 1 updated to 'Bo'",
+            ),
+            ("-a update -m Group --id 1 --name G", "Group with ID 1 updated to 'G'"),
+            (
+                "-a create -m Student --name New --group_id 1",
+                "Student 'New' created with ID 6 in group 'G'",
+            ),
+            ("-a remove -m Teacher --id 1", "Teacher with ID 1 removed"),
+        ]:
+            self.assertEqual(self.count_statements(*command.split()), ([message], 1))
+
+    def test_writes_report_missing_rows(self):
+        for command, message in [
+            ("-a update -m Teacher --id 9 --name X", "No teacher found with ID 9"),
+            ("-a remove -m Subject --id 9", "No subject found with ID 9"),
+            ("-a create -m Student --name X --group_id 9", "No group found with ID 9"),
+            (
+                "-a update -m Student --id 9 --name X --group_id 1",
+                "No student found with ID 9",
+            ),
+            ("-a remove -m Student --id 9", "No student found with ID 9"),
+            (
+                "-a create -m Grade --student_id 1 --subject_id 9 --grade_value 80 "
+                "--date_received 2025-02-01",
+                "No student or subject found with the provided IDs",
+            ),
+            (
+                "-a update -m Grade --id 9 --grade_value 80 --date_received 2025-02-01",
+                "No grade found with ID 9",
+            ),
+            ("-a remove -m Grade --id 9", "No grade found with ID 9"),
+        ]:
+            self.assertEqual(self.run_main(*command.split()), [message])
+        self.assertEqual(self.session.query(Student).count(), 5)
+        self.assertEqual(self.session.query(Grade).count(), 5)
+
+    def test_grade_writes_keep_summaries(self):
+        self.run_main("-a", "create", "-m", "Group", "--name", "Group 2")
+        self.assertEqual(
+            self.run_main(
+                *"-a create -m Grade --student_id 2 --subject_id 1 --grade_value 99 "
+                "--date_received 2025-02-01".split()
+            ),
+            ["Grade '99' created for student 'Student 1' in subject 'Math'"],
+        )
+        for command in [
+            "-a update -m Grade --id 6 --grade_value 60 --date_received 2025-02-01",
+            "-a remove -m Grade --id 1",
+            "-a update -m Student --id 3 --name Moved --group_id 2",
+        ]:
+            self.run_main(*command.split())
+        self.assertEqual(self.session.get(Grade, 6).grade, 60)
+        self.assertEqual(self.session.get(Student, 3).group_id, 2)
+        self.assertEqual(grade_summary.check_summaries(self.session.connection()), [])
+
+    def test_removals_cascade(self):
+        self.session.add(
+            Teacher(name="Teacher", subjects=[self.session.get(Subject, 1)])
+        )
+        self.session.commit()
+        self.run_main("-a", "remove", "-m", "Student", "--id", "1")
+        self.assertEqual(self.session.get(Group, 1).name, "Group 1")
+        self.assertEqual(self.session.query(Student).count(), 4)
+        self.assertEqual(self.session.query(Grade).count(), 4)
+        self.assertEqual(grade_summary.check_summaries(self.session.connection()), [])
+
+        self.run_main("-a", "remove", "-m", "Subject", "--id", "1")
+        self.assertEqual(self.session.query(Grade).count(), 0)
+        self.assertEqual(self.session.get(Teacher, 1).subjects, [])
+        self.run_main("-a", "remove", "-m", "Group", "--id", "1")
+        self.assertEqual(self.session.query(Student).count(), 0)
+        self.assertEqual(grade_summary.check_summaries(self.session.connection()), [])
+
+    def run_batch(self, *lines, commit_every=2):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "operations.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            return self.run_main("--batch", path, "--commit_every", str(commit_every))
+
+    def test_batch(self):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            output = self.run_batch(
+                "# comment",
+                '-a update -m Grade --id 1 --grade_value 90 --date_received "2025-02-01 10:00:00"',
+                "-a update -m Grade --id 2 --grade_value 91 --date_received 2025-02-01",
+                "-a update -m Grade --id 3 --grade_value 92 --date_received 2025-02-01",
+                "-a update -m Grade --id 42 --grade_value 93 --date_received 2025-02-01",
+                "-a remove -m Grade --id 4",
+                "-a remove -m Grade --id 5",
+                "-a create -m Group --name 'Group 2'",
+                "-a update -m Student --id 1 --name Moved --group_id 2",
+                commit_every=3,
+            )
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+
+        self.assertIn("No grade found with ID 42", output)
+        self.assertIn("Group 'Group 2' created with ID 2", output)
+        self.assertTrue(output[-1].startswith("Batch applied 8 operations (7 in bulk"))
+        self.assertIn("with 3 commits", output[-1])
+        self.assertEqual(
+            sum(statement.startswith("UPDATE grades") for statement in statements), 1
+        )
+        self.assertEqual(
+            [row.grade for row in self.session.query(Grade).order_by(Grade.id)],
+            [90, 91, 92],
+        )
+        self.assertEqual(self.session.get(Student, 1).group_id, 2)
+        self.assertEqual(grade_summary.check_summaries(self.session.connection()), [])
+
+    def test_batch_stops_on_error(self):
+        output = self.run_batch(
+            "-a update -m Group --id 1 --name Renamed",
+            "-a create -m Subject --name Physics",
+            "-a update -m Group",
+            "-a update -m Subject --id 1 --name Algebra",
+            "-a bogus",
+            "-a update -m Subject --id 1 --name Never",
+            commit_every=3,
+        )
+        self.assertIn("ID and name are required to update a group", output)
+        self.assertIn(
+            "Batch stopped after line 4: invalid arguments on line 5; "
+            "1 operations since the last commit were rolled back",
+            output,
+        )
+        self.assertEqual(self.session.get(Group, 1).name, "Renamed")
+        self.assertEqual(self.session.get(Subject, 1).name, "Math")
+        self.assertEqual(self.session.query(Subject).count(), 2)
+
+    def test_batch_rejects_import_and_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "teachers.csv")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("name\nImported\n")
+            for line in (
+                f"-a export -m Teacher --file {path}",
+                f"-a import -m Teacher --file {path}",
+            ):
+                output = self.run_batch(
+                    "-a create -m Teacher --name A",
+                    line,
+                    "-a create -m Teacher --name B",
+                )
+                self.assertIn(
+                    "Batch stopped after line 1: line 2: "
+                    f"{line.split()[1]} cannot run in a batch; "
+                    "1 operations since the last commit were rolled back",
+                    output,
+                )
+                self.assertTrue(output[-1].startswith("Batch applied 0 operations"))
+                self.assertEqual(self.session.query(Teacher).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import sys
@@ -18,6 +19,12 @@ from my_select import (
     select_8,
     select_9,
     select_10,
+    select_top_students,
+    select_5_batch,
+    select_6_batch,
+    select_7_batch,
+    select_9_batch,
+    select_10_batch,
     get_random_subject_name,
     get_random_teacher_name,
     get_random_group_name,
@@ -87,6 +94,65 @@ class TestMySelect(unittest.TestCase):
         self.assertEqual(result.name, "Student 2")
         self.assertAlmostEqual(result.average_grade, 90.0, places=2)
 
+    def test_select_top_students_by_subject(self):
+        result = select_top_students(self.session, 1, "subject")
+        self.assertEqual(
+            [(row.subject_name, row.name, row.rank) for row in result],
+            [("Math", "Student 2", 1), ("Science", "Student 3", 1)],
+        )
+        for row in result:
+            self.assertAlmostEqual(
+                row.average_grade,
+                select_2(self.session, row.subject_name).average_grade,
+                places=2,
+            )
+
+    def test_select_top_students_by_group(self):
+        result = select_top_students(self.session, 2, "group", "rank")
+        self.assertEqual(
+            [(row.group_name, row.name, row.rank) for row in result],
+            [
+                ("Group 1", "Student 2", 1),
+                ("Group 1", "Student 1", 2),
+                ("Group 2", "Student 3", 1),
+            ],
+        )
+        self.assertAlmostEqual(result[1].average_grade, 85.0, places=2)
+        with self.assertRaises(ValueError):
+            select_top_students(self.session, 2, "teacher")
+
+    def test_select_top_students_ties(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        group = Group(name="Group 1")
+        subject = Subject(name="Math")
+        session.add_all([group, subject])
+        session.flush()
+        for i, grade in enumerate([90, 90, 80], start=1):
+            student = Student(name=f"Student {i}", group_id=group.id)
+            session.add(student)
+            session.flush()
+            session.add(
+                Grade(student_id=student.id, subject_id=subject.id, grade=grade)
+            )
+        session.commit()
+        try:
+            self.assertEqual(
+                [row.name for row in select_top_students(session, 1, "subject")],
+                ["Student 1"],
+            )
+            self.assertEqual(
+                [
+                    row.name
+                    for row in select_top_students(session, 1, "subject", "rank")
+                ],
+                ["Student 1", "Student 2"],
+            )
+        finally:
+            session.close()
+            engine.dispose()
+
     def test_select_3(self):
         result = select_3(self.session, "Math")
         self.assertEqual(len(result), 1)
@@ -97,6 +163,22 @@ class TestMySelect(unittest.TestCase):
         result = select_4(self.session)
         self.assertAlmostEqual(result, 90.0, places=2)
 
+    def test_date_range(self):
+        now = datetime.utcnow()
+        past = now - timedelta(days=30)
+        self.assertAlmostEqual(select_4(self.session, past), 90.0, places=2)
+        self.assertIsNone(select_4(self.session, None, past))
+        self.assertIsNone(select_4(self.session, now + timedelta(days=1)))
+        self.assertEqual(select_1(self.session, None, past), [])
+        self.assertEqual(len(select_7(self.session, "Group 1", "Math", past)), 2)
+        self.assertEqual(select_9(self.session, "Student 1", None, past), [])
+        self.assertEqual(
+            select_9_batch(self.session, ["Student 1"], None, past), {"Student 1": []}
+        )
+        self.assertEqual(
+            select_top_students(self.session, 1, "subject", "rank", None, past), []
+        )
+
     def test_select_5(self):
         result = select_5(self.session, "Teacher 1")
         self.assertEqual(len(result), 1)
@@ -128,6 +210,40 @@ class TestMySelect(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0].name, "Math")
 
+    def test_batched_selects_match_single_calls(self):
+        teachers = ["Teacher 1", "Teacher 2", "Teacher 3"]
+        groups = ["Group 1", "Group 2"]
+        students = ["Student 1", "Student 2", "Student 3"]
+        subjects = ["Math", "Science"]
+        group_subjects = [(group, subject) for group in groups for subject in subjects]
+        student_teachers = [
+            (student, teacher) for student in students for teacher in teachers
+        ]
+
+        checks = [
+            (select_5, select_5_batch(self.session, teachers), teachers),
+            (select_6, select_6_batch(self.session, groups), groups),
+            (select_7, select_7_batch(self.session, group_subjects), group_subjects),
+            (select_9, select_9_batch(self.session, students), students),
+            (
+                select_10,
+                select_10_batch(self.session, student_teachers),
+                student_teachers,
+            ),
+        ]
+        for single, batched, keys in checks:
+            self.assertEqual(list(batched), keys)
+            for key in keys:
+                args = key if isinstance(key, tuple) else (key,)
+                self.assertEqual(
+                    sorted(batched[key]), sorted(single(self.session, *args))
+                )
+        self.assertEqual(select_5_batch(self.session, ["Teacher 3"]), {"Teacher 3": []})
+        self.assertEqual(
+            {row.name for row in select_6_batch(self.session, ["Group 1"])["Group 1"]},
+            {"Student 1", "Student 2"},
+        )
+
     def test_get_random_subject_name(self):
         result = get_random_subject_name(self.session)
         self.assertIn(result, ["Math", "Science"])
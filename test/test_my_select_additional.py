@@ -1,7 +1,7 @@
 import unittest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import os
 
@@ -11,7 +11,9 @@ from models import Base, Student, Grade, Subject, Teacher, Group, teacher_m2m_su
 from my_select_additional import (
     select_average_grade_teacher_to_student,
     select_grades_last_lesson,
+    select_grades_last_lessons,
 )
+from seed import make_faker, seed_bulk
 from random_util import (
     get_random_subject_name,
     get_random_teacher_name,
@@ -106,6 +108,76 @@ class TestMySelectAdditional(unittest.TestCase):
             self.assertEqual(res.grade_value, exp[3])
             self.assertEqual(str(res.date_received), exp[4])
 
+    def test_select_grades_last_lesson_in_date_range(self):
+        lesson = datetime(2025, 3, 16, 17, 41, 59)
+        result = select_grades_last_lesson(
+            self.session, "Group 1", "Math", lesson, lesson + timedelta(days=1)
+        )
+        self.assertEqual([row.grade_id for row in result], [1, 2])
+        self.assertEqual(
+            select_grades_last_lesson(self.session, "Group 1", "Math", None, lesson),
+            [],
+        )
+        self.assertIsNone(
+            select_average_grade_teacher_to_student(
+                self.session, "Teacher 1", "Student 1", lesson + timedelta(seconds=1)
+            )
+        )
+
+    def test_select_grades_last_lessons(self):
+        self.assertEqual(
+            list(select_grades_last_lessons(self.session)),
+            [
+                (
+                    ("Group 1", "Math"),
+                    select_grades_last_lesson(self.session, "Group 1", "Math"),
+                ),
+                (
+                    ("Group 2", "Science"),
+                    select_grades_last_lesson(self.session, "Group 2", "Science"),
+                ),
+            ],
+        )
+
+    def test_select_grades_last_lessons_matches_every_pair(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        seed_bulk(engine, make_faker("last lessons"), students_count=40)
+        session = sessionmaker(bind=engine)()
+        # Two grades at the same latest moment of one pair.
+        lesson = session.query(Grade).first()
+        last = datetime(2100, 1, 1)
+        session.add_all(
+            Grade(
+                student_id=lesson.student_id,
+                subject_id=lesson.subject_id,
+                grade=grade,
+                date_received=last,
+            )
+            for grade in (1, 2)
+        )
+        session.commit()
+        groups = [name for (name,) in session.query(Group.name)]
+        subjects = [name for (name,) in session.query(Subject.name)]
+        for date_range in [(None, None), (None, last)]:
+            pairs = dict(select_grades_last_lessons(session, *date_range, batch_size=7))
+            tied = [
+                row.grade_value
+                for rows in pairs.values()
+                for row in rows
+                if row.date_received == last
+            ]
+            self.assertEqual(tied, [1, 2] if date_range[1] is None else [])
+            for group in groups:
+                for subject in subjects:
+                    self.assertEqual(
+                        pairs.pop((group, subject), []),
+                        select_grades_last_lesson(session, group, subject, *date_range),
+                    )
+            self.assertEqual(pairs, {})
+        session.close()
+        engine.dispose()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import my_select
+import my_select_additional
+import my_select_async
+from connect import make_async_engine
+from models import Base
+from seed import make_faker, seed_bulk
+
+
+class TestMySelectAsync(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.url = f"sqlite:///{os.path.join(cls.directory.name, 'test.db')}"
+        cls.engine = create_engine(cls.url)
+        Base.metadata.create_all(cls.engine)
+        seed_bulk(cls.engine, make_faker("async"), students_count=20)
+        cls.session = sessionmaker(bind=cls.engine)()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.engine.dispose()
+        cls.directory.cleanup()
+
+    def run_async(self, queries, max_concurrency=None):
+        async def run():
+            engine = make_async_engine({"url": self.url})
+            try:
+                return await my_select_async.run_concurrently(
+                    async_sessionmaker(engine), queries, max_concurrency
+                )
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(run())
+
+    def test_async_results_match_sync(self):
+        subject_name = my_select.get_random_subject_name(self.session)
+        teacher_name = my_select.get_random_teacher_name(self.session)
+        group_name = my_select.get_random_group_name(self.session)
+        student_name = my_select.get_random_student_name(self.session)
+        calls = [
+            ("select_1", ()),
+            ("select_2", (subject_name,)),
+            ("select_3", (subject_name,)),
+            ("select_4", ()),
+            ("select_5", (teacher_name,)),
+            ("select_6", (group_name,)),
+            ("select_7", (group_name, subject_name)),
+            ("select_8", (teacher_name,)),
+            ("select_9", (student_name,)),
+            ("select_10", (student_name, teacher_name)),
+        ]
+        results = self.run_async(
+            [(getattr(my_select_async, name), args) for name, args in calls],
+            max_concurrency=3,
+        )
+        for (name, args), result in zip(calls, results):
+            expected = getattr(my_select, name)(self.session, *args)
+            self.assertEqual(result, expected, name)
+
+    def test_additional_selects(self):
+        teacher_name = my_select.get_random_teacher_name(self.session)
+        student_name = my_select.get_random_student_name(self.session)
+        group_name = my_select.get_random_group_name(self.session)
+        subject_name = my_select.get_random_subject_name(self.session)
+        average, last_lesson = self.run_async(
+            [
+                (
+                    my_select_async.select_average_grade_teacher_to_student,
+                    (teacher_name, student_name),
+                ),
+                (
+                    my_select_async.select_grades_last_lesson,
+                    (group_name, subject_name),
+                ),
+            ]
+        )
+        self.assertEqual(
+            average,
+            my_select_additional.select_average_grade_teacher_to_student(
+                self.session, teacher_name, student_name
+            ),
+        )
+        self.assertEqual(
+            last_lesson,
+            my_select_additional.select_grades_last_lesson(
+                self.session, group_name, subject_name
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
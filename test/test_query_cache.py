@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, Student, Grade, Subject, Group
+from my_select import select_4, select_6
+from query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(cls.engine)
+        cls.Session = sessionmaker(bind=cls.engine)
+        cls.session = cls.Session()
+        group = Group(name="Group 1")
+        subject = Subject(name="Math")
+        cls.session.add_all([group, subject])
+        cls.session.commit()
+        student = Student(name="Student 1", group_id=group.id)
+        cls.session.add(student)
+        cls.session.commit()
+        cls.session.add(Grade(student_id=student.id, subject_id=subject.id, grade=80))
+        cls.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.engine.dispose()
+
+    def test_hits_and_misses(self):
+        cache = QueryCache()
+        cached_select_6 = cache.wrap(select_6, "students", "groups")
+        first = cached_select_6(self.session, "Group 1")
+        second = cached_select_6(self.session, "Group 1")
+        cached_select_6(self.session, "Group 2")
+        self.assertIs(first, second)
+        self.assertEqual(first, select_6(self.session, "Group 1"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 2})
+
+    def test_invalidate_by_table(self):
+        cache = QueryCache()
+        cached_select_4 = cache.wrap(select_4, "grades")
+        cached_select_6 = cache.wrap(select_6, "students", "groups")
+        self.assertAlmostEqual(cached_select_4(self.session), 80.0)
+        cached_select_6(self.session, "Group 1")
+
+        grade = Grade(student_id=1, subject_id=1, grade=100)
+        self.session.add(grade)
+        self.session.commit()
+        try:
+            self.assertAlmostEqual(cached_select_4(self.session), 80.0)
+            cache.invalidate("grades")
+            self.assertEqual(cache.stats()["size"], 1)
+            self.assertAlmostEqual(cached_select_4(self.session), 90.0)
+        finally:
+            self.session.delete(grade)
+            self.session.commit()
+
+    def test_keyword_arguments(self):
+        cache = QueryCache()
+        cached_select_4 = cache.wrap(select_4, "grades")
+        later = datetime(2100, 1, 1)
+        self.assertAlmostEqual(cached_select_4(self.session, date_to=later), 80.0)
+        self.assertAlmostEqual(cached_select_4(self.session, date_to=later), 80.0)
+        self.assertIsNone(cached_select_4(self.session, date_from=later))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 2})
+
+    def test_ttl_expiry(self):
+        cache = QueryCache(ttl=0)
+        cached_select_4 = cache.wrap(select_4, "grades")
+        cached_select_4(self.session)
+        cached_select_4(self.session)
+        self.assertEqual(cache.stats()["hits"], 0)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        cache = QueryCache(maxsize=2)
+        cached_select_6 = cache.wrap(select_6, "students", "groups")
+        cached_select_6(self.session, "A")
+        cached_select_6(self.session, "B")
+        cached_select_6(self.session, "A")
+        cached_select_6(self.session, "C")
+        cached_select_6(self.session, "A")
+        cached_select_6(self.session, "B")
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "size": 2})
+
+    def test_invalidate_everything(self):
+        cache = QueryCache()
+        cache.wrap(select_4, "grades")(self.session)
+        cache.invalidate()
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
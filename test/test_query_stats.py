@@ -0,0 +1,90 @@
+import unittest
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import my_select
+from connect import make_engine
+from models import Base, Group
+from query_stats import QueryStats, stats
+
+
+class TestQueryStats(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.stats = QueryStats()
+        self.stats.attach(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add_all([Group(name="Group 1"), Group(name="Group 2")])
+        self.session.commit()
+        self.stats.reset()
+
+    def tearDown(self):
+        self.session.close()
+        self.stats.detach(self.engine)
+        self.engine.dispose()
+
+    def caller_stats(self, caller):
+        return next(
+            stats for stats in self.stats.summary() if stats["caller"] == caller
+        )
+
+    def test_stats_per_calling_function(self):
+        my_select.select_4(self.session)
+        my_select.select_4(self.session)
+        my_select.select_6(self.session, "Group 1")
+
+        select_4 = self.caller_stats("my_select.select_4")
+        self.assertEqual(select_4["statements"], 2)
+        self.assertGreater(select_4["total_ms"], 0)
+        self.assertGreaterEqual(select_4["total_ms"], select_4["max_ms"])
+        self.assertEqual(self.caller_stats("my_select.select_6")["statements"], 1)
+
+    def test_rows_written(self):
+        self.session.execute(update(Group).values(name=Group.name + "!"))
+        caller = f"{__name__}.test_rows_written"
+        self.assertEqual(self.caller_stats(caller)["rows"], 2)
+
+    def test_rows_returned(self):
+        my_select.select_4(self.session)
+        self.assertEqual(self.caller_stats("my_select.select_4")["rows"], 1)
+        groups = self.session.query(Group).all()
+        caller = f"{__name__}.test_rows_returned"
+        self.assertEqual(self.caller_stats(caller)["rows"], len(groups))
+
+    def test_failed_statement(self):
+        connection = self.session.connection()
+        with self.assertRaises(OperationalError):
+            connection.execute(text("SELECT * FROM missing"))
+        self.assertEqual(connection.info["query_started"], [])
+
+    def test_slow_query_log(self):
+        self.stats.slow_query_ms = 0
+        with self.assertLogs("QueryStats", level="WARNING") as logs:
+            my_select.select_6(self.session, "Group 1")
+        self.assertIn("Slow query in my_select.select_6", logs.output[0])
+        self.assertIn("Group 1", logs.output[0])
+
+        with self.assertLogs("QueryStats", level="INFO") as logs:
+            self.stats.log_summary()
+        self.assertIn("my_select.select_6: 1 statements", logs.output[0])
+
+    def test_make_engine_attaches_stats(self):
+        engine = make_engine({"url": "sqlite://", "slow_query_ms": 10_000})
+        try:
+            stats.reset()
+            Base.metadata.create_all(engine)
+            self.assertTrue(stats.summary())
+        finally:
+            stats.detach(engine)
+            stats.slow_query_ms = None
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
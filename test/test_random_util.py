@@ -0,0 +1,125 @@
+import unittest
+import random
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, Student, Grade, Subject, Teacher, Group
+from random_util import (
+    get_random_names,
+    get_random_subject_name,
+    get_random_teacher_name,
+    get_random_group_name,
+    get_random_student_name,
+)
+
+
+class TestRandomUtil(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        groups = [Group(name=f"Group {i}") for i in range(1, 5)]
+        teachers = [Teacher(name=f"Teacher {i}") for i in range(1, 5)]
+        subjects = [Subject(name=f"Subject {i}") for i in range(1, 7)]
+        for i, subject in enumerate(subjects):
+            subject.teachers.append(teachers[i % len(teachers)])
+        # Group 4, Subjects 3 and 6 and therefore Teacher 3 are never picked.
+        students = [
+            Student(name=f"Student {i}", group=groups[i % 3]) for i in range(1, 10)
+        ]
+        self.session.add_all(groups + teachers + subjects + students)
+        self.session.flush()
+        for student in students:
+            for subject in subjects:
+                if subject.name not in ("Subject 3", "Subject 6"):
+                    self.session.add(
+                        Grade(
+                            student_id=student.id,
+                            subject_id=subject.id,
+                            grade=80,
+                            date_received=datetime(2025, 1, 10),
+                        )
+                    )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def draw(self, function, times=200):
+        random.seed("random util")
+        return {function(self.session) for _ in range(times)}
+
+    def test_only_eligible_rows_are_picked(self):
+        self.assertEqual(
+            self.draw(get_random_subject_name),
+            {"Subject 1", "Subject 2", "Subject 4", "Subject 5"},
+        )
+        self.assertEqual(
+            self.draw(get_random_teacher_name),
+            {"Teacher 1", "Teacher 2", "Teacher 4"},
+        )
+        self.assertEqual(
+            self.draw(get_random_group_name), {"Group 1", "Group 2", "Group 3"}
+        )
+        self.assertEqual(
+            self.draw(get_random_student_name), {f"Student {i}" for i in range(1, 10)}
+        )
+
+    def test_same_seed_same_names(self):
+        random.seed(7)
+        first = get_random_names(self.session, "student", 5)
+        random.seed(7)
+        self.assertEqual(get_random_names(self.session, "student", 5), first)
+
+    def test_batch_uses_one_statement(self):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            names = get_random_names(self.session, "group", 10)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+        self.assertEqual(len(names), 10)
+        self.assertTrue(set(names) <= {"Group 1", "Group 2", "Group 3"})
+        self.assertEqual(len(statements), 1)
+
+        statement, parameters = statements[0]
+        plan = "\n".join(
+            row[-1]
+            for row in self.session.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        )
+        self.assertNotIn("SCAN students", plan)
+
+    def test_uniform_draws_with_sparse_ids(self):
+        self.session.add(Student(id=1000, name="After gap", group_id=1))
+        self.session.commit()
+        random.seed("sparse")
+        fast = get_random_names(self.session, "student", 200)
+        self.assertGreater(fast.count("After gap"), 150)
+        for kind, names in (
+            ("student", [f"Student {i}" for i in range(1, 10)] + ["After gap"]),
+            ("subject", ["Subject 1", "Subject 2", "Subject 4", "Subject 5"]),
+        ):
+            picks = get_random_names(self.session, kind, 400, uniform=True)
+            expected = len(picks) / len(names)
+            for name in names:
+                self.assertLess(abs(picks.count(name) - expected), expected / 2)
+
+    def test_empty_batch(self):
+        self.assertEqual(get_random_names(self.session, "subject", 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import unittest
+import io
+import json
+import tempfile
+from datetime import datetime
+from contextlib import redirect_stdout
+from unittest import mock
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grade_summary
+import crud
+import record_transfer
+from grade_loader import batched
+from models import Base, Grade, Group, Student, Subject
+from record_transfer import (
+    TABLES,
+    export_rows,
+    import_batches,
+    read_records,
+    write_records,
+)
+from seed import make_faker, seed_bulk
+
+MODELS = ["Group", "Teacher", "Subject", "TeacherSubject", "Student", "Grade"]
+
+
+class TestRecordTransfer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.source)
+        seed_bulk(self.source, make_faker("transfer"), students_count=20)
+        self.target = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.target)
+
+    def tearDown(self):
+        self.source.dispose()
+        self.target.dispose()
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def export(self, engine, model, path, batch_size=7):
+        table = TABLES[model]
+        with engine.connect() as connection:
+            return write_records(
+                path, table.c.keys(), export_rows(connection, table, batch_size)
+            )
+
+    def test_round_trip(self):
+        for extension in ("csv", "jsonl"):
+            target = create_engine("sqlite:///:memory:")
+            Base.metadata.create_all(target)
+            for model in MODELS:
+                path = self.path(f"{model}.{extension}")
+                count = self.export(self.source, model, path)
+                with target.begin() as connection:
+                    imported = import_batches(
+                        connection,
+                        TABLES[model],
+                        batched(read_records(path, TABLES[model]), 7),
+                    )
+                self.assertEqual(imported, count)
+
+                copy_path = self.path(f"copy_{model}.{extension}")
+                self.export(target, model, copy_path)
+                with open(path, encoding="utf-8") as original, open(
+                    copy_path, encoding="utf-8"
+                ) as copy:
+                    self.assertEqual(original.read(), copy.read())
+            target.dispose()
+
+    def test_conflicts(self):
+        path = self.path("groups.jsonl")
+        self.export(self.source, "Group", path)
+        table = TABLES["Group"]
+        with self.target.begin() as connection:
+            import_batches(connection, table, [list(read_records(path, table))])
+        renamed = self.path("renamed.jsonl")
+        with open(renamed, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"id": 1, "name": "Renamed"}) + "\n")
+            file.write(json.dumps({"id": 99, "name": "New"}) + "\n")
+
+        with self.target.begin() as connection:
+            import_batches(
+                connection, table, [list(read_records(renamed, table))], "skip"
+            )
+            names = dict(connection.execute(Group.__table__.select()).all())
+            self.assertNotEqual(names[1], "Renamed")
+            self.assertEqual(names[99], "New")
+            import_batches(
+                connection, table, [list(read_records(renamed, table))], "update"
+            )
+            names = dict(connection.execute(Group.__table__.select()).all())
+            self.assertEqual(names[1], "Renamed")
+            self.assertEqual(len(names), 4)
+
+    def test_unknown_column(self):
+        path = self.path("bad.csv")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("id,title\n1,x\n")
+        with self.assertRaises(ValueError):
+            list(read_records(path, TABLES["Subject"]))
+
+    def test_main_import_keeps_summaries(self):
+        session = sessionmaker(bind=self.source)()
+        path = self.path("grades.csv")
+        self.export(self.source, "Grade", path)
+        session.execute(update(Grade).values(grade=Grade.grade + 5))
+        grade_summary.rebuild_summaries(session.connection())
+        session.commit()
+
+        with mock.patch.object(crud, "session", session), redirect_stdout(
+            io.StringIO()
+        ) as output:
+            crud.import_records("Grade", path, 50, "skip", "auto", None)
+            self.assertEqual(grade_summary.check_summaries(session.connection()), [])
+            total = session.query(func.sum(Grade.grade)).scalar()
+            crud.import_records("Grade", path, 50, "update", "auto", None)
+            self.assertEqual(grade_summary.check_summaries(session.connection()), [])
+            self.assertLess(session.query(func.sum(Grade.grade)).scalar(), total)
+            crud.import_records("Grade", path, 50, "error", "auto", None)
+        session.close()
+        self.assertIn("Import of Grade records failed", output.getvalue())
+
+    def test_partitioned_grades_conflicts(self):
+        # SQLite stand-in for partitioned grades: (id, date_received) is the key.
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(
+            engine,
+            tables=[
+                table
+                for table in Base.metadata.sorted_tables
+                if table is not Grade.__table__
+            ],
+        )
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE grades (id INTEGER NOT NULL, "
+                    "student_id INTEGER NOT NULL, subject_id INTEGER NOT NULL, "
+                    "grade INTEGER NOT NULL, date_received DATETIME NOT NULL, "
+                    "PRIMARY KEY (id, date_received))"
+                )
+            )
+        session = sessionmaker(bind=engine)()
+        session.add(Group(id=1, name="Group 1"))
+        session.add(Subject(id=1, name="Math"))
+        session.flush()
+        session.add(Student(id=1, name="Student 1", group_id=1))
+        session.flush()
+        session.add_all(
+            Grade(id=grade_id, student_id=1, subject_id=1, grade=50, date_received=date)
+            for grade_id, date in (
+                (1, datetime(2025, 1, 10)),
+                (2, datetime(2025, 2, 10)),
+            )
+        )
+        session.flush()
+        grade_summary.rebuild_summaries(session.connection())
+        session.commit()
+
+        path = self.path("grades.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            for grade_id, grade, date in (
+                (1, 60, "2025-03-10T00:00:00"),
+                (2, 70, "2025-02-10T00:00:00"),
+                (3, 80, "2025-03-11T00:00:00"),
+            ):
+                record = {
+                    "id": grade_id,
+                    "student_id": 1,
+                    "subject_id": 1,
+                    "grade": grade,
+                    "date_received": date,
+                }
+                file.write(json.dumps(record) + "\n")
+
+        def grades():
+            return session.execute(
+                select(Grade.id, Grade.grade, Grade.date_received).order_by(Grade.id)
+            ).all()
+
+        with mock.patch.object(
+            record_transfer, "is_partitioned", lambda connection: True
+        ), mock.patch.object(crud, "session", session), redirect_stdout(io.StringIO()):
+            crud.import_records("Grade", path, 50, "skip", "auto", None)
+            self.assertEqual(
+                grades(),
+                [
+                    (1, 50, datetime(2025, 1, 10)),
+                    (2, 50, datetime(2025, 2, 10)),
+                    (3, 80, datetime(2025, 3, 11)),
+                ],
+            )
+            self.assertEqual(grade_summary.check_summaries(session.connection()), [])
+            crud.import_records("Grade", path, 50, "update", "auto", None)
+            self.assertEqual(
+                grades(),
+                [
+                    (1, 60, datetime(2025, 3, 10)),
+                    (2, 70, datetime(2025, 2, 10)),
+                    (3, 80, datetime(2025, 3, 11)),
+                ],
+            )
+            self.assertEqual(grade_summary.check_summaries(session.connection()), [])
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+import tempfile
+from datetime import datetime
+from unittest import mock
+from faker import Faker
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import (
+    Base,
+    Student,
+    Grade,
+    Subject,
+    Teacher,
+    Group,
+    teacher_m2m_subject,
+    GradeTrendChange,
+)
+from value_pools import ValuePools
+from seed import (
+    generate_grades,
+    make_faker,
+    peak_rss_mib,
+    seed_bulk,
+    seed_orm,
+    seed_parallel,
+    shard_sizes,
+)
+
+
+class TestSeed(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def count(self, column):
+        return self.session.query(func.count(column)).scalar()
+
+    def test_seed_bulk(self):
+        seed_bulk(
+            self.engine,
+            Faker(),
+            groups_count=2,
+            teachers_count=3,
+            subjects_count=4,
+            students_count=25,
+            min_grades=2,
+            max_grades=2,
+            batch_size=7,
+        )
+        self.assertEqual(self.count(Group.id), 2)
+        self.assertEqual(self.count(Teacher.id), 3)
+        self.assertEqual(self.count(Subject.id), 4)
+        self.assertEqual(self.count(Student.id), 25)
+        self.assertEqual(self.count(Grade.id), 25 * 4 * 2)
+        self.assertGreaterEqual(self.count(teacher_m2m_subject.c.subject_id), 4)
+
+    def test_seed_orm(self):
+        seed_orm(
+            self.session,
+            Faker(),
+            groups_count=2,
+            teachers_count=2,
+            subjects_count=2,
+            students_count=5,
+            min_grades=1,
+            max_grades=1,
+            batch_size=3,
+        )
+        self.assertEqual(self.count(Student.id), 5)
+        self.assertEqual(self.count(Grade.id), 5 * 2 * 1)
+
+    def test_generate_grades_is_lazy(self):
+        rows = generate_grades(Faker(), iter([1, 2]), [10, 20], 3, 3)
+        first = next(rows)
+        self.assertEqual((first["student_id"], first["subject_id"]), (1, 10))
+        self.assertEqual(sum(1 for _ in rows), 2 * 2 * 3 - 1)
+
+    def test_seed_bulk_pooled(self):
+        fake = Faker()
+        pools = ValuePools(
+            fake, datetime(2024, 3, 16), datetime(2025, 3, 16), size=50, seed="1"
+        )
+        seed_bulk(
+            self.engine,
+            fake,
+            groups_count=2,
+            teachers_count=2,
+            subjects_count=3,
+            students_count=20,
+            min_grades=1,
+            max_grades=4,
+            batch_size=6,
+            pools=pools,
+        )
+        self.assertEqual(self.count(Student.id), 20)
+        names = {name for (name,) in self.session.query(Student.name)}
+        self.assertTrue(names <= set(pools.names))
+        first, last = self.session.query(
+            func.min(Grade.date_received), func.max(Grade.date_received)
+        ).one()
+        self.assertGreaterEqual(first, datetime(2024, 3, 16))
+        self.assertLessEqual(last, datetime(2025, 3, 16))
+        grades = self.count(Grade.id)
+        self.assertTrue(20 * 3 <= grades <= 20 * 3 * 4)
+
+    def test_value_pools_are_reproducible(self):
+        pools = [
+            ValuePools(
+                make_faker("5"),
+                datetime(2024, 1, 1),
+                datetime(2025, 1, 1),
+                size=20,
+                seed="5",
+            )
+            for _ in range(2)
+        ]
+        self.assertEqual(pools[0].names, pools[1].names)
+        self.assertEqual(pools[0].dates, pools[1].dates)
+        self.assertEqual(
+            pools[0].draw(pools[0].names, 30), pools[1].draw(pools[1].names, 30)
+        )
+
+    def test_peak_rss_mib_units(self):
+        usage = mock.Mock(ru_maxrss=2 * 1024 * 1024)
+        with mock.patch("seed.resource") as resource:
+            resource.getrusage.return_value = usage
+            self.assertEqual(peak_rss_mib("linux"), 2048)
+            self.assertEqual(peak_rss_mib("darwin"), 2)
+        with mock.patch("seed.resource", None):
+            self.assertIsNone(peak_rss_mib())
+
+    def test_shard_sizes(self):
+        self.assertEqual(shard_sizes(10, 3), [4, 3, 3])
+        self.assertEqual(sum(shard_sizes(7, 4)), 7)
+
+    def seed_parallel_snapshot(self, directory, name, seed, faker_mode="faithful"):
+        engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+        Base.metadata.create_all(engine)
+        try:
+            seed_parallel(
+                engine,
+                seed=seed,
+                workers=2,
+                groups_count=2,
+                teachers_count=3,
+                subjects_count=3,
+                students_count=9,
+                min_grades=1,
+                max_grades=3,
+                end_date=datetime(2025, 3, 16),
+                batch_size=4,
+                faker_mode=faker_mode,
+                pool_size=10,
+            )
+            with engine.connect() as connection:
+                return {
+                    table.name: connection.execute(
+                        select(table).order_by(*table.primary_key.columns)
+                    ).all()
+                    for table in Base.metadata.sorted_tables
+                    # Logged in the order the workers happen to write.
+                    if table is not GradeTrendChange.__table__
+                }
+        finally:
+            engine.dispose()
+
+    def test_seed_parallel_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = self.seed_parallel_snapshot(directory, "first.db", "42")
+            second = self.seed_parallel_snapshot(directory, "second.db", "42")
+            other = self.seed_parallel_snapshot(directory, "other.db", "7")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        students = first[Student.__tablename__]
+        self.assertEqual(len(students), 9)
+
+    def test_seed_parallel_without_seed_differs(self):
+        with tempfile.TemporaryDirectory() as directory, self.assertLogs(
+            "Seed", level="INFO"
+        ) as logs:
+            first = self.seed_parallel_snapshot(directory, "first.db", None)
+            second = self.seed_parallel_snapshot(directory, "second.db", None)
+        self.assertNotEqual(first, second)
+        seeds = [line for line in logs.output if "Seeding with --seed" in line]
+        self.assertEqual(len(seeds), 2)
+        self.assertNotEqual(seeds[0], seeds[1])
+
+    def test_seed_parallel_pooled_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = self.seed_parallel_snapshot(directory, "a.db", "42", "pooled")
+            second = self.seed_parallel_snapshot(directory, "b.db", "42", "pooled")
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import hashlib
+import random
+from array import array
+from datetime import datetime, timedelta
+from faker import Faker
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def integer_seed(seed):
+    """Turn any seed into a stable 64-bit integer accepted by NumPy."""
+    if seed is None:
+        return None
+    return int.from_bytes(hashlib.sha256(str(seed).encode()).digest()[:8], "little")
+
+
+class ValuePools:
+    """Names and grade timestamps generated once and drawn by random index.
+
+    Timestamps are kept as integer second offsets from start_date. Draws are
+    vectorized with NumPy when it is installed and fall back to array/random.
+    """
+
+    def __init__(
+        self,
+        fake: Faker,
+        start_date: datetime,
+        end_date: datetime,
+        size: int = 10_000,
+        seed=None,
+    ):
+        span = int((end_date - start_date).total_seconds())
+        self.start_date = start_date
+        self.names = [fake.name() for _ in range(size)]
+        if np is not None:
+            self.rng = np.random.default_rng(integer_seed(seed))
+            self.offsets = self.rng.integers(0, span + 1, size=size, dtype=np.int64)
+        else:
+            self.rng = random.Random(seed)
+            self.offsets = array("q", (self.rng.randint(0, span) for _ in range(size)))
+        self.dates = [
+            start_date + timedelta(seconds=int(offset)) for offset in self.offsets
+        ]
+
+    def integers(self, low: int, high: int, count: int):
+        """Draw count integers in [low, high]."""
+        if np is not None:
+            return self.rng.integers(low, high + 1, size=count).tolist()
+        return [self.rng.randint(low, high) for _ in range(count)]
+
+    def draw(self, values, count: int):
+        """Draw count items from values by random index."""
+        return [values[index] for index in self.integers(0, len(values) - 1, count)]